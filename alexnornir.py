@@ -11,28 +11,128 @@ Classes for get information from routers Cisco using Nornir
 version: 1.0
 @author: alexeykr@gmail.com
 """
+import importlib
 import warnings
 import re
+import threading
 import time
-import yaml
 import os
+from contextlib import contextmanager, nullcontext
 # from nornir.plugins.functions.text import (
 #     print_result, print_title
 # )
 # from nornir.core.filter import F
-from termcolor import colored
-from netaddr import IPNetwork
-from nornir import InitNornir
+from alexlibs.metrics import RunMetrics
+from alexlibs.ospf import parse_ospf
+from alexlibs.ospfgraph import OspfGraph
+from alexlibs.pool import ConnectionPool
 from datetime import datetime
-from nornir.plugins.tasks.text import template_file
-from nornir.plugins.tasks.networking import netmiko_send_config, napalm_configure, netmiko_send_command
 warnings.filterwarnings(action='ignore', module='.*paramiko.*')
 
+# nornir, its task plugins, netaddr, termcolor and yaml are imported on first use,
+# importing this module does not load them (the names are still available from it)
+_LAZY = {
+    'InitNornir': 'nornir',
+    'Result': 'nornir.core.task',
+    'template_file': 'nornir.plugins.tasks.text',
+    'netmiko_send_config': 'nornir.plugins.tasks.networking',
+    'napalm_configure': 'nornir.plugins.tasks.networking',
+    'netmiko_send_command': 'nornir.plugins.tasks.networking',
+    'IPNetwork': 'netaddr',
+}
+
+
+def __getattr__(name):
+    if name in _LAZY:
+        return getattr(importlib.import_module(_LAZY[name]), name)
+    raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
+
+
+def colored(text, *args, **kwargs):
+    from termcolor import colored
+    return colored(text, *args, **kwargs)
+
+
+def send_command_batch(conn, cmds, timeout=60, poll=0.05):
+    '''
+    This function sends all the commands in one write to a netmiko connection, reads
+    until the prompt comes back after the last one and returns the output of each command.
+    Only the text read since the last poll is processed.
+    '''
+    prompt_re = re.compile(r'^{}[>#]\s*(.*)$'.format(re.escape(conn.base_prompt)))
+    # the leading return gives a prompt in front of the echo of the first command
+    conn.write_channel(conn.RETURN + ''.join(f'{cmd}{conn.RETURN}' for cmd in cmds))
+    lines = []
+    # indexes of the lines with the prompt and the echo of a command
+    echoes = []
+    # text after the last complete line, a final line feed is kept as it may be the first half of one
+    pending = ''
+    end = time.monotonic() + timeout
+    while True:
+        pending += conn.read_channel()
+        cut = pending.rfind('\n', 0, len(pending) - 1) + 1
+        if cut:
+            text = conn.normalize_linefeeds(conn.strip_ansi_escape_codes(pending[:cut]))
+            pending = pending[cut:]
+            for line in text.split('\n')[:-1]:
+                match = prompt_re.match(line.strip())
+                if match and match.group(1) != '':
+                    echoes.append(len(lines))
+                lines.append(line)
+        match = prompt_re.match(conn.strip_ansi_escape_codes(pending).strip())
+        if len(echoes) >= len(cmds) and match and match.group(1) == '':
+            break
+        if time.monotonic() > end:
+            raise IOError(f'Prompt not detected after the commands in {timeout}s: {cmds}')
+        time.sleep(poll)
+    starts = echoes[-len(cmds):] if cmds else []
+    return ['\n'.join(lines[first + 1:last_idx]).strip('\n')
+            for first, last_idx in zip(starts, starts[1:] + [len(lines)])]
+
+
+def command_output(task, output, elapsed=None):
+    from nornir.core.task import Result
+    return Result(host=task.host, result=output, elapsed=elapsed)
+
+
+class HostStream:
+    """ Nornir processor which hands the result of every host to a hook as soon as its task completes """
+
+    def __init__(self, on_host, release=True):
+        self.on_host = on_host
+        self.release = release
+        self._lock = threading.Lock()
+
+    def task_started(self, task):
+        pass
+
+    def task_completed(self, task, result):
+        pass
+
+    def task_instance_started(self, task, host):
+        pass
+
+    def task_instance_completed(self, task, host, result):
+        # hooks print and write files, one host at a time
+        with self._lock:
+            self.on_host(f'{host}', result)
+        if self.release:
+            # the output was handled, do not keep it in the aggregated result
+            for res in result:
+                res.result = None
+
+    def subtask_instance_started(self, task, host):
+        pass
+
+    def subtask_instance_completed(self, task, host, result):
+        pass
+
 
 class AlexNornir:
     """ Class for get information from cisco routers """
 
-    def __init__(self, config_file='config.yaml', filter_roles='', filter_hosts='', data_file='', output_dir='output'):
+    def __init__(self, config_file='config.yaml', filter_roles='', filter_hosts='', data_file='', output_dir='output',
+                 stream=False, pool=None, batch=False, scheduler=None, metrics=True):
         self._config_file = config_file
         self._filter_roles = list(filter_roles.lower().split(','))
         self._filter_hosts = list(filter_hosts.lower().split(','))
@@ -41,9 +141,26 @@ class AlexNornir:
         self._load_data = ''
         self._res = ''
         self._ospf_filter = ['area', 'nei', 'db']
+        self.ospf_data = dict()
         self._output_dir = output_dir
         self._save_to_file = True
+        self._stream = stream
+        # run the commands of a host in one channel interaction
+        self._batch = batch
+        # a Scheduler (timeouts, deadline, per role limits, retries) instead of the nornir runner
+        self.scheduler = scheduler
+        # sessions are kept open and reused by the successive operations
+        self.pool = ConnectionPool() if pool is None else pool
+        if self.scheduler is not None:
+            # the session of an abandoned host is dropped, so its retry does not wait for it
+            self.scheduler.on_abandon = self.pool.evict
+        # phase timings per host and command, saved next to the output directory after every operation
+        self.metrics = RunMetrics() if metrics is True else metrics if metrics else None
+        if self.metrics is not None:
+            self.pool.on_open = self.metrics.connected
+        self._host_hooks = []
         # print(f'roles: {self.__filter_hosts}')
+        from nornir import InitNornir
         if filter_roles != '':
             norf = InitNornir(config_file=self._config_file, dry_run=False)
             self._nor = norf.filter(filter_func=self.filter_roles)
@@ -54,8 +171,9 @@ class AlexNornir:
             self._nor = InitNornir(config_file=self._config_file, dry_run=False)
 
         if self._data_file != '':
+            import yaml
             with open(self._data_file, mode='r') as yaml_id:
-                self._load_data = yaml.load(yaml_id)
+                self._load_data = yaml.safe_load(yaml_id)
         self.getdate()
         filebits = ["output", self.year, self.month, self.day, self.hour, self.minute + ".markdown"]
         self._date_name_file = '-'.join(filebits)
@@ -102,6 +220,7 @@ class AlexNornir:
 
     @classmethod
     def ipaddr(cls, input_str, net_cfg):
+        from netaddr import IPNetwork
         ip_net = IPNetwork(input_str)
         ret = ''
         if net_cfg == 'address':
@@ -135,6 +254,7 @@ class AlexNornir:
 
     @classmethod
     def ping_task(cls, task, dt):
+        from nornir.plugins.tasks.networking import netmiko_send_command
         for ph in dt['ping_check'][str(task.host)]:
             cmd = f'ping {ph} repeat 3'
             task.run(
@@ -144,18 +264,21 @@ class AlexNornir:
             )
 
     def ping(self):
-        res = self._nor.run(task=self.ping_task, dt=self._load_data)
-        for i in res:
-            if i in self._load_data['ping_check']:
-                self.print_title_host(f'{i}')
-                for jj in res[i]:
-                    if re.search("Success rate is 100", str(jj), re.DOTALL):
-                        self.print_body_result(f'{str(jj.name)} is OK')
-                    elif re.search("Success rate is 0", str(jj), re.DOTALL):
-                        print(colored(f'{str(jj.name)} is Failed', 'white', 'on_red', attrs=['bold']))
+        with self._operation('ping'):
+            res = self._run(self._nor, task=self.pool.wrap(self.ping_task), dt=self._load_data)
+            for i in res:
+                if i in self._load_data['ping_check']:
+                    with self._timed(i, 'print'):
+                        self.print_title_host(f'{i}')
+                        for jj in res[i]:
+                            if re.search("Success rate is 100", str(jj), re.DOTALL):
+                                self.print_body_result(f'{str(jj.name)} is OK')
+                            elif re.search("Success rate is 0", str(jj), re.DOTALL):
+                                print(colored(f'{str(jj.name)} is Failed', 'white', 'on_red', attrs=['bold']))
 
     @classmethod
     def run_cmds_task(cls, task, cmds):
+        from nornir.plugins.tasks.networking import netmiko_send_command
         for cmd in list(cmds.split(',')):
             task.run(
                 name=f'{cmd}',
@@ -163,220 +286,217 @@ class AlexNornir:
                 command_string=cmd
             )
 
-    def run_cmds(self, cmds, flag_config=False):
-        res = self._nor.run(task=self.run_cmds_task, cmds=cmds)
-        for i in res:
-            to_file = ""
-            self.print_title_host(f'{i}', flag_center=True)
-            # print(colored(f'=============================== {i} ==================================', 'white'))
-            # to_file += f'========================== {i} ============================\n'
-            for j in range(1, len(res[i])):
-                self.print_title_result(f'{res[i][j].name}')
-                self.print_body_result(f'{str(res[i][j])}')
-                to_file += f'### {i}: ===>> {res[i][j].name} <<===\n'
-                to_file += f'{res[i][j]}\n\n\n'
-            if self._save_to_file:
-                self.write_to_file(i.lower(), to_file, flag_config=flag_config)
+    def _run(self, nor, task, **kwargs):
+        '''
+        This function runs a task with the scheduler if there is one, otherwise with the nornir runner.
+        '''
+        if self.metrics is not None:
+            nor = nor.with_processors(list(nor.processors) + [self.metrics])
+        if self.scheduler is not None:
+            return self.scheduler.run(nor, task, **kwargs)
+        return nor.run(task=task, **kwargs)
+
+    @contextmanager
+    def _operation(self, name):
+        '''
+        This function records the phase timings of an operation and saves them next to the output directory.
+        '''
+        if self.metrics is None:
+            yield
+            return
+        with self.metrics.operation(name):
+            yield
+        self.save_metrics()
+
+    def _timed(self, host, phase):
+        if self.metrics is None:
+            return nullcontext()
+        return self.metrics.timed(host, phase)
+
+    def save_metrics(self, base_name=None):
+        '''
+        This function writes the metrics to <output dir>-metrics.json and <output dir>-metrics.prom.
+        '''
+        if self.metrics is None:
+            return None
+        if base_name is None:
+            base_name = f'{os.path.normpath(self._output_dir)}-metrics'
+        return self.metrics.save(base_name)
 
-    def get_config(self):
-        res = self._nor.run(task=self.run_cmds_task, cmds='show run')
-        for i in res:
-            to_file = ""
-            self.print_title_host(f'{i}', flag_center=True)
-            for j in range(1, len(res[i])):
-                self.print_title_result(f'{res[i][j].name}')
-                self.print_body_result(f'{str(res[i][j])}')
-                to_file += f'{i}#{res[i][j].name}\n'
-                to_file += f'{res[i][j]}\n\n\n'
-            if self._save_to_file:
-                self.write_to_file(i.lower(), to_file, flag_config=True)
+    def print_metrics(self, operation=None):
+        '''
+        This function prints the latency histograms of the operations.
+        '''
+        if self.metrics is not None:
+            print(self.metrics.summary(operation))
 
-    def get_cdp(self, out_dir=""):
-        if out_dir:
-            tmp_dir = self._output_dir
-            self._output_dir = out_dir
-        res = self._nor.run(task=self.run_cmds_task, cmds='show cdp nei deta')
-        for i in res:
-            to_file = ""
-            self.print_title_host(f'{i}', flag_center=True)
-            for j in range(1, len(res[i])):
-                self.print_title_result(f'{res[i][j].name}')
-                self.print_body_result(f'{str(res[i][j])}')
-                to_file += f'{i}#{res[i][j].name}\n'
-                to_file += f'{res[i][j]}\n\n\n'
-            if self._save_to_file:
-                self.write_to_file(i.lower(), to_file, flag_config=True)
-        if out_dir:
-            self._output_dir = tmp_dir
+    def add_host_hook(self, hook):
+        '''
+        Adds a hook called as hook(hostname, output) with the output of every host,
+        e.g. to parse it: add_host_hook(lambda host, out: devices.append(cdp.Device(out, host)))
+        '''
+        self._host_hooks.append(hook)
 
-    @classmethod
-    def ospf_info_task(cls, task, ospf):
-        cmd = f'show ip ospf nei'
-        r = task.run(
-            name=f'Command: {cmd}',
-            task=netmiko_send_command,
-            command_string=cmd
-            # severity_level=logging.ERROR
-        )
-        pattern = r'''
-                (?P<rid>\d+\.\d+\.\d+\.\d+)\s+
-                (?P<priority>\d+)\s+
-                (?P<state>\w+)/\s*
-                (?P<role>[A-Z-]+)\s+
-                (?P<deadtime>[0-9:]+|-)\s+
-                (?P<peer>\d+\.\d+\.\d+\.\d+)\s+
-                (?P<intf>[0-9A-Za-z./_-]+)
-            '''
-        inf_nei = r.result
-        regex = re.compile(pattern, re.VERBOSE)
-        ospf_neighbors = []
-        if inf_nei:
-            ospf[str(task.host)] = dict()
-            for line in inf_nei.split('\n'):
-                match = regex.search(line)
-                if match:
-                    gdict = match.groupdict()
-                    # gdict['priority'] = FilterModule._try_int(gdict['priority'])
-                    gdict['state'] = gdict['state'].lower()
-                    gdict['role'] = gdict['role'].lower()
-                    gdict['intf'] = gdict['intf'].lower()
-                    ospf_neighbors.append(gdict)
-            ospf[str(task.host)]['neighbor'] = ospf_neighbors
-
-        #########################################################
-        # Check command 'show ip ospf database database-summary'
-        cmd = f'show ip ospf'
-        r = task.run(
-            name=f'Command: {cmd}',
-            task=netmiko_send_command,
-            command_string=cmd
-            # severity_level=logging.ERROR
-        )
-        inf_nei = r.result
-
-        process_pattern = r'''
-            Routing\s+Process\s+"ospf\s+(?P<id>\d+)"\s+with\s+ID\s+(?P<rid>\d+\.\d+\.\d+\.\d+)
-            .*
-            \s*Initial\s+SPF\s+schedule\s+delay\s+(?P<init_spf>\d+)\s+msecs
-            \s*Minimum\s+hold\s+time\s+between\s+two\s+consecutive\s+SPFs\s+(?P<min_spf>\d+)\s+msecs
-            \s*Maximum\s+wait\s+time\s+between\s+two\s+consecutive\s+SPFs\s+(?P<max_spf>\d+)\s+msecs
-            .*
-            \s*Reference\s+bandwidth\s+unit\s+is\s+(?P<ref_bw>\d+)\s+mbps
+    def _host_output(self, host, multi_result, prompt):
         '''
-        ospf_proc = dict()
-        regex = re.compile(process_pattern, re.VERBOSE + re.DOTALL)
-
-        match = regex.search(inf_nei)
-        if match:
-            ospf_proc = match.groupdict()
-            ospf_proc.update({
-                'is_abr': inf_nei.find('area border') != -1,
-                'is_asbr': inf_nei.find('autonomous system boundary') != -1,
-                'is_stub_rtr': inf_nei.find('Originating router-LSAs with max') != -1,
-                'has_ispf': inf_nei.find('Incremental-SPF enabled') != -1,
-                'has_bfd': inf_nei.find('BFD is enabled') != -1,
-                'has_ttlsec': inf_nei.find('Strict TTL checking enabled') != -1
-            })
-            ospf[str(task.host)]['process'] = ospf_proc
-
-        area_pattern = r'''
-            Area\s+(?:BACKBONE\()?(?P<id>\d+)(?:\))?\s+
-            Number\s+of\s+interfaces\s+in\s+this\s+area\s+is\s+(?P<num_intfs>\d+).*\n
-            \s+(?:It\s+is\s+a\s+(?P<type>\w+)\s+area)?
+        This function prints the results of a host and returns them as the text saved to file.
         '''
-        regex = re.compile(area_pattern, re.VERBOSE)
-        if match:
-            areas = [match.groupdict() for match in regex.finditer(inf_nei)]
-            for area in areas:
-                # area['num_intfs'] = FilterModule._try_int(area['num_intfs'])
-                # area['id'] = FilterModule._try_int(area['id'])
-                if not area['type']:
-                    area['type'] = 'standard'
-                else:
-                    area['type'] = area['type'].lower()
-            ospf[str(task.host)]['areas'] = areas
-        #########################################################
-        # Check command 'show ip ospf database database-summary'
-        cmd = f'show ip ospf database database-summary'
-        r = task.run(
-            name=f'Command: {cmd}',
-            task=netmiko_send_command,
-            command_string=cmd
-            # severity_level=logging.ERROR
-        )
-        res = r.result
-        process_pattern = r'''
-            Process\s+(?P<process_id>\d+)\s+database\s+summary\s+
-            (?:LSA\s+Type\s+Count\s+Delete\s+Maxage\s+)?
-            Router\s+(?P<total_lsa1>\d+).*\n\s+
-            Network\s+(?P<total_lsa2>\d+).*\n\s+
-            Summary\s+Net\s+(?P<total_lsa3>\d+).*\n\s+
-            Summary\s+ASBR\s+(?P<total_lsa4>\d+).*\n\s+
-            Type-7\s+Ext\s+(?P<total_lsa7>\d+).*
-            \s+Type-5\s+Ext\s+(?P<total_lsa5>\d+)
+        to_file = ""
+        self.print_title_host(f'{host}', flag_center=True)
+        for j in range(1, len(multi_result)):
+            self.print_title_result(f'{multi_result[j].name}')
+            self.print_body_result(f'{str(multi_result[j])}')
+            if prompt:
+                to_file += f'{host}#{multi_result[j].name}\n'
+            else:
+                to_file += f'### {host}: ===>> {multi_result[j].name} <<===\n'
+            to_file += f'{multi_result[j]}\n\n\n'
+        return to_file
+
+    def _run_hosts(self, flag_config, prompt, **kwargs):
         '''
-        regex = re.compile(process_pattern, re.VERBOSE + re.DOTALL)
-        match = regex.search(res)
-        dbms_sum = dict()
-        if match:
-            match = regex.search(res)
-            dbms_sum = match.groupdict()
-
-            ospf[str(task.host)]['dbms_sum'] = dbms_sum
-
-        area_pattern = r'''
-            Area\s+(?P<id>\d+)\s+database\s+summary\s+
-            (?:LSA\s+Type\s+Count\s+Delete\s+Maxage\s+)?
-            Router\s+(?P<num_lsa1>\d+).*\n\s+
-            Network\s+(?P<num_lsa2>\d+).*\n\s+
-            Summary\s+Net\s+(?P<num_lsa3>\d+).*\n\s+
-            Summary\s+ASBR\s+(?P<num_lsa4>\d+).*\n\s+
-            Type-7\s+Ext\s+(?P<num_lsa7>\d+)
+        This function runs a task and handles the output of every host: printed, saved to file
+        and handed to the host hooks. In stream mode this is done as soon as the task of the host
+        completes and its output is released then, so memory is bounded by the number of workers.
         '''
-        regex = re.compile(area_pattern, re.VERBOSE)
-        # match = regex.search(res)
-        dbms_sum_areas = list()
-        if match:
-            dbms_sum_areas = [match.groupdict() for match in regex.finditer(res)]
-            ospf[str(task.host)]['dbms_sum_areas'] = dbms_sum_areas
+        def done(host, multi_result):
+            with self._timed(host, 'print'):
+                to_file = self._host_output(host, multi_result, prompt)
+            if self._save_to_file:
+                with self._timed(host, 'write'):
+                    self.write_to_file(host.lower(), to_file, flag_config=flag_config)
+            if self._host_hooks:
+                with self._timed(host, 'parse'):
+                    for hook in self._host_hooks:
+                        hook(host, to_file)
+
+        kwargs['task'] = self.pool.wrap(kwargs['task'])
+        if self._stream:
+            return self._run(self._nor.with_processors([HostStream(done)]), **kwargs)
+        res = self._run(self._nor, **kwargs)
+        for i in res:
+            done(f'{i}', res[i])
+        return res
+
+    @classmethod
+    def run_cmds_batch_task(cls, task, cmds, timeout=None):
+        '''
+        The commands are sent in one batch on the session of the host,
+        the output is split back into one result per command (named as by run_cmds_task).
+        The batch times out after the netmiko timeout of the host (set by the Scheduler cmd_timeout
+        or the inventory), 60s without one.
+        '''
+        cmd_list = list(cmds.split(','))
+        if timeout is None:
+            timeout = task.host.get_connection_parameters('netmiko').extras.get('timeout') or 60
+        conn = task.host.get_connection('netmiko', task.nornir.config)
+        start = time.monotonic()
+        outputs = send_command_batch(conn, [cmd.strip() for cmd in cmd_list], timeout=timeout)
+        # the time of the batch is shared by the commands in proportion to their output
+        elapsed = time.monotonic() - start
+        total = sum(len(output) + 1 for output in outputs)
+        for cmd, output in zip(cmd_list, outputs):
+            task.run(
+                name=f'{cmd}',
+                task=command_output,
+                output=output,
+                elapsed=elapsed * (len(output) + 1) / total
+            )
+
+    @property
+    def cmds_task(self):
+        return self.run_cmds_batch_task if self._batch else self.run_cmds_task
+
+    def run_cmds(self, cmds, flag_config=False):
+        with self._operation('run_cmds'):
+            return self._run_hosts(flag_config, False, task=self.cmds_task, cmds=cmds)
+
+    def get_config(self):
+        with self._operation('get_config'):
+            return self._run_hosts(True, True, task=self.cmds_task, cmds='show run')
+
+    def get_cdp(self, out_dir=""):
+        with self._operation('get_cdp'):
+            if out_dir:
+                tmp_dir = self._output_dir
+                self._output_dir = out_dir
+            try:
+                return self._run_hosts(True, True, task=self.cmds_task, cmds='show cdp nei deta')
+            finally:
+                if out_dir:
+                    self._output_dir = tmp_dir
+
+    @classmethod
+    def ospf_info_task(cls, task, ospf, metrics=None):
+        from nornir.plugins.tasks.networking import netmiko_send_command
+        outputs = []
+        for cmd in ('show ip ospf nei', 'show ip ospf', 'show ip ospf database database-summary'):
+            r = task.run(
+                name=f'Command: {cmd}',
+                task=netmiko_send_command,
+                command_string=cmd
+            )
+            outputs.append(r.result)
+        start = time.monotonic()
+        info = parse_ospf(*outputs)
+        if metrics is not None:
+            metrics.add(task.host, 'parse', time.monotonic() - start)
+        if info:
+            ospf[str(task.host)] = info
 
     def ospf_info(self):
         filter_output = self._ospf_filter
         ospf_info = dict()
-        res = self._nor.run(task=self.ospf_info_task, ospf=ospf_info)
-        # print_result(f'Result: {res}')
-        for i in sorted(ospf_info):
-            # print(colored("*"*83, 'yellow', attrs=['bold']))
-            type_host = ""
-
-            if ospf_info[i]['process']['is_abr']:
-                    # ABR:{is_abr} ASBR:{is_asbr} STUB:{is_stub_rtr}
-                type_host += f'ABR '
-            if ospf_info[i]['process']['is_asbr']:
-                type_host += f'ASBR '
-            if ospf_info[i]['process']['is_stub_rtr']:
-                type_host += f'STUB '
-            self.print_title_host(f'HOSTNAME: {i}' + '   OSPFid: {id:4s} RID: {rid:15s}'.format_map(ospf_info[i]['process']) + type_host)
-
-            # print_title_result("Process OSPF")
-            # print_body_result('Process: {id:4s} RID: {rid:15s} ABR:{is_abr} ASBR:{is_asbr} STUB:{is_stub_rtr}'.format_map(ospf_info[i]['process']))
-            if 'area' in filter_output:
-                self.print_title_result("Areas")
-                for n in ospf_info[i]['areas']:
-                    self.print_body_result('Area: {id:6s} Type: {type:16s} Number of Interfaces: {num_intfs:4s} '.format_map(n))
-
-            if 'nei' in filter_output:
-                self.print_title_result("Neighbors")
-                for n in ospf_info[i]['neighbor']:
-                    self.print_body_result('{rid:15s} {state:6s} {role:6s} {peer:15s} {intf:s}'.format_map(n))
-            if 'db' in filter_output:
-                self.print_title_result("Database Summary")
-                # print_body_result('Process: {process_id:4s}'.format_map(ospf_info[i]['dbms_sum']))
-                self.print_body_result('Proc: {process_id:4s} LSA1: {total_lsa1:5s} LSA2: {total_lsa2:5s} LSA3: {total_lsa3:5s} LSA4: {total_lsa4:5s} LSA7: {total_lsa7:5s} LSA5: {total_lsa5:5s}'.format_map(ospf_info[i]['dbms_sum']))
-                self.print_title_result("Area Database Summary ")
-                for n in ospf_info[i]['dbms_sum_areas']:
-                    # print_body_result('Area: {id:4s} '.format_map(n))
-                    self.print_body_result('Area: {id:4s} LSA1: {num_lsa1:5s} LSA2: {num_lsa2:5s} LSA3: {num_lsa3:5s} LSA4: {num_lsa4:5s} LSA7: {num_lsa7:5s}'.format_map(n))
+        with self._operation('ospf_info'):
+            self._run(self._nor, task=self.pool.wrap(self.ospf_info_task), ospf=ospf_info, metrics=self.metrics)
+            self.ospf_data = ospf_info
+            # print_result(f'Result: {res}')
+            for i in sorted(ospf_info):
+                # print(colored("*"*83, 'yellow', attrs=['bold']))
+                with self._timed(i, 'print'):
+                    type_host = ""
+                    if ospf_info[i]['process']['is_abr']:
+                            # ABR:{is_abr} ASBR:{is_asbr} STUB:{is_stub_rtr}
+                        type_host += f'ABR '
+                    if ospf_info[i]['process']['is_asbr']:
+                        type_host += f'ASBR '
+                    if ospf_info[i]['process']['is_stub_rtr']:
+                        type_host += f'STUB '
+                    self.print_title_host(f'HOSTNAME: {i}' + '   OSPFid: {id:4s} RID: {rid:15s}'.format_map(ospf_info[i]['process']) + type_host)
+
+                    # print_title_result("Process OSPF")
+                    # print_body_result('Process: {id:4s} RID: {rid:15s} ABR:{is_abr} ASBR:{is_asbr} STUB:{is_stub_rtr}'.format_map(ospf_info[i]['process']))
+                    if 'area' in filter_output:
+                        self.print_title_result("Areas")
+                        for n in ospf_info[i]['areas']:
+                            self.print_body_result('Area: {id:6s} Type: {type:16s} Number of Interfaces: {num_intfs:4s} '.format_map(n))
+
+                    if 'nei' in filter_output:
+                        self.print_title_result("Neighbors")
+                        for n in ospf_info[i]['neighbor']:
+                            self.print_body_result('{rid:15s} {state:6s} {role:6s} {peer:15s} {intf:s}'.format_map(n))
+                    if 'db' in filter_output:
+                        self.print_title_result("Database Summary")
+                        # print_body_result('Process: {process_id:4s}'.format_map(ospf_info[i]['dbms_sum']))
+                        self.print_body_result('Proc: {process_id:4s} LSA1: {total_lsa1:5s} LSA2: {total_lsa2:5s} LSA3: {total_lsa3:5s} LSA4: {total_lsa4:5s} LSA7: {total_lsa7:5s} LSA5: {total_lsa5:5s}'.format_map(ospf_info[i]['dbms_sum']))
+                        self.print_title_result("Area Database Summary ")
+                        for n in ospf_info[i]['dbms_sum_areas']:
+                            # print_body_result('Area: {id:4s} '.format_map(n))
+                            self.print_body_result('Area: {id:4s} LSA1: {num_lsa1:5s} LSA2: {num_lsa2:5s} LSA3: {num_lsa3:5s} LSA4: {num_lsa4:5s} LSA7: {num_lsa7:5s}'.format_map(n))
+        return ospf_info
+
+    def ospf_graph(self, ospf_info=None):
+        '''
+        This function returns the OspfGraph of the last ospf_info (or of the given dictionary),
+        e.g. ospf_graph().check() for one-sided/not full adjacencies and LSA count mismatches.
+        '''
+        return OspfGraph.from_info(self.ospf_data if ospf_info is None else ospf_info)
+
+    def close(self):
+        '''
+        This function closes the sessions of the pool.
+        '''
+        self.pool.close()
 
     def __str__(self):
         return f'Name='
@@ -0,0 +1,286 @@
+"""This Module provides simple benchmarks of the config and cdp parsers.
+
+The suite generates a synthetic corpus (alexlibs.synthetic.SCALES) and times
+CiscoDevice, cdp.Device, ListDevices and every create_csv_* export. Its results
+can be saved to a JSON file (with the git commit) and compared with a saved run.
+
+Usage: python -m alexlibs.bench <config file> [<cdp file>]
+       python -m alexlibs.bench --ospf [<areas>]
+       python -m alexlibs.bench --suite [small|medium|large] [--save <file>] [--compare <file>] [--corpus <dir>]
+       python -m alexlibs.bench --profile '<config files glob>' ['<cdp files glob>']
+       python -m alexlibs.bench --imports
+"""
+
+import contextlib
+import glob
+import io
+import itertools
+import json
+import os
+import platform
+import re
+import subprocess
+import sys
+import tempfile
+import time
+import alexlibs.cdp as cdp
+import alexlibs.ciscocfg as ciscocfg
+import alexlibs.ospf as ospf
+from alexlibs.profiling import profile_parsing
+from alexlibs.synthetic import (SCALES, synthetic_corpus, synthetic_ospf_dbsum, synthetic_ospf_neighbors,
+                                synthetic_ospf_process)
+
+IMPORT_MODULES = ('alexlibs.cdp', 'alexlibs.ciscocfg', 'alexlibs.diff', 'alexlibs.cli', 'alexlibs.alexnornir')
+HEAVY_PACKAGES = ('ciscoconfparse', 'netaddr', 'nornir', 'netmiko', 'napalm', 'paramiko', 'yaml', 'termcolor')
+
+CSV_EXPORTS = ('vlans', 'vlans_all', 'l3_int', 'l3_int_all', 'l3_int_network', 'l2_int', 'l2_int_all', 'cdp', 'cdp_all')
+
+
+def _best_of(func, repeat=3):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            func()
+        elapsed = time.perf_counter() - start
+        if best is None or elapsed < best:
+            best = elapsed
+    return best
+
+
+def bench_cisco_device(file_input, repeat=3):
+    """
+    Times CiscoDevice for every combination of the l3/vlans/l2 flags.
+    The config is parsed once per device, so the results should be close to each other.
+    """
+    resp = dict()
+    for flag_l3_int, flag_vlans, flag_l2_int in itertools.product((False, True), repeat=3):
+        if not (flag_l3_int or flag_vlans or flag_l2_int):
+            continue
+        name = f'l3={flag_l3_int:d} vlans={flag_vlans:d} l2={flag_l2_int:d}'
+        resp[name] = _best_of(lambda: ciscocfg.CiscoDevice(file_input, flag_l3_int=flag_l3_int,
+                                                           flag_vlans=flag_vlans, flag_l2_int=flag_l2_int), repeat)
+    return resp
+
+
+def _extract_key(pattern, string, flags=0):
+    """
+    returns the value of a rule searched on its own, as the interfaces did before the rule tables
+    """
+    res = re.search(r'{}\s?(.*)'.format(pattern), string, flags)
+    if res:
+        return res.group(1).strip()
+    return None
+
+
+def bench_rule_tables(file_input, repeat=3):
+    """
+    Times the per-line cost of the L3/L2 rule tables against a search per rule.
+    """
+    with open(file_input) as input_f:
+        lines = input_f.read().splitlines()
+    resp = dict()
+    for name, keys, table, flags in (('l3', ciscocfg._KEYS_L3_INT, ciscocfg._RULES_L3_INT, 0),
+                                     ('l2', ciscocfg._KEYS_L2_INT, ciscocfg._RULES_L2_INT, re.DOTALL)):
+        def per_rule():
+            for line in lines:
+                for pattern in keys.values():
+                    _extract_key(pattern, line, flags)
+
+        def compiled():
+            for line in lines:
+                table.match(line)
+
+        resp[f'{name} search per rule (per line)'] = _best_of(per_rule, repeat) / max(len(lines), 1)
+        resp[f'{name} rule table (per line)'] = _best_of(compiled, repeat) / max(len(lines), 1)
+    return resp
+
+
+def bench_cdp_split(file_input, copies=(1, 10, 100), repeat=3):
+    """
+    Times the streaming cdp block splitter against the former regex
+    on the output repeated (concatenated) several times.
+    """
+    with open(file_input) as input_f:
+        cdp_input = input_f.read()
+    regex = re.compile(r'-----+((?:.*|\n+)+?)(?:-|$)')
+    resp = dict()
+    for count in copies:
+        text = '\n'.join([cdp_input] * count)
+        resp[f'regex x{count}'] = _best_of(lambda: regex.findall(text), repeat)
+        resp[f'iter_blocks x{count}'] = _best_of(lambda: list(cdp.iter_blocks(io.StringIO(text))), repeat)
+        resp[f'Device x{count}'] = _best_of(lambda: cdp.Device(io.StringIO(text)), repeat)
+    return resp
+
+
+def bench_ospf(areas=(10, 100, 1000), repeat=3):
+    """
+    Times the OSPF parsers on synthetic outputs against compiling the
+    patterns on every call and searching the database summary twice (as ospf_info_task did).
+    """
+    resp = dict()
+    for count in areas:
+        dbsum = synthetic_ospf_dbsum(count)
+        process = synthetic_ospf_process(count)
+        neighbors = synthetic_ospf_neighbors(count)
+
+        def inline():
+            for pattern, flags in ((ospf._DBSUM_RE.pattern, re.VERBOSE + re.DOTALL),
+                                   (ospf._DBSUM_AREA_RE.pattern, re.VERBOSE)):
+                regex = re.compile(pattern, flags)
+                match = regex.search(dbsum)
+                if match:
+                    match = regex.search(dbsum)
+                    [item.groupdict() for item in regex.finditer(dbsum)]
+
+        resp[f'dbsum inline x{count} areas'] = _best_of(inline, repeat)
+        resp[f'dbsum precompiled x{count} areas'] = _best_of(lambda: (ospf.parse_dbsum(dbsum), ospf.parse_dbsum_areas(dbsum)), repeat)
+        resp[f'process+areas x{count} areas'] = _best_of(lambda: (ospf.parse_process(process), ospf.parse_areas(process)), repeat)
+        resp[f'neighbors x{count}'] = _best_of(lambda: ospf.parse_neighbors(neighbors), repeat)
+    return resp
+
+
+def bench_suite(scale='small', repeat=3, corpus_dir=None):
+    """
+    Times the parsers and the CSV exports on a synthetic corpus of the scale,
+    written to corpus_dir (kept) or to a temporary directory
+    """
+    with contextlib.ExitStack() as stack:
+        if corpus_dir is None:
+            corpus_dir = stack.enter_context(tempfile.TemporaryDirectory())
+        path_to_config, path_to_cdp = synthetic_corpus(corpus_dir, **SCALES[scale])
+        out_dir = f'{corpus_dir}/csv'
+        file_config = sorted(glob.glob(path_to_config))[0]
+        file_cdp = sorted(glob.glob(path_to_cdp))[0]
+        resp = dict()
+        resp['CiscoDevice l3'] = _best_of(lambda: ciscocfg.CiscoDevice(file_config, flag_l3_int=True), repeat)
+        resp['CiscoDevice l3+vlans+l2'] = _best_of(lambda: ciscocfg.CiscoDevice(file_config, flag_l3_int=True, flag_vlans=True,
+                                                                                flag_l2_int=True), repeat)
+        resp['cdp.Device'] = _best_of(lambda: cdp.Device.from_file(file_cdp), repeat)
+        resp['ListDevices config'] = _best_of(lambda: ciscocfg.ListDevices(path_to_config, flag_l3_int=True, flag_vlans=True,
+                                                                           flag_l2_int=True), repeat)
+        with contextlib.redirect_stdout(io.StringIO()):
+            devices = ciscocfg.ListDevices(path_to_config, path_to_cdp, flag_l3_int=True, flag_vlans=True, flag_l2_int=True)
+        resp['ListDevices config+cdp'] = _best_of(lambda: ciscocfg.ListDevices(path_to_config, path_to_cdp, flag_l3_int=True,
+                                                                               flag_vlans=True, flag_l2_int=True), repeat)
+        for name in CSV_EXPORTS:
+            resp[f'create_csv_{name}'] = _best_of(lambda: getattr(devices, f'create_csv_{name}')(out_dir), repeat)
+        resp['export all'] = _best_of(lambda: devices.export(out_dir), repeat)
+    return resp
+
+
+def bench_imports(modules=IMPORT_MODULES, repeat=5):
+    """
+    Times the import of the modules, each in a new interpreter (python -X importtime),
+    returns a dictionary module -> (seconds, heavy packages loaded)
+    """
+    code = ('import sys, {module}; print(",".join(sorted(pkg for pkg in {heavy} '
+            'if pkg in sys.modules)))')
+    resp = dict()
+    for module in modules:
+        best = None
+        for _ in range(repeat):
+            proc = subprocess.run([sys.executable, '-W', 'ignore', '-X', 'importtime', '-c',
+                                   code.format(module=module, heavy=HEAVY_PACKAGES)],
+                                  capture_output=True, text=True, check=True)
+            # the cumulative time (us) of the module is on its own line of the report
+            for line in proc.stderr.splitlines():
+                fields = line.split('|')
+                if len(fields) == 3 and fields[2].strip() == module:
+                    elapsed = int(fields[1]) / 1000000
+                    best = elapsed if best is None else min(best, elapsed)
+        resp[module] = (best, proc.stdout.strip())
+    return resp
+
+
+def _git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=os.path.dirname(os.path.abspath(__file__)),
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def save_results(file_name, results, **meta):
+    """
+    Saves the results with the commit, the python version and meta to a JSON file
+    """
+    data = {
+        'commit': _git_commit(),
+        'python': platform.python_version(),
+        'date': time.strftime('%Y-%m-%d %H:%M:%S'),
+        **meta,
+        'results': results,
+    }
+    with open(file_name, 'w') as output_f:
+        json.dump(data, output_f, indent=2)
+
+
+def compare_results(file_name, results):
+    """
+    Prints the results next to the ones saved in file_name, with the ratio new / old
+    """
+    with open(file_name) as input_f:
+        data = json.load(input_f)
+    print(f'===== compared with {file_name} (commit {data.get("commit")}, scale {data.get("scale")})')
+    for name, elapsed in results.items():
+        old = data['results'].get(name)
+        if old is None:
+            print(f'{name:40s} {"-":>10s} {elapsed * 1000:10.2f} ms')
+        else:
+            print(f'{name:40s} {old * 1000:10.2f} {elapsed * 1000:10.2f} ms  x{elapsed / old:.2f}')
+
+
+def _option(argv, name, default=None):
+    if name in argv:
+        return argv[argv.index(name) + 1]
+    return default
+
+
+def print_results(title, results):
+    print(f'===== {title}')
+    for name, elapsed in results.items():
+        if elapsed < 0.001:
+            print(f'{name:40s} {elapsed * 1000000:10.2f} us')
+        else:
+            print(f'{name:40s} {elapsed * 1000:10.2f} ms')
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    if not argv:
+        print(__doc__)
+        return 1
+    if argv[0] == '--ospf':
+        areas = (int(argv[1]),) if len(argv) > 1 else (10, 100, 1000)
+        print_results('OSPF parsers', bench_ospf(areas))
+        return 0
+    if argv[0] == '--imports':
+        print(f'{"module":24s} {"import ms":>10s}  heavy packages loaded')
+        for module, (elapsed, heavy) in bench_imports().items():
+            print(f'{module:24s} {elapsed * 1000:10.2f}  {heavy}')
+        return 0
+    if argv[0] == '--profile':
+        with profile_parsing() as profile, contextlib.redirect_stdout(io.StringIO()):
+            ciscocfg.ListDevices(argv[1], argv[2] if len(argv) > 2 else None, flag_l3_int=True, flag_vlans=True,
+                                 flag_l2_int=True)
+        print(profile.report())
+        return 0
+    if argv[0] == '--suite':
+        scale = argv[1] if len(argv) > 1 and not argv[1].startswith('--') else 'small'
+        results = bench_suite(scale, corpus_dir=_option(argv, '--corpus'))
+        print_results(f'Suite {scale}', results)
+        if _option(argv, '--compare'):
+            compare_results(_option(argv, '--compare'), results)
+        if _option(argv, '--save'):
+            save_results(_option(argv, '--save'), results, scale=scale)
+        return 0
+    print_results(f'CiscoDevice {argv[0]}', bench_cisco_device(argv[0]))
+    print_results(f'Rule tables {argv[0]}', bench_rule_tables(argv[0]))
+    if len(argv) > 1:
+        print_results(f'CDP split {argv[1]}', bench_cdp_split(argv[1]))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,108 @@
+"""This Module provides an on-disk cache of parsed config and cdp files.
+
+Entries are keyed by the content hash of the source file and PARSER_VERSION,
+so unchanged files are loaded from the cache instead of being parsed again.
+"""
+
+import hashlib
+import os
+import pickle
+
+# Bump this when the parsers change what they produce, old entries are ignored then
+PARSER_VERSION = 6
+
+
+class ParseCache():
+    """
+    This Class represents a size-bounded directory of pickled parse results.
+    The least recently used entries are evicted when max_size (bytes) is exceeded.
+    """
+
+    def __init__(self, cache_dir='.parse_cache', max_size=512 * 1024 * 1024):
+        self.cache_dir = cache_dir
+        self.max_size = max_size
+        self.stats = {'hits': 0, 'misses': 0, 'evictions': 0}
+        self._entries = dict()
+        self._size = 0
+        if not os.path.exists(f'{self.cache_dir}'):
+            os.makedirs(f'{self.cache_dir}')
+        for name in os.listdir(self.cache_dir):
+            if name.endswith('.pickle'):
+                st = os.stat(os.path.join(self.cache_dir, name))
+                self._entries[name[:-len('.pickle')]] = [st.st_mtime, st.st_size]
+                self._size += st.st_size
+
+    def __repr__(self):
+        return 'ParseCache: {} entries={} size={}'.format(self.cache_dir, len(self._entries), self._size)
+
+    @staticmethod
+    def key(content, *params):
+        """
+        Returns the cache key of the file content and the parser parameters
+        """
+        if isinstance(content, str):
+            content = content.encode()
+        digest = hashlib.sha1(content)
+        digest.update(repr((PARSER_VERSION,) + params).encode())
+        return digest.hexdigest()
+
+    @classmethod
+    def key_for_file(cls, file_name, *params):
+        with open(file_name, 'rb') as input_f:
+            return cls.key(input_f.read(), *params)
+
+    def _path(self, key):
+        return os.path.join(self.cache_dir, f'{key}.pickle')
+
+    def get(self, key):
+        """
+        Returns the cached object or None
+        """
+        if key in self._entries:
+            try:
+                with open(self._path(key), 'rb') as input_f:
+                    obj = pickle.load(input_f)
+            except (OSError, pickle.UnpicklingError, EOFError, AttributeError):
+                self._remove(key)
+            else:
+                self.stats['hits'] += 1
+                os.utime(self._path(key))
+                self._entries[key][0] = os.stat(self._path(key)).st_mtime
+                return obj
+        self.stats['misses'] += 1
+        return None
+
+    def put(self, key, obj):
+        data = pickle.dumps(obj, protocol=pickle.HIGHEST_PROTOCOL)
+        if len(data) > self.max_size:
+            return
+        if key in self._entries:
+            self._remove(key)
+        tmp_name = f'{self._path(key)}.tmp'
+        with open(tmp_name, 'wb') as output_f:
+            output_f.write(data)
+        os.replace(tmp_name, self._path(key))
+        self._entries[key] = [os.stat(self._path(key)).st_mtime, len(data)]
+        self._size += len(data)
+        self._evict()
+
+    def _remove(self, key):
+        _, size = self._entries.pop(key)
+        self._size -= size
+        try:
+            os.remove(self._path(key))
+        except OSError:
+            pass
+
+    def _evict(self):
+        if self._size <= self.max_size:
+            return
+        for key in sorted(self._entries, key=lambda k: self._entries[k][0]):
+            if self._size <= self.max_size:
+                break
+            self._remove(key)
+            self.stats['evictions'] += 1
+
+    def clear(self):
+        for key in list(self._entries):
+            self._remove(key)
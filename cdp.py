@@ -3,8 +3,13 @@
 It requires 'show cdp neighbor detail' output
 """
 
+import collections
+import io
+import itertools
 import json
 import re
+import sys
+from time import perf_counter
 
 _KEYS = {
     'device_id': 'Device ID:',
@@ -13,14 +18,83 @@ _KEYS = {
     'capabilities': 'Capabilities:',
     'local_port': 'Interface:',
     'remote_port': r'Port ID \(outgoing port\):',
+    'native_vlan': 'Native VLAN:',
+    'duplex': 'Duplex:',
+    'version': ', Version',
 }
 
+# The first address after this label is the management address
+_MANAGEMENT = r'Management address\(es\):'
+
+# All labels in one alternation, the value is captured in a lookahead so that
+# the scan goes on right after the label (several labels share a line)
+_FIELDS_RE = re.compile('|'.join(r'(?P<{}>{}(?=\s?([^,\n]*)))'.format(key, pattern)
+                                 for key, pattern in list(_KEYS.items()) + [('management', _MANAGEMENT)]))
+
+
+class ProfiledScan():
+    """
+    This Class represents _FIELDS_RE counting the cost of the scan,
+    it stands in for it while alexlibs.profiling.profile_parsing is active.
+    The labels are found by one alternation, so only the scan is timed;
+    the labels get their match counts (from the group which matched) without a time.
+    """
+
+    def __init__(self, regex, profile, name='cdp'):
+        self.regex = regex
+        self.profile = profile
+        self.name = name
+        self._labels = list(_KEYS) + ['management']
+
+    def finditer(self, block):
+        add = self.profile.add_rule
+        start = perf_counter()
+        matches = list(self.regex.finditer(block))
+        add(self.name, '(scan)', bool(matches), perf_counter() - start)
+        found = collections.Counter(res.lastgroup for res in matches)
+        for key in self._labels:
+            add(self.name, key, found[key])
+        return iter(matches)
+
+
+# A neighbor block ends at the summary line or at the prompt of the next dump
+_END_RE = re.compile(r'^(?:Total cdp entries displayed|[^\s#]+#)')
+
+
+def iter_blocks(lines):
+    """
+    Yields the neighbor blocks of 'show cdp neighbor detail' output.
+
+    lines is any iterable of lines (a file object, a generator, ...). A block
+    starts after a line of dashes and ends at the next one, so it runs in linear
+    time and never holds more than one block.
+    """
+    block = None
+    for line in lines:
+        if line[:5] == '-----' and not line.strip('-\r\n \t'):
+            if block is not None:
+                yield '\n'.join(block)
+            block = []
+        elif block is not None:
+            if (line[:5] == 'Total' or '#' in line) and _END_RE.match(line):
+                yield '\n'.join(block)
+                block = None
+            else:
+                block.append(line.rstrip('\r\n'))
+    if block is not None:
+        yield '\n'.join(block)
+
 
 class CDPEntry():
 
     """This Class represents a CDP Entry
     """
 
+    FIELDS = ('device_id', 'ip_address', 'platform', 'capabilities', 'local_port', 'remote_port',
+              'native_vlan', 'duplex', 'version', 'mgmt_address')
+    __slots__ = FIELDS
+    _INTERN = frozenset(('platform', 'capabilities', 'native_vlan', 'duplex', 'version'))
+
     def __init__(self):
         self.device_id = None
         self.ip_address = None
@@ -28,6 +102,10 @@ class CDPEntry():
         self.capabilities = None
         self.local_port = None
         self.remote_port = None
+        self.native_vlan = None
+        self.duplex = None
+        self.version = None
+        self.mgmt_address = None
 
     def __repr__(self):
         return 'CDP Entry: {}'.format(self.device_id)
@@ -57,7 +135,11 @@ class CDPEntry():
             'platform': self.platform,
             'capabilities': self.capabilities,
             'local_port': self.local_port,
-            'remote_port': self.remote_port
+            'remote_port': self.remote_port,
+            'native_vlan': self.native_vlan,
+            'duplex': self.duplex,
+            'version': self.version,
+            'mgmt_address': self.mgmt_address,
         }
         return resp
 
@@ -72,7 +154,11 @@ class CDPEntry():
             'platform': self.platform,
             'capabilities': self.capabilities,
             'local_port': self.shorten_interface(self.local_port, length=3),
-            'remote_port': self.shorten_interface(self.remote_port, length=3)
+            'remote_port': self.shorten_interface(self.remote_port, length=3),
+            'native_vlan': self.native_vlan,
+            'duplex': self.duplex,
+            'version': self.version,
+            'mgmt_address': self.mgmt_address,
         }
         return resp
 
@@ -94,23 +180,43 @@ class CDPEntry():
     def shorten_interface(port, length=2):
         """
         Shortens the Interface Description.
+        A port which is missing or has no number is returned unchanged.
         """
-        prefix_re = r'^\w{%s}' % length
-        prefix = re.search(prefix_re, port).group(0)
-        suffix = re.search(r'\d.*$', port).group(0)
-        return '{0}{1}'.format(prefix, suffix)
+        if port is None:
+            return port
+        prefix = re.search(r'^\w{%s}' % length, port)
+        suffix = re.search(r'\d.*$', port)
+        if prefix is None or suffix is None:
+            return port
+        return '{0}{1}'.format(prefix.group(0), suffix.group(0))
 
     def get_all_properties(self, block):
         """
         This method takes in a block and extract out of it the values
+        in a single scan, the first occurrence of every label wins
         """
-        for key, val in _KEYS.items():
-            self.__dict__[key] = self._extract_keys(val, block)
+        for key in self.FIELDS:
+            setattr(self, key, None)
+        management = False
+        for res in _FIELDS_RE.finditer(block):
+            key = res.lastgroup
+            if key == 'management':
+                management = True
+                continue
+            ret = res.group(res.lastindex + 1).strip()
+            if key in self._INTERN:
+                ret = sys.intern(ret)
+            if key == 'ip_address' and management and self.mgmt_address is None:
+                self.mgmt_address = ret
+            if getattr(self, key) is None:
+                setattr(self, key, ret)
 
     def remove_domain(self):
         """
         Removes the domain portion of the device_id
         """
+        if self.device_id is None:
+            return None
         return self.device_id.split('.')[0]
 
     def create_interface_description(self, length=2, remove_domain=True, delimiter=':'):
@@ -134,20 +240,45 @@ class Device():
     """
 
     def __init__(self, cdp_input, hostname=None):
+        """
+        cdp_input is the output as a string or any iterable of its lines,
+        an iterable is parsed as a stream and not kept
+        """
         self.hostname = hostname
         self.cdp_entries = []
-        self.cdp_input = cdp_input
-        self._split_to_blocks()
-        self._get_all_entries()
+        if isinstance(cdp_input, str):
+            self.cdp_input = cdp_input
+            lines = io.StringIO(cdp_input)
+        else:
+            self.cdp_input = None
+            lines = cdp_input
+        self._get_all_entries(iter_blocks(lines))
+
+    @classmethod
+    def from_file(cls, file_name, hostname=None):
+        """
+        Parses a saved output file as a stream, the hostname is taken from
+        the prompt of the first line if not given
+        """
+        with open(file_name) as input_f:
+            first_line = input_f.readline()
+            if hostname is None:
+                rr = re.match(r'^([^#]*)#', first_line)
+                if rr:
+                    hostname = rr.group(1)
+            return cls(itertools.chain([first_line], input_f), hostname=hostname)
 
     def __repr__(self):
         return 'Device: {}'.format(self.hostname)
 
-    def _split_to_blocks(self):
-        self.blocks = re.findall(r'-----+((?:.*|\n+)+?)(?:-|$)', self.cdp_input)
+    @property
+    def blocks(self):
+        if self.cdp_input is None:
+            return []
+        return list(iter_blocks(io.StringIO(self.cdp_input)))
 
-    def _get_all_entries(self):
-        for block in self.blocks:
+    def _get_all_entries(self, blocks):
+        for block in blocks:
             cdp_entry = CDPEntry()
             cdp_entry.get_all_properties(block)
             self.cdp_entries.append(cdp_entry)
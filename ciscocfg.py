@@ -5,9 +5,15 @@ import json
 import re
 import glob
 import os
+import sys
+from functools import partial
+from time import perf_counter
 import alexlibs.cdp as cdp
-from ciscoconfparse import CiscoConfParse
-from netaddr import IPAddress, IPNetwork
+import alexlibs.export as csv_export
+from alexlibs.table import ColumnTable
+from alexlibs.vlans import VlanSet, ALLOWED_ALL, DEFAULT_VLANS
+from alexlibs.topology import Topology
+from alexlibs.ipindex import SubnetIndex, ipv4_to_int, int_to_ipv4, netmask_bits, prefixlen_to_mask
 
 _KEYS_L3_INT = {
     'name': r'^interface',
@@ -43,6 +49,90 @@ _KEYS_VLAN = {
 }
 
 
+def _literal_keyword(pattern):
+    """
+    Returns the longest literal word which every match of the pattern contains,
+    or None if the pattern is too complex to tell
+    """
+    stripped = re.sub(r'\\.|\[[^\]]*\]|\(\?[^)]*\)', ' ', pattern)
+    if '|' in stripped or re.search(r'[\w)-][?*+{]', stripped):
+        return None
+    words = re.findall(r'[A-Za-z][\w-]*', stripped)
+    if not words:
+        return None
+    return max(words, key=len)
+
+
+class RuleTable():
+    """This Class represents a compiled _KEYS_* table
+
+    Every rule is compiled once. A single scan over the line finds the literal
+    keywords of the rules, and only the rules whose keyword is present are searched.
+    The rules keep the search function of their regex, so a profiled table can wrap them.
+    """
+
+    def __init__(self, keys, flags=0):
+        self.rules = []
+        for key, pattern in keys.items():
+            regex = re.compile(r'{}\s?(.*)'.format(pattern), flags)
+            self.rules.append((key, regex.search, _literal_keyword(pattern)))
+        keywords = sorted({keyword for _, _, keyword in self.rules if keyword is not None}, key=len, reverse=True)
+        self._find_keywords = re.compile('(?=({}))'.format('|'.join(map(re.escape, keywords)))).findall if keywords else None
+        # A keyword hides the shorter keywords starting at the same position
+        self._implied = {keyword: {kw for kw in keywords if kw in keyword} for keyword in keywords}
+
+    def match(self, line):
+        """
+        Returns a list of (key, match) for every rule matching the line, in table order
+        """
+        found = set()
+        if self._find_keywords is not None:
+            for keyword in self._find_keywords(line):
+                found |= self._implied[keyword]
+        resp = []
+        for key, search, keyword in self.rules:
+            if keyword is None or keyword in found:
+                res = search(line)
+                if res:
+                    resp.append((key, res))
+        return resp
+
+
+class ProfiledRuleTable(RuleTable):
+    """This Class represents a RuleTable counting the cost of its rules
+
+    It stands in for a table while alexlibs.profiling.profile_parsing is active:
+    the keyword scan and every rule searched are counted (invocations, matches, time).
+    """
+
+    def __init__(self, table, name, profile):
+        self.table = table
+        self.name = name
+        self.profile = profile
+        self.rules = [(key, self._timed(key, search), keyword) for key, search, keyword in table.rules]
+        self._find_keywords = None if table._find_keywords is None else self._timed('(keywords)', table._find_keywords)
+        self._implied = table._implied
+
+    def _timed(self, key, func):
+        """
+        returns func counted as the rule key of the table
+        """
+        add = self.profile.add_rule
+        name = self.name
+
+        def timed(line):
+            start = perf_counter()
+            res = func(line)
+            add(name, key, bool(res), perf_counter() - start)
+            return res
+        return timed
+
+
+_RULES_L3_INT = RuleTable(_KEYS_L3_INT)
+_RULES_L2_INT = RuleTable(_KEYS_L2_INT, re.DOTALL)
+_RULES_VLAN = RuleTable(_KEYS_VLAN, re.DOTALL)
+
+
 class L3Interface():
     """[Class L3Interface]
 
@@ -50,6 +140,11 @@ class L3Interface():
         [type] -- [description]
     """
 
+    FIELDS = ('name', 'desc', 'subint', 'status', 'ipv4', 'ipv4_sec', 'net', 'hsrp_num', 'hsrp_ip',
+              'hsrp_pri', 'ip_helper', 'access_list', 'vrf')
+    __slots__ = FIELDS + ('_ipv4_cache',)
+    _INTERN = frozenset(('vrf', 'status'))
+
     def __init__(self):
         self.name = ""
         self.desc = ""
@@ -64,22 +159,67 @@ class L3Interface():
         self.ip_helper = ""
         self.access_list = ""
         self.vrf = ""
+        self._ipv4_cache = None
+
+    def _ipv4_derived(self):
+        """
+        returns (address, prefixlen) of ipv4 as integers, computed once per ipv4 value
+        """
+        if self._ipv4_cache is None or self._ipv4_cache[0] is not self.ipv4:
+            addr, mask = self.ipv4.split()[:2]
+            ip_int = ipv4_to_int(addr)
+            mask_int = ipv4_to_int(mask)
+            if ip_int is None or mask_int is None:
+                # Not a plain dotted quad, let netaddr validate it as before
+                from netaddr import IPAddress
+                ip_int = int(IPAddress(addr.strip()))
+                prefixlen = IPAddress(mask.strip()).netmask_bits()
+            else:
+                prefixlen = netmask_bits(mask_int)
+            self._ipv4_cache = (self.ipv4, ip_int, prefixlen)
+        return self._ipv4_cache[1], self._ipv4_cache[2]
+
+    @property
+    def ipv4_int(self):
+        if self.ipv4 == "":
+            return None
+        return self._ipv4_derived()[0]
+
+    @property
+    def ipv4_prefixlen(self):
+        if self.ipv4 == "":
+            return None
+        return self._ipv4_derived()[1]
+
+    @property
+    def ipv4_network_int(self):
+        if self.ipv4 == "":
+            return None
+        ip_int, prefixlen = self._ipv4_derived()
+        return ip_int & prefixlen_to_mask(prefixlen)
+
+    @property
+    def ipv4_prefix(self):
+        if self.ipv4 == "":
+            return ""
+        return f'{self.ipv4.split()[0].strip()}/{self._ipv4_derived()[1]}'
+
+    @property
+    def ipv4_net(self):
+        if self.ipv4 == "":
+            return ""
+        return f'{int_to_ipv4(self.ipv4_network_int)}/{self._ipv4_derived()[1]}'
 
     @property
     def dict(self):
         # print(f'{self.name} == {self.ipv4}')
-        ipv4_w_prf = ""
-        ipv4_net_calc = ""
-        if self.ipv4 != "":
-            ipv4_w_prf = f'{self.ipv4.split()[0].strip()}/{IPAddress(self.ipv4.split()[1].strip()).netmask_bits()}'
-            ipv4_net_calc = f'{IPNetwork(ipv4_w_prf).network}/{IPAddress(self.ipv4.split()[1].strip()).netmask_bits()}'
         resp = {
             'name': self.name,
             'desc': self.desc,
             'subint': self.subint,
             'status': self.status,
-            'ipv4': f'{ipv4_w_prf}',
-            'ipv4_net': f'{ipv4_net_calc}',
+            'ipv4': self.ipv4_prefix,
+            'ipv4_net': self.ipv4_net,
             'ipv4_sec': self.ipv4_sec,
             'net': self.net,
             'hsrp_num': self.hsrp_num,
@@ -96,23 +236,17 @@ class L3Interface():
     def json(self):
         return json.dumps(self.dict)
 
-    @staticmethod
-    def _extract_keys(pattern, string):
-        res = re.search(r'{}\s?(.*)'.format(pattern), string)
-        if res:
-            return res.group(1).split(',')[0].strip()
-        return ""
-
     def get_all_properties(self, block):
-        for key, val in _KEYS_L3_INT.items():
-            ret = self._extract_keys(val, block)
+        for key, res in _RULES_L3_INT.match(block):
+            ret = res.group(1).split(',')[0].strip()
             # print(f'ret: {ret}')
-            if ret is not "":
+            if ret != "":
                 # print(f'Key: {key:15s} Val: {ret}')
-                if self.__dict__[key] is "":
-                    self.__dict__[key] = ret
+                val = getattr(self, key)
+                if val == "":
+                    setattr(self, key, sys.intern(ret) if key in self._INTERN else ret)
                 else:
-                    self.__dict__[key] += f', {ret}'
+                    setattr(self, key, f'{val}, {ret}')
 
 
 class L2Interface():
@@ -122,6 +256,11 @@ class L2Interface():
         [type] -- [description]
     """
 
+    FIELDS = ('name', 'desc', 'mode', 'status', 'access_vlan', 'trunk_allowed', 'channel_group',
+              'channel_mode', 'span_tree', 'speed')
+    __slots__ = FIELDS + ('trunk_vlans',)
+    _INTERN = frozenset(('mode', 'status', 'access_vlan', 'channel_mode', 'span_tree', 'speed'))
+
     def __init__(self):
         self.name = None
         self.desc = None
@@ -133,6 +272,7 @@ class L2Interface():
         self.channel_mode = None
         self.span_tree = None
         self.speed = None
+        self.trunk_vlans = None
 
     @property
     def dict(self):
@@ -154,19 +294,26 @@ class L2Interface():
     def json(self):
         return json.dumps(self.dict)
 
-    @staticmethod
-    def _extract_keys(pattern, string):
-        res = re.search(r'{}\s?(.*)'.format(pattern), string, re.DOTALL)
-        if res:
-            return res.group(1).strip()
-        return None
-
     def get_all_properties(self, block):
-        for key, val in _KEYS_L2_INT.items():
-            ret = self._extract_keys(val, block)
-            if ret is not None:
-                print(f'Key: {key:15s} Val: {ret}')
-                self.__dict__[key] = ret
+        for key, res in _RULES_L2_INT.match(block):
+            ret = res.group(1).strip()
+            print(f'Key: {key:15s} Val: {ret}')
+            setattr(self, key, sys.intern(ret) if key in self._INTERN else ret)
+            if key == 'trunk_allowed':
+                self.trunk_vlans = self.allowed_vlans.apply_allowed(ret)
+
+    @property
+    def allowed_vlans(self):
+        """
+        returns the VlanSet allowed on the trunk, all VLANs without an allowed vlan line
+        """
+        if self.trunk_vlans is None:
+            return ALLOWED_ALL.copy()
+        return self.trunk_vlans
+
+    @property
+    def is_trunk(self):
+        return self.mode == 'trunk' or self.trunk_vlans is not None
 
 
 class Vlan():
@@ -176,6 +323,9 @@ class Vlan():
         [type] -- [description]
     """
 
+    FIELDS = ('vlan', 'name')
+    __slots__ = FIELDS
+
     def __init__(self):
         self.vlan = None
         self.name = None
@@ -195,23 +345,13 @@ class Vlan():
     def json(self):
         return json.dumps(self.dict)
 
-    @staticmethod
-    def _extract_keys(pattern, string):
-        res = re.search(r'{}\s?(.*)'.format(pattern), string, re.DOTALL)
-        # print(f'string: {string}')
-        if res:
-            return res.group(1).strip()
-            # .split(',')[0].strip()
-        return None
-
     def get_all_properties(self, block):
-        for key, val in _KEYS_VLAN.items():
-            ret = self._extract_keys(val, block)
-            if ret is not None:
-                if key == 'vlan':
-                    ret = int(ret)
-                self.__dict__[key] = ret
-                # print(f'Key: {key:15s} Val: {self.__dict__[key]}')
+        for key, res in _RULES_VLAN.match(block):
+            ret = res.group(1).strip()
+            if key == 'vlan':
+                ret = int(ret)
+            setattr(self, key, ret)
+            # print(f'Key: {key:15s} Val: {getattr(self, key)}')
 
 
 class CiscoDevice():
@@ -224,61 +364,81 @@ class CiscoDevice():
     def __init__(self, file_input, hostname=None, flag_l3_int=False, flag_vlans=False, flag_l2_int=False):
         self.hostname = hostname
         self.l3_int_entries = []
-        self.vlan_entries = []
+        self.vlans = VlanSet()
+        self.vlan_names = dict()
         self.l2_int_entries = []
         self.file_input = file_input
-        if flag_l3_int:
-            self._get_all_l3_int_entries()
-        if flag_vlans:
-            self._get_all_vlans_entries()
-        if flag_l2_int:
-            self._get_all_l2_int_entries()
-
-    def _get_all_l3_int_entries(self):
+        if flag_l3_int or flag_vlans or flag_l2_int:
+            self._get_all_entries(flag_l3_int, flag_vlans, flag_l2_int)
+
+    def _get_all_entries(self, flag_l3_int, flag_vlans, flag_l2_int):
+        """Parse the config once and fill L3, L2 and VLAN entries in the same pass
+        """
+        # imported on first use, it takes longer to import than most configs to parse
+        from ciscoconfparse import CiscoConfParse
         parse = CiscoConfParse(self.file_input)
         self.hostname = parse.re_match_iter_typed(r'^hostname\s+(\S+)', default='None')
-        for obj in parse.find_objects_w_child(r'^interface', r'^\s*ip address'):
-            cisco = L3Interface()
+        for obj in parse.find_objects(r'^(?:interface|vlan\s*\d+)'):
+            if obj.text.startswith('interface'):
+                if obj.re_search_children(r'^\s*ip address'):
+                    if flag_l3_int:
+                        self._add_l3_int_entry(obj)
+                elif not obj.re_search_children(r'^\s*(no)?\s*ip address'):
+                    if flag_l2_int:
+                        self._add_l2_int_entry(obj)
+            elif flag_vlans:
+                self._add_vlans_entries(obj)
+
+    def _add_l3_int_entry(self, obj):
+        cisco = L3Interface()
+        cisco.get_all_properties(obj.text)
+        for obj_child in obj.children:
+            cisco.get_all_properties(obj_child.text)
+        self.l3_int_entries.append(cisco)
+
+    def _add_l2_int_entry(self, obj):
+        print(f'Hostname: {self.hostname}  Interface: {obj.text}')
+        cisco = L2Interface()
+        cisco.get_all_properties(obj.text)
+        for obj_child in obj.children:
+            cisco.get_all_properties(obj_child.text)
+        self.l2_int_entries.append(cisco)
+
+    def _add_vlans_entries(self, obj):
+        if re.search(r'[,-]', obj.text):
+            self.vlans |= VlanSet.from_string(obj.text.split()[1])
+        else:
+            cisco = Vlan()
             cisco.get_all_properties(obj.text)
             for obj_child in obj.children:
                 cisco.get_all_properties(obj_child.text)
-            self.l3_int_entries.append(cisco)
+            self.vlans.add(cisco.vlan)
+            if cisco.name is not None:
+                self.vlan_names[cisco.vlan] = cisco.name
 
-    def _get_all_l2_int_entries(self):
-        parse = CiscoConfParse(self.file_input)
-        self.hostname = parse.re_match_iter_typed(r'^hostname\s+(\S+)', default='None')
-        for obj in parse.find_objects_wo_child(r'^interface', r'^\s*(no)?\s*ip address'):
-            print(f'Hostname: {self.hostname}  Interface: {obj.text}')
-            cisco = L2Interface()
-            cisco.get_all_properties(obj.text)
-            for obj_child in obj.children:
-                cisco.get_all_properties(obj_child.text)
-            self.l2_int_entries.append(cisco)
+    @property
+    def vlan_entries(self):
+        """
+        returns a Vlan object per defined VLAN, in VLAN order
+        """
+        resp = []
+        for vl in self.vlans:
+            cisco = Vlan()
+            cisco.vlan = vl
+            cisco.name = self.vlan_names.get(vl)
+            resp.append(cisco)
+        return resp
 
-    def _get_all_vlans_entries(self):
-        parse = CiscoConfParse(self.file_input)
-        self.hostname = parse.re_match_iter_typed(r'^hostname\s+(\S+)', default='None')
-        for obj in parse.find_objects(r'^vlan\s*\d+'):
-                # print('*'*80)
-            if re.search(r'[,-]', obj.text):
-                lst = obj.text.split()[1]
-                for vl in lst.split(','):
-                    if vl.isdigit():
-                        cisco = Vlan()
-                        cisco.get_all_properties(f'vlan {vl}')
-                        self.vlan_entries.append(cisco)
-                    else:
-                        (ib, ie) = list(vl.strip().split('-'))
-                        for jj in range(int(ib), int(ie) + 1):
-                            cisco = Vlan()
-                            cisco.get_all_properties(f'vlan {jj}')
-                            self.vlan_entries.append(cisco)
-            else:
-                cisco = Vlan()
-                cisco.get_all_properties(obj.text)
-                for obj_child in obj.children:
-                    cisco.get_all_properties(obj_child.text)
-                self.vlan_entries.append(cisco)
+    @property
+    def trunk_vlans(self):
+        """
+        returns the VlanSet of all VLANs allowed on the trunks of the device
+        """
+        resp = VlanSet()
+        for ent in self.l2_int_entries:
+            if ent.is_trunk:
+                resp |= ent.allowed_vlans
+        return resp
 
     @property
     def l3_int_dict(self):
@@ -287,6 +447,35 @@ class CiscoDevice():
         return resp
 
 
+def parse_config_file(file_cfg, flag_l3_int=True, flag_vlans=False, flag_l2_int=False):
+    return CiscoDevice(file_cfg, flag_l3_int=flag_l3_int, flag_vlans=flag_vlans, flag_l2_int=flag_l2_int)
+
+
+def parse_cdp_file(file_cdp):
+    return cdp.Device.from_file(file_cdp)
+
+
+def _safe_parse(parse_func, file_name):
+    try:
+        return parse_func(file_name), None
+    except Exception as err:
+        return None, f'{type(err).__name__}: {err}'
+
+
+def parse_files(parse_func, files, workers=1):
+    """
+    Parses files in this process or, with workers > 1, in a process pool.
+    Returns a (device, error) tuple per file, in the order of files.
+    """
+    func = partial(_safe_parse, parse_func)
+    if workers > 1 and len(files) > 1:
+        from concurrent.futures import ProcessPoolExecutor
+        chunksize = max(1, len(files) // (workers * 4))
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            return list(executor.map(func, files, chunksize=chunksize))
+    return [func(file_name) for file_name in files]
+
+
 class ListDevices():
     """[Class CiscoDevice]
 
@@ -294,144 +483,178 @@ class ListDevices():
         [type] -- [description]
     """
 
-    def __init__(self, path_to_config, path_to_cdp=None, flag_l3_int=True, flag_vlans=False, flag_l2_int=False):
+    def __init__(self, path_to_config, path_to_cdp=None, flag_l3_int=True, flag_vlans=False, flag_l2_int=False, workers=1, cache=None):
         self.hostnames = []
         self.hostnames_cdp = []
+        self.parse_errors = []
         self.l3_networks_groups = dict()
         self.flag_l3_int = flag_l3_int
         self.flag_l2_int = flag_l2_int
         self.flag_vlans = flag_vlans
+        self.workers = workers
+        self.cache = cache
         self.path_to_config = f'{path_to_config}'
         self.path_to_cdp = f'{path_to_cdp}'
         self.files_of_config = list(glob.glob(self.path_to_config))
         if path_to_cdp is not None:
             self.files_of_cdp = list(glob.glob(self.path_to_cdp))
             # print(f'CDP Files: {self.files_of_cdp}')
-            for file_cdp in self.files_of_cdp:
-                with open(file_cdp) as input_f:
-                    cdp_file = input_f.read()
-                rr = re.match(r'^([^#]*)#.*\s*', cdp_file)
-                if rr:
-                    hostname = rr.group(1)
-                dev = cdp.Device(cdp_file, hostname=hostname)
-                self.hostnames_cdp.append(dev)
-                # print(f'hostname cdp: {dev.hostname}')
-        for file_cfg in self.files_of_config:
-            cisco = CiscoDevice(file_cfg, flag_l3_int=self.flag_l3_int, flag_vlans=self.flag_vlans, flag_l2_int=self.flag_l2_int)
-            # print(f'Hostname: {cisco.hostname:15s} File: {file_cfg} ')
-            self.hostnames.append(cisco)
+            self.hostnames_cdp = self._parse_files(parse_cdp_file, self.files_of_cdp, 'cdp')
+        parse_config = partial(parse_config_file, flag_l3_int=self.flag_l3_int, flag_vlans=self.flag_vlans, flag_l2_int=self.flag_l2_int)
+        self.hostnames = self._parse_files(parse_config, self.files_of_config,
+                                           'config', self.flag_l3_int, self.flag_vlans, self.flag_l2_int)
+
+    def _parse_files(self, parse_func, files, *cache_params):
+        """
+        Parses files in this process or, with workers > 1, in a process pool.
+        Results keep the order of files, a failed file is recorded in parse_errors and skipped.
+        With a cache, unchanged files are loaded from it and only the rest is parsed.
+        """
+        results = [None] * len(files)
+        keys = [None] * len(files)
+        if self.cache is not None:
+            for idx, file_name in enumerate(files):
+                try:
+                    keys[idx] = self.cache.key_for_file(file_name, *cache_params)
+                except OSError:
+                    continue
+                dev = self.cache.get(keys[idx])
+                if dev is not None:
+                    if isinstance(dev, CiscoDevice):
+                        dev.file_input = file_name
+                    results[idx] = (dev, None)
+        todo = [idx for idx, res in enumerate(results) if res is None]
+        parsed = parse_files(parse_func, [files[idx] for idx in todo], workers=self.workers)
+        for idx, res in zip(todo, parsed):
+            results[idx] = res
+            if self.cache is not None and keys[idx] is not None and res[1] is None:
+                self.cache.put(keys[idx], res[0])
+        resp = []
+        for file_name, (dev, error) in zip(files, results):
+            if error is not None:
+                print(f'Error parsing {file_name}: {error}')
+                self.parse_errors.append((file_name, error))
+            else:
+                resp.append(dev)
+        return resp
 
-    def create_csv_vlans(self, out_dir="output"):
-        self._check_exit_dir(out_dir)
+    def vlans_allowed_not_defined(self):
+        """
+        returns a dictionary hostname -> {interface: VlanSet} of VLANs allowed on trunks but not defined,
+        only explicit allowed lists are checked (not 'all' or no allowed line) and the default VLANs are left out
+        """
+        resp = dict()
+        for cisco in self.hostnames:
+            for ent in cisco.l2_int_entries:
+                if ent.is_trunk and ent.trunk_vlans is not None and ent.trunk_vlans != ALLOWED_ALL:
+                    missing = ent.trunk_vlans - cisco.vlans - DEFAULT_VLANS
+                    if missing:
+                        resp.setdefault(cisco.hostname, dict())[ent.name] = missing
+        return resp
+
+    def vlans_missing_on_neighbors(self):
+        """
+        returns a dictionary (hostname, local port, neighbor) -> VlanSet of VLANs defined
+        on the device but not on its CDP neighbor
+        """
+        devices = {f'{cisco.hostname}'.lower(): cisco for cisco in self.hostnames}
+        resp = dict()
+        for dev in self.hostnames_cdp:
+            cisco = devices.get(f'{dev.hostname}'.lower())
+            if cisco is None:
+                continue
+            for ent in dev.cdp_entries:
+                neighbor = devices.get(ent.remove_domain().lower())
+                if neighbor is None:
+                    continue
+                missing = cisco.vlans - neighbor.vlans
+                if missing:
+                    resp[(cisco.hostname, ent.local_port, neighbor.hostname)] = missing
+        return resp
+
+    def l3_int_table(self):
+        """
+        returns a column table of the L3 interfaces of all devices
+        """
+        table = ColumnTable(('hostname',) + L3Interface.FIELDS, categorical=('hostname', 'vrf', 'status'))
+        for cisco in self.hostnames:
+            table.extend(cisco.l3_int_entries, hostname=cisco.hostname)
+        return table
+
+    def l2_int_table(self):
+        """
+        returns a column table of the L2 interfaces of all devices
+        """
+        table = ColumnTable(('hostname',) + L2Interface.FIELDS,
+                            categorical=('hostname', 'mode', 'status', 'access_vlan', 'speed'))
+        for cisco in self.hostnames:
+            table.extend(cisco.l2_int_entries, hostname=cisco.hostname)
+        return table
+
+    def subnet_index(self):
+        """
+        returns a SubnetIndex of the primary, secondary and HSRP addresses of all devices
+        """
+        return SubnetIndex.from_devices(self.hostnames)
+
+    def topology(self):
+        """
+        returns the Topology of the cdp entries of all devices
+        """
+        return Topology.from_devices(self.hostnames_cdp)
+
+    def vlan_table(self):
+        """
+        returns a column table of the vlans of all devices
+        """
+        table = ColumnTable(('hostname',) + Vlan.FIELDS, categorical=('hostname', 'name'))
         for cisco in self.hostnames:
-            # print(f'{cisco.hostname}')
-            if cisco.vlan_entries:
-                with open(f'{out_dir}/{cisco.hostname}_vlans.csv', 'w') as fs:
-                    fs.write(f'Vlan;Name\n')
-                    for ent in cisco.vlan_entries:
-                        # print(f"VLAN: {ent.vlan} = {name}")
-                        fs.write('{vlan};{name}\n'.format_map(ent.dict))
+            table.extend(cisco.vlan_entries, hostname=cisco.hostname)
+        return table
+
+    def cdp_table(self):
+        """
+        returns a column table of the cdp entries of all devices
+        """
+        table = ColumnTable(('hostname',) + cdp.CDPEntry.FIELDS,
+                            categorical=('hostname', 'platform', 'capabilities', 'native_vlan', 'duplex', 'version'))
+        for dev in self.hostnames_cdp:
+            table.extend(dev.cdp_entries, hostname=dev.hostname)
+        return table
+
+    def export(self, out_dir="output", reports=tuple(csv_export.REPORTS)):
+        """
+        Writes the requested CSV reports (names of alexlibs.export.REPORTS) in a single pass over the devices
+        """
+        csv_export.export(self.hostnames, self.hostnames_cdp, out_dir=out_dir, reports=reports,
+                          l3_networks_groups=self.l3_networks_groups)
+
+    def create_csv_vlans(self, out_dir="output"):
+        self.export(out_dir, reports=('vlans',))
 
     def create_csv_vlans_all(self, out_dir="output"):
-        self._check_exit_dir(out_dir)
-        with open(f'{out_dir}/all_vlans.csv', 'w') as fs:
-            fs.write(f'Vlan;Name;Hosname\n')
-            for cisco in self.hostnames:
-                # print(f'{cisco.hostname}')
-                if cisco.vlan_entries:
-                    for ent in cisco.vlan_entries:
-                        fs.write('{vlan};{name}'.format_map(ent.dict) + f';{cisco.hostname}\n')
+        self.export(out_dir, reports=('vlans_all',))
 
     def create_csv_l3_int(self, out_dir="output"):
-        self._check_exit_dir(out_dir)
-        for cisco in self.hostnames:
-            print(f'{cisco.hostname}\n')
-            if cisco.l3_int_entries:
-                with open(f'{out_dir}/{cisco.hostname}_l3_int.csv', 'w') as fs:
-                    fs.write(f'NameInt;Desc;Vrf;SubInt;IPv4;IPv4Sec;Status;HSRP_Num;HSRP_IP;HSRP_Pri;IP_Helper\n')
-                    for ent in cisco.l3_int_entries:
-                        # print(f'All: {ent.dict}\n')
-                        # print(f"VLAN: {ent.name} = {ent.ipv4}")
-                        if ent.ipv4 != "":
-                            fs.write('{name};{desc};{vrf};{subint};{ipv4};{ipv4_sec};{status};{hsrp_num};{hsrp_ip};{hsrp_pri};{ip_helper}\n'.format_map(ent.dict))
+        self.export(out_dir, reports=('l3_int',))
 
     def create_csv_l3_int_all(self, out_dir="output"):
-        self._check_exit_dir(out_dir)
-        with open(f'{out_dir}/all_l3_int.csv', 'w') as fs:
-            fs.write(f'Hostname;NameInt;Desc;Vrf;SubInt;IPv4;IPv4Sec;IPV_Net;Status;AccessList;HSRP_Num;HSRP_IP;HSRP_Pri;IP_Helper\n')
-            for cisco in self.hostnames:
-                # print(f'{cisco.hostname}')
-                fs.write(f'=====;;;;;;;;;;;;;\n')
-                if cisco.l3_int_entries:
-                    for ent in cisco.l3_int_entries:
-                        if ent.ipv4 != "":
-                            fs.write(f'{cisco.hostname};' + '{name};{desc};{vrf};{subint};{ipv4};{ipv4_sec};{ipv4_net};{status};{access_list};{hsrp_num};{hsrp_ip};{hsrp_pri};{ip_helper}\n'.format_map(ent.dict))
+        self.export(out_dir, reports=('l3_int_all',))
 
     def create_csv_l3_int_network(self, out_dir="output"):
-        self._check_exit_dir(out_dir)
-        # l3_network_groups = dict()
-        for cisco in self.hostnames:
-            # print(f'{cisco.hostname}')
-            if cisco.l3_int_entries:
-                for ent in cisco.l3_int_entries:
-                    # print(f'{ent.dict["ipv4_net"]}')
-                    desc_int = dict()
-                    desc_int['name'] = f'{cisco.hostname}'
-                    desc_int['ip'] = ent.dict['ipv4']
-                    desc_int['int'] = ent.dict['name']
-                    desc_int['desc'] = ent.dict['desc']
-                    if f'{ent.dict["ipv4_net"]}' not in self.l3_networks_groups:
-                        self.l3_networks_groups[f'{ent.dict["ipv4_net"]}'] = list()
-                    self.l3_networks_groups[f'{ent.dict["ipv4_net"]}'].append(desc_int)
-        with open(f'{out_dir}/all_net_l3_int.csv', 'w') as fs:
-            fs.write(f'Networks;Hostname;Interface;IP_Address;Desc\n')
-            for net in sorted(self.l3_networks_groups):
-                # print(f'{net}')
-                fs.write(f'{net}\n')
-                for net_int in self.l3_networks_groups[net]:
-                    fs.write(';{name};{int};{ip};{desc}\n'.format_map(net_int))
+        self.export(out_dir, reports=('l3_int_network',))
 
     def create_csv_l2_int(self, out_dir="output"):
-        self._check_exit_dir(out_dir)
-        for cisco in self.hostnames:
-            # print(f'{cisco.hostname}')
-            if cisco.l2_int_entries:
-                with open(f'{out_dir}/{cisco.hostname.lower()}_l2_int.csv', 'w') as fs:
-                    fs.write(f'NameInt;Desc;status;mode;access_vlan;trunk_allowed;channel_group;channel_mode;span_tree;speed\n')
-                    for ent in cisco.l2_int_entries:
-                        # print(f"VLAN: {ent.name} = {ent.ipv4}")
-                        fs.write('{name};{desc};{status};{mode};{access_vlan};{trunk_allowed};{channel_group};{channel_mode};{span_tree};{speed}\n'.format_map(ent.dict))
+        self.export(out_dir, reports=('l2_int',))
 
     def create_csv_l2_int_all(self, out_dir="output"):
-        self._check_exit_dir(out_dir)
-        with open(f'{out_dir}/all_l2_int.csv', 'w') as fs:
-            fs.write(f'HostName;NameInt;Desc;status;mode;access_vlan;trunk_allowed;channel_group;channel_mode;span_tree;speed\n')
-            for cisco in self.hostnames:
-                # print(f'{cisco.hostname}')
-                if cisco.l2_int_entries:
-                    for ent in cisco.l2_int_entries:
-                        fs.write(f'{cisco.hostname.upper()};' + '{name};{desc};{status};{mode};{access_vlan};{trunk_allowed};{channel_group};{channel_mode};{span_tree};{speed}\n'.format_map(ent.dict))
+        self.export(out_dir, reports=('l2_int_all',))
 
     def create_csv_cdp(self, out_dir="output"):
-        self._check_exit_dir(out_dir)
-        for cisco in self.hostnames_cdp:
-            # print(f'{cisco.hostname}')
-            if cisco.dict:
-                with open(f'{out_dir}/{cisco.hostname}_cdp.csv', 'w') as fs:
-                    fs.write(f'LocalName;LocalPort;RemoteName;RemotePort;RemotePlatform;RemoteIP\n')
-                    for ent in cisco.dict:
-                        # print(f"VLAN: {ent.name} = {ent.ipv4}")
-                        fs.write(f'{cisco.hostname};' + '{local_port};{device_id};{remote_port};{platform};{ip_address}\n'.format_map(ent))
+        self.export(out_dir, reports=('cdp',))
 
     def create_csv_cdp_all(self, out_dir="output"):
-        self._check_exit_dir(out_dir)
-        with open(f'{out_dir}/all_cdp.csv', 'w') as fs:
-            fs.write(f'LocalName;LocalPort;RemoteName;RemotePort;RemotePlatform;RemoteIP\n')
-            for cisco in self.hostnames_cdp:
-                # print(f'{cisco.hostname}')
-                if cisco.dict:
-                    for ent in cisco.dict:
-                        fs.write(f'{cisco.hostname};' + '{local_port};{device_id};{remote_port};{platform};{ip_address}\n'.format_map(ent))
+        self.export(out_dir, reports=('cdp_all',))
 
     def _check_exit_dir(self, path_dir):
         if not os.path.exists(f'{path_dir}'):
@@ -0,0 +1,117 @@
+"""This Module provides the command line of the offline parsing and exports.
+
+It works on saved config and cdp files only and never imports the Nornir
+stack (nornir, netmiko, napalm), so short lived jobs start quickly:
+
+    python -m alexlibs.cli export --config 'output/*-config.txt' [--cdp 'cdp/*.txt'] [--out csv]
+                                  [--reports l3_int,cdp] [--vlans] [--l2] [--workers 4] [--cache .parse_cache]
+                                  [--profile]
+    python -m alexlibs.cli cdp 'cdp/*.txt' [--json]
+    python -m alexlibs.cli diff --old 'old/*-config.txt' --new 'new/*-config.txt'
+                                [--old-cdp 'old/cdp/*'] [--new-cdp 'new/cdp/*'] [--workers 4]
+
+diff exits with 0 without changes, 1 with changes and 2 if files could not be compared.
+"""
+
+import argparse
+import contextlib
+import glob
+import io
+import json
+import sys
+
+
+def cmd_export(args):
+    from alexlibs.ciscocfg import ListDevices
+    from alexlibs.export import REPORTS
+    reports = args.reports.split(',') if args.reports else list(REPORTS)
+    unknown = [name for name in reports if name not in REPORTS]
+    if unknown:
+        print(f'Unknown reports: {",".join(unknown)} (known: {",".join(REPORTS)})')
+        return 2
+    cache = None
+    if args.cache:
+        from alexlibs.cache import ParseCache
+        cache = ParseCache(args.cache)
+    with contextlib.ExitStack() as stack:
+        profile = None
+        if args.profile:
+            from alexlibs.profiling import profile_parsing
+            profile = stack.enter_context(profile_parsing())
+        # the parsers print every L2 interface and the export every device
+        with contextlib.redirect_stdout(io.StringIO()):
+            devices = ListDevices(args.config, args.cdp, flag_l3_int=True, flag_vlans=args.vlans, flag_l2_int=args.l2,
+                                  workers=args.workers, cache=cache)
+            devices.export(args.out, reports=reports)
+    print(f'{len(devices.hostnames)} configs, {len(devices.hostnames_cdp)} cdp files, '
+          f'{len(devices.parse_errors)} errors: {",".join(reports)} written to {args.out}')
+    for file_name, error in devices.parse_errors:
+        print(f'Error parsing {file_name}: {error}')
+    if profile is not None:
+        print(profile.report())
+    return 1 if devices.parse_errors else 0
+
+
+def cmd_cdp(args):
+    import alexlibs.cdp as cdp
+    resp = dict()
+    for file_name in sorted(glob.glob(args.files)):
+        dev = cdp.Device.from_file(file_name)
+        resp[f'{dev.hostname}'] = dev.dict_short
+    if args.json:
+        print(json.dumps(resp, indent=2))
+        return 0
+    for hostname, entries in resp.items():
+        for ent in entries:
+            print(f'{hostname};{ent["local_port"]};{ent["device_id"]};{ent["remote_port"]};{ent["ip_address"]};{ent["platform"]}')
+    return 0
+
+
+def cmd_diff(args):
+    from alexlibs.diff import diff_snapshots
+    with contextlib.redirect_stdout(io.StringIO()):
+        resp = diff_snapshots(args.old, args.new, args.old_cdp, args.new_cdp, workers=args.workers)
+    for key, error in resp.errors:
+        print(f'Error on {key}: {error}')
+    if resp.errors:
+        # the failed devices are not compared, there may be changes
+        print(resp.report() or f'No changes in the other devices ({resp.stats["compared"]} devices compared)')
+        return 2
+    if not (resp.changed or resp.added or resp.removed):
+        print(f'No changes ({resp.stats["compared"]} devices compared)')
+        return 0
+    print(resp.report())
+    return 1
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='alexlibs.cli', description='Offline parsing and export of saved Cisco outputs')
+    commands = parser.add_subparsers(dest='command', required=True)
+    export = commands.add_parser('export', help='parse config/cdp files and write the CSV reports')
+    export.add_argument('--config', required=True, help='glob of the config files')
+    export.add_argument('--cdp', help='glob of the cdp files')
+    export.add_argument('--out', default='output', help='directory of the CSV files')
+    export.add_argument('--reports', help='comma separated reports, all by default')
+    export.add_argument('--vlans', action='store_true', help='parse the VLANs')
+    export.add_argument('--l2', action='store_true', help='parse the L2 interfaces')
+    export.add_argument('--workers', type=int, default=1)
+    export.add_argument('--cache', help='directory of the parse cache')
+    export.add_argument('--profile', action='store_true', help='print the rule counters and the slowest files')
+    export.set_defaults(func=cmd_export)
+    cdp_parser = commands.add_parser('cdp', help='print the neighbors of saved cdp files')
+    cdp_parser.add_argument('files', help='glob of the cdp files')
+    cdp_parser.add_argument('--json', action='store_true')
+    cdp_parser.set_defaults(func=cmd_cdp)
+    diff = commands.add_parser('diff', help='diff two snapshots of config (and cdp) files')
+    diff.add_argument('--old', required=True)
+    diff.add_argument('--new', required=True)
+    diff.add_argument('--old-cdp')
+    diff.add_argument('--new-cdp')
+    diff.add_argument('--workers', type=int, default=1)
+    diff.set_defaults(func=cmd_diff)
+    args = parser.parse_args(argv)
+    return args.func(args)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
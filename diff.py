@@ -0,0 +1,295 @@
+"""This Module provides the diff of two snapshots of config and cdp files.
+
+Files of the two snapshots are paired by device (the file name without
+'-config.txt', '-cdp.txt' or the dated '-output-<date>.markdown' of get_cdp),
+so the config and the cdp file of a device end in one DeviceDiff; files of a
+snapshot with the same device name are reported as errors. Every file gets a content fingerprint first (lines which
+change without a change of the device like the last change timestamps or the
+cdp holdtimes are left out), devices whose fingerprints are equal are skipped
+without being parsed and only the changed ones are parsed and compared.
+"""
+
+import glob
+import hashlib
+import os
+import re
+from functools import partial
+
+from alexlibs.cache import PARSER_VERSION
+from alexlibs.ciscocfg import parse_config_file, parse_cdp_file, parse_files
+from alexlibs.topology import normalize_hostname
+from alexlibs.vlans import VlanSet
+
+# Lines which change without a change of the configuration (or of the cdp neighbors)
+_VOLATILE_RE = re.compile(rb'^(?:! Last configuration change|! NVRAM config last updated|ntp clock-period|'
+                          rb'Building configuration|Current configuration|[ \t]*Holdtime\s*:)[^\n]*\n?', re.MULTILINE)
+
+# Suffixes of the saved files: write_to_file, the cdp files and the dated outputs of get_cdp
+_SUFFIX_RE = re.compile(r'(?:-config\.txt|-cdp\.txt|-output(?:-\d+){5}\.markdown|\.txt|\.markdown)$')
+_DATED_RE = re.compile(r'-output(?:-\d+){5}\.markdown$')
+
+# Watched fields of the interfaces
+L3_FIELDS = ('ipv4', 'ipv4_sec', 'vrf', 'desc', 'status', 'hsrp_ip')
+L2_FIELDS = ('desc', 'status', 'mode', 'access_vlan', 'trunk_allowed', 'channel_group')
+
+
+def device_key(file_name):
+    """
+    returns the name of the device of a snapshot file ('r1-config.txt', 'r1-cdp.txt',
+    'r1/r1-output-2024-01-31-12-00.markdown' -> 'r1')
+    """
+    name = os.path.basename(file_name).lower()
+    return _SUFFIX_RE.sub('', name)
+
+
+def fingerprint(file_name):
+    """
+    returns the content fingerprint of a snapshot file
+    """
+    with open(file_name, 'rb') as input_f:
+        content = _VOLATILE_RE.sub(b'', input_f.read())
+    digest = hashlib.sha1(content)
+    digest.update(repr(PARSER_VERSION).encode())
+    return digest.hexdigest()
+
+
+class DeviceDiff():
+    """
+    This Class represents the changes of a device between two snapshots
+    """
+
+    def __init__(self, device, hostname=None):
+        self.device = device
+        self.hostname = device if hostname is None else hostname
+        self.links_added = []
+        self.links_removed = []
+        self.interfaces_added = []
+        self.interfaces_removed = []
+        self.interfaces_changed = []
+        self.vlans_added = VlanSet()
+        self.vlans_removed = VlanSet()
+
+    def __repr__(self):
+        return 'Device Diff: {}'.format(self.hostname)
+
+    def __bool__(self):
+        return bool(self.links_added or self.links_removed or self.interfaces_added or self.interfaces_removed
+                    or self.interfaces_changed or self.vlans_added or self.vlans_removed)
+
+    @property
+    def dict(self):
+        resp = {
+            'hostname': self.hostname,
+            'links_added': [list(link) for link in self.links_added],
+            'links_removed': [list(link) for link in self.links_removed],
+            'interfaces_added': self.interfaces_added,
+            'interfaces_removed': self.interfaces_removed,
+            'interfaces_changed': [list(change) for change in self.interfaces_changed],
+            'vlans_added': self.vlans_added.to_string(),
+            'vlans_removed': self.vlans_removed.to_string(),
+        }
+        return resp
+
+    @property
+    def lines(self):
+        """
+        returns the changes as lines of a report
+        """
+        resp = []
+        for local_port, neighbor, remote_port in self.links_added:
+            resp.append(f'+ link {local_port} -> {neighbor} {remote_port}')
+        for local_port, neighbor, remote_port in self.links_removed:
+            resp.append(f'- link {local_port} -> {neighbor} {remote_port}')
+        for name in self.interfaces_added:
+            resp.append(f'+ interface {name}')
+        for name in self.interfaces_removed:
+            resp.append(f'- interface {name}')
+        for name, field, old, new in self.interfaces_changed:
+            resp.append(f'~ interface {name} {field}: {old} -> {new}')
+        if self.vlans_added:
+            resp.append(f'+ vlans {self.vlans_added.to_string()}')
+        if self.vlans_removed:
+            resp.append(f'- vlans {self.vlans_removed.to_string()}')
+        return resp
+
+    def compare_config(self, old, new):
+        """
+        Compares two CiscoDevice objects of the device
+        """
+        if new is not None and new.hostname is not None:
+            self.hostname = new.hostname
+        old_ints = _interfaces(old)
+        new_ints = _interfaces(new)
+        self.interfaces_removed.extend(name for name in old_ints if name not in new_ints)
+        self.interfaces_added.extend(name for name in new_ints if name not in old_ints)
+        for name, (fields, new_ent) in new_ints.items():
+            if name not in old_ints:
+                continue
+            old_fields, old_ent = old_ints[name]
+            if old_fields is not fields:
+                self.interfaces_changed.append((name, 'type', _kind(old_fields), _kind(fields)))
+                continue
+            for field in fields:
+                old_val, new_val = getattr(old_ent, field), getattr(new_ent, field)
+                if old_val != new_val:
+                    self.interfaces_changed.append((name, field, old_val, new_val))
+        old_vlans = VlanSet() if old is None else old.vlans
+        new_vlans = VlanSet() if new is None else new.vlans
+        self.vlans_added = new_vlans - old_vlans
+        self.vlans_removed = old_vlans - new_vlans
+
+    def compare_cdp(self, old, new):
+        """
+        Compares two cdp.Device objects of the device
+        """
+        old_links = _links(old)
+        new_links = _links(new)
+        self.links_removed.extend(sorted(old_links - new_links))
+        self.links_added.extend(sorted(new_links - old_links))
+
+
+def _kind(fields):
+    return 'l3' if fields is L3_FIELDS else 'l2'
+
+
+def _interfaces(cisco):
+    """
+    returns a dictionary interface name -> (watched fields, entry)
+    """
+    resp = dict()
+    if cisco is None:
+        return resp
+    for ent in cisco.l2_int_entries:
+        resp[ent.name] = (L2_FIELDS, ent)
+    for ent in cisco.l3_int_entries:
+        resp[ent.name] = (L3_FIELDS, ent)
+    return resp
+
+
+def _links(dev):
+    """
+    returns the set of (local port, neighbor, remote port) of a cdp.Device
+    """
+    if dev is None:
+        return set()
+    return {(ent.local_port, normalize_hostname(ent.device_id), ent.remote_port)
+            for ent in dev.cdp_entries if ent.device_id is not None}
+
+
+class SnapshotDiff():
+    """
+    This Class represents the changes between two snapshots of the fleet
+    """
+
+    def __init__(self):
+        self.devices = dict()
+        self.added = []
+        self.removed = []
+        self.unchanged = []
+        self.errors = []
+        self.stats = {'compared': 0, 'skipped': 0, 'parsed': 0}
+
+    def __repr__(self):
+        return 'Snapshot Diff: {} changed {} added {} removed'.format(len(self.changed), len(self.added), len(self.removed))
+
+    def device(self, key):
+        return self.devices.setdefault(key, DeviceDiff(key))
+
+    @property
+    def changed(self):
+        """
+        returns the DeviceDiff of the devices with changes
+        """
+        return [self.devices[key] for key in sorted(self.devices) if self.devices[key]]
+
+    @property
+    def dict(self):
+        resp = {
+            'changed': [dev_diff.dict for dev_diff in self.changed],
+            'added': self.added,
+            'removed': self.removed,
+            'stats': self.stats,
+            'errors': self.errors,
+        }
+        return resp
+
+    def report(self):
+        """
+        returns a text report of the changes
+        """
+        resp = []
+        for key in self.added:
+            resp.append(f'+ device {key}')
+        for key in self.removed:
+            resp.append(f'- device {key}')
+        for dev_diff in self.changed:
+            resp.append(f'=== {dev_diff.hostname}')
+            resp.extend(f'  {line}' for line in dev_diff.lines)
+        return '\n'.join(resp)
+
+
+def _snapshot_files(resp, path):
+    """
+    returns a dictionary device -> file of a snapshot, of several dated outputs of a device
+    the latest one is kept, other files with the same device name are errors
+    """
+    found = dict()
+    for file_name in sorted(glob.glob(f'{path}')):
+        found.setdefault(device_key(file_name), []).append(file_name)
+    files = dict()
+    for key, names in found.items():
+        if len(names) == 1 or all(_DATED_RE.search(name) for name in names):
+            files[key] = names[-1]
+        else:
+            resp.errors.append((key, f'Same device in several files: {", ".join(names)}'))
+    return files
+
+
+def _pair_files(resp, old_path, new_path):
+    return _snapshot_files(resp, old_path), _snapshot_files(resp, new_path)
+
+
+def _diff_kind(resp, old_files, new_files, parse_func, compare, workers):
+    todo = []
+    for key in sorted(old_files.keys() & new_files.keys()):
+        resp.stats['compared'] += 1
+        try:
+            same = fingerprint(old_files[key]) == fingerprint(new_files[key])
+        except OSError as err:
+            resp.errors.append((key, f'{type(err).__name__}: {err}'))
+            continue
+        if same:
+            resp.stats['skipped'] += 1
+        else:
+            todo.append(key)
+    files = [old_files[key] for key in todo] + [new_files[key] for key in todo]
+    results = parse_files(parse_func, files, workers=workers)
+    resp.stats['parsed'] += len(files)
+    for idx, key in enumerate(todo):
+        (old, old_error), (new, new_error) = results[idx], results[len(todo) + idx]
+        if old_error is not None or new_error is not None:
+            resp.errors.append((key, old_error or new_error))
+            continue
+        compare(resp.device(key), old, new)
+
+
+def diff_snapshots(old_config, new_config, old_cdp=None, new_cdp=None, workers=1):
+    """
+    Compares two snapshots (glob paths of the config and cdp files) device by device.
+    Devices with identical files are not parsed.
+    """
+    resp = SnapshotDiff()
+    parse_config = partial(parse_config_file, flag_l3_int=True, flag_vlans=True, flag_l2_int=True)
+    kinds = [(_pair_files(resp, old_config, new_config), parse_config, DeviceDiff.compare_config)]
+    if old_cdp is not None and new_cdp is not None:
+        kinds.append((_pair_files(resp, old_cdp, new_cdp), parse_cdp_file, DeviceDiff.compare_cdp))
+    old_keys = set().union(*(old_files for (old_files, _), _, _ in kinds))
+    new_keys = set().union(*(new_files for (_, new_files), _, _ in kinds))
+    duplicated = {key for key, _ in resp.errors}
+    resp.removed = sorted(old_keys - new_keys - duplicated)
+    resp.added = sorted(new_keys - old_keys - duplicated)
+    for (old_files, new_files), parse_func, compare in kinds:
+        _diff_kind(resp, old_files, new_files, parse_func, compare, workers)
+    failed = {key for key, _ in resp.errors}
+    resp.unchanged = sorted(key for key in old_keys & new_keys if key not in failed and not resp.devices.get(key))
+    return resp
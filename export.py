@@ -0,0 +1,258 @@
+"""This Module provides the CSV reports of ListDevices.
+
+All requested reports are fed from a single pass over the devices: the
+entries of every device are converted to dictionaries once and handed to
+each report writer. Files are written with the csv module (';' delimiter),
+so values containing ';' or quotes are escaped.
+"""
+
+import csv
+import os
+
+_BUFFER_SIZE = 1 << 16
+
+
+def _writer(fs):
+    return csv.writer(fs, delimiter=';', lineterminator='\n')
+
+
+class Report():
+    """
+    This Class represents a CSV report fed device by device
+    """
+
+    kind = None
+    header = []
+    fields = []
+
+    def __init__(self, out_dir, **kwargs):
+        self.out_dir = out_dir
+
+    def start(self):
+        pass
+
+    def device(self, hostname, rows):
+        pass
+
+    def finish(self):
+        pass
+
+    def keep(self, row):
+        return True
+
+    def row(self, hostname, row):
+        return [f'{row[key]}' for key in self.fields]
+
+
+class PerHostReport(Report):
+    """
+    This Class represents a report written to one file per device
+    """
+
+    suffix = ''
+
+    def file_name(self, hostname):
+        return f'{self.out_dir}/{hostname}_{self.suffix}.csv'
+
+    def device(self, hostname, rows):
+        if not rows:
+            return
+        with open(self.file_name(hostname), 'w', buffering=_BUFFER_SIZE) as fs:
+            writer = _writer(fs)
+            writer.writerow(self.header)
+            writer.writerows(self.row(hostname, row) for row in rows if self.keep(row))
+
+
+class AllReport(Report):
+    """
+    This Class represents a report of all devices written to a single file
+    """
+
+    file_name = ''
+
+    def start(self):
+        self._fs = open(f'{self.out_dir}/{self.file_name}', 'w', buffering=_BUFFER_SIZE)
+        self._writer = _writer(self._fs)
+        self._writer.writerow(self.header)
+
+    def device(self, hostname, rows):
+        self._writer.writerows(self.row(hostname, row) for row in rows if self.keep(row))
+
+    def finish(self):
+        self._fs.close()
+
+
+class VlansReport(PerHostReport):
+    kind = 'vlans'
+    suffix = 'vlans'
+    header = ['Vlan', 'Name']
+    fields = ['vlan', 'name']
+
+
+class VlansAllReport(AllReport):
+    kind = 'vlans'
+    file_name = 'all_vlans.csv'
+    header = ['Vlan', 'Name', 'Hosname']
+    fields = ['vlan', 'name']
+
+    def row(self, hostname, row):
+        return [f'{row["vlan"]}', f'{row["name"]}', f'{hostname}']
+
+
+class L3IntReport(PerHostReport):
+    kind = 'l3'
+    suffix = 'l3_int'
+    header = ['NameInt', 'Desc', 'Vrf', 'SubInt', 'IPv4', 'IPv4Sec', 'Status', 'HSRP_Num', 'HSRP_IP', 'HSRP_Pri', 'IP_Helper']
+    fields = ['name', 'desc', 'vrf', 'subint', 'ipv4', 'ipv4_sec', 'status', 'hsrp_num', 'hsrp_ip', 'hsrp_pri', 'ip_helper']
+
+    def device(self, hostname, rows):
+        print(f'{hostname}\n')
+        super().device(hostname, rows)
+
+    def keep(self, row):
+        return row['ipv4'] != ""
+
+
+class L3IntAllReport(AllReport):
+    kind = 'l3'
+    file_name = 'all_l3_int.csv'
+    header = ['Hostname', 'NameInt', 'Desc', 'Vrf', 'SubInt', 'IPv4', 'IPv4Sec', 'IPV_Net', 'Status', 'AccessList',
+              'HSRP_Num', 'HSRP_IP', 'HSRP_Pri', 'IP_Helper']
+    fields = ['name', 'desc', 'vrf', 'subint', 'ipv4', 'ipv4_sec', 'ipv4_net', 'status', 'access_list',
+              'hsrp_num', 'hsrp_ip', 'hsrp_pri', 'ip_helper']
+
+    def device(self, hostname, rows):
+        self._writer.writerow(['====='] + [''] * len(self.fields))
+        super().device(hostname, rows)
+
+    def keep(self, row):
+        return row['ipv4'] != ""
+
+    def row(self, hostname, row):
+        return [f'{hostname}'] + super().row(hostname, row)
+
+
+class L3IntNetworkReport(Report):
+    """
+    This Class represents the report of the L3 interfaces grouped by network
+    """
+
+    kind = 'l3'
+    file_name = 'all_net_l3_int.csv'
+    header = ['Networks', 'Hostname', 'Interface', 'IP_Address', 'Desc']
+
+    def __init__(self, out_dir, l3_networks_groups=None, **kwargs):
+        super().__init__(out_dir)
+        # the groups are built anew by every export, then handed to l3_networks_groups
+        self.groups = dict()
+        self.l3_networks_groups = l3_networks_groups
+
+    def device(self, hostname, rows):
+        for row in rows:
+            desc_int = dict()
+            desc_int['name'] = f'{hostname}'
+            desc_int['ip'] = row['ipv4']
+            desc_int['int'] = row['name']
+            desc_int['desc'] = row['desc']
+            self.groups.setdefault(row['ipv4_net'], list()).append(desc_int)
+
+    def finish(self):
+        with open(f'{self.out_dir}/{self.file_name}', 'w', buffering=_BUFFER_SIZE) as fs:
+            writer = _writer(fs)
+            writer.writerow(self.header)
+            for net in sorted(self.groups):
+                writer.writerow([net])
+                writer.writerows(['', f'{net_int["name"]}', f'{net_int["int"]}', f'{net_int["ip"]}', f'{net_int["desc"]}']
+                                 for net_int in self.groups[net])
+        if self.l3_networks_groups is not None:
+            self.l3_networks_groups.clear()
+            self.l3_networks_groups.update(self.groups)
+
+
+class L2IntReport(PerHostReport):
+    kind = 'l2'
+    header = ['NameInt', 'Desc', 'status', 'mode', 'access_vlan', 'trunk_allowed', 'channel_group', 'channel_mode', 'span_tree', 'speed']
+    fields = ['name', 'desc', 'status', 'mode', 'access_vlan', 'trunk_allowed', 'channel_group', 'channel_mode', 'span_tree', 'speed']
+
+    def file_name(self, hostname):
+        return f'{self.out_dir}/{hostname.lower()}_l2_int.csv'
+
+
+class L2IntAllReport(AllReport):
+    kind = 'l2'
+    file_name = 'all_l2_int.csv'
+    header = ['HostName'] + L2IntReport.header
+    fields = L2IntReport.fields
+
+    def row(self, hostname, row):
+        return [f'{hostname.upper()}'] + super().row(hostname, row)
+
+
+class CdpReport(PerHostReport):
+    kind = 'cdp'
+    suffix = 'cdp'
+    header = ['LocalName', 'LocalPort', 'RemoteName', 'RemotePort', 'RemotePlatform', 'RemoteIP']
+    fields = ['local_port', 'device_id', 'remote_port', 'platform', 'ip_address']
+
+    def row(self, hostname, row):
+        return [f'{hostname}'] + super().row(hostname, row)
+
+
+class CdpAllReport(AllReport):
+    kind = 'cdp'
+    file_name = 'all_cdp.csv'
+    header = CdpReport.header
+    fields = CdpReport.fields
+
+    def row(self, hostname, row):
+        return [f'{hostname}'] + super().row(hostname, row)
+
+
+REPORTS = {
+    'vlans': VlansReport,
+    'vlans_all': VlansAllReport,
+    'l3_int': L3IntReport,
+    'l3_int_all': L3IntAllReport,
+    'l3_int_network': L3IntNetworkReport,
+    'l2_int': L2IntReport,
+    'l2_int_all': L2IntAllReport,
+    'cdp': CdpReport,
+    'cdp_all': CdpAllReport,
+}
+
+
+def export(devices, cdp_devices, out_dir='output', reports=tuple(REPORTS), **kwargs):
+    """
+    Writes the requested reports walking the devices and the cdp devices once.
+    kwargs are handed to the reports (e.g. l3_networks_groups).
+    """
+    if not os.path.exists(f'{out_dir}'):
+        os.makedirs(f'{out_dir}')
+    writers = [REPORTS[name](out_dir, **kwargs) for name in reports]
+    kinds = {writer.kind for writer in writers}
+    started = []
+    try:
+        for writer in writers:
+            writer.start()
+            started.append(writer)
+        if kinds & {'l3', 'l2', 'vlans'}:
+            for cisco in devices:
+                rows = dict()
+                if 'l3' in kinds:
+                    rows['l3'] = [ent.dict for ent in cisco.l3_int_entries]
+                if 'l2' in kinds:
+                    rows['l2'] = [ent.dict for ent in cisco.l2_int_entries]
+                if 'vlans' in kinds:
+                    rows['vlans'] = [ent.dict for ent in cisco.vlan_entries]
+                for writer in writers:
+                    if writer.kind in rows:
+                        writer.device(cisco.hostname, rows[writer.kind])
+        if 'cdp' in kinds:
+            for dev in cdp_devices:
+                rows = dev.dict
+                for writer in writers:
+                    if writer.kind == 'cdp':
+                        writer.device(dev.hostname, rows)
+    finally:
+        for writer in started:
+            writer.finish()
@@ -0,0 +1,211 @@
+"""This Module provides fake devices for running AlexNornir without routers.
+
+FakeConnection is a nornir connection plugin which stands in for netmiko
+(install() registers it under the name 'netmiko'), so netmiko_send_command,
+the batched commands and the connection pool work unchanged. Every host gets
+a FakeDevice serving recorded outputs (load_recorded() reads the files
+written by get_config/get_cdp/run_cmds) or synthetic ones, after a
+configurable latency (plus random jitter) per command and per connection.
+"""
+
+import glob
+import random
+import re
+import threading
+import time
+
+from nornir.core.connections import ConnectionPlugin, Connections
+
+from alexlibs.synthetic import (synthetic_cdp, synthetic_config, synthetic_ospf_dbsum, synthetic_ospf_neighbors,
+                                synthetic_ospf_process, synthetic_ping)
+
+_INVALID = "% Invalid input detected at '^' marker."
+
+# Devices of the hosts (by hostname), the default factory is used for the others
+DEVICES = dict()
+
+# Outputs saved by AlexNornir: '<host>#<command>' or '### <host>: ===>> <command> <<===' before each output
+_RECORDED_RE = re.compile(r'^(?:### (?P<host>[^:\n]+): ===>> (?P<cmd>.+?) <<===|(?P<prompt>[^#\s]+)#(?P<cmd2>.+))$', re.MULTILINE)
+
+
+class FakeDevice():
+    """
+    This Class represents a device answering commands with stored outputs
+    """
+
+    def __init__(self, hostname, outputs=None, latency=0.0, jitter=0.0, connect_latency=0.0):
+        self.hostname = hostname
+        self.outputs = dict() if outputs is None else outputs
+        self.latency = latency
+        self.jitter = jitter
+        self.connect_latency = connect_latency
+        self.stats = {'connects': 0, 'commands': 0}
+
+    def __repr__(self):
+        return 'FakeDevice: {} commands={}'.format(self.hostname, len(self.outputs))
+
+    @staticmethod
+    def normalize(cmd):
+        return ' '.join(cmd.split()).lower()
+
+    def delay(self, cmd=None):
+        """
+        returns the latency of a command (latency can be a dictionary command -> seconds)
+        """
+        if isinstance(self.latency, dict):
+            latency = self.latency.get(self.normalize(cmd or ''), self.latency.get('default', 0.0))
+        else:
+            latency = self.latency
+        if self.jitter:
+            latency += random.uniform(0, self.jitter)
+        return latency
+
+    def output(self, cmd):
+        """
+        returns the output of a command, ping answers any address
+        """
+        key = self.normalize(cmd)
+        self.stats['commands'] += 1
+        if key in self.outputs:
+            return self.outputs[key]
+        if key.startswith('ping '):
+            return self.outputs.get('ping', synthetic_ping(key.split()[1]))
+        return _INVALID
+
+
+def synthetic_device(hostname, neighbors=(), areas=2, interfaces=4, vlans=4, rid='10.0.0.1', **kwargs):
+    """
+    returns a FakeDevice with synthetic outputs,
+    neighbors is a list of (device_id, local_port, remote_port, ip address, platform, router id)
+    """
+    outputs = {
+        'show run': synthetic_config(hostname, interfaces=interfaces, vlans=vlans),
+        'show cdp nei deta': synthetic_cdp([nei[:5] for nei in neighbors]),
+        'show ip ospf nei': synthetic_ospf_neighbors(len(neighbors), rids=[nei[5] for nei in neighbors]),
+        'show ip ospf': synthetic_ospf_process(areas, rid=rid),
+        'show ip ospf database database-summary': synthetic_ospf_dbsum(areas, rid=rid),
+    }
+    return FakeDevice(hostname, outputs, **kwargs)
+
+
+def load_recorded(path, **kwargs):
+    """
+    returns a dictionary hostname -> FakeDevice of the outputs saved in the files of path (a glob)
+    """
+    resp = dict()
+    for file_name in glob.glob(f'{path}'):
+        with open(file_name) as input_f:
+            text = input_f.read()
+        matches = list(_RECORDED_RE.finditer(text))
+        for idx, match in enumerate(matches):
+            host = (match.group('host') or match.group('prompt')).strip()
+            cmd = match.group('cmd') or match.group('cmd2')
+            end = matches[idx + 1].start() if idx + 1 < len(matches) else len(text)
+            device = resp.setdefault(host.lower(), FakeDevice(host, **kwargs))
+            device.outputs[FakeDevice.normalize(cmd)] = text[match.end() + 1:end].rstrip('\n')
+    return resp
+
+
+class FakeSession():
+    """
+    This Class represents the netmiko session of a fake device
+    """
+
+    RETURN = '\n'
+
+    def __init__(self, device):
+        self.device = device
+        self.base_prompt = device.hostname
+        self._buffer = ''
+        self._lock = threading.Lock()
+        self._alive = True
+
+    def find_prompt(self, delay_factor=1):
+        return f'{self.base_prompt}#'
+
+    def enable(self):
+        return ''
+
+    def send_command(self, command_string, **kwargs):
+        time.sleep(self.device.delay(command_string))
+        return self.device.output(command_string)
+
+    send_command_timing = send_command
+
+    def write_channel(self, out_data):
+        """
+        Answers every line as a router would echo it: command, output, prompt
+        """
+        with self._lock:
+            for line in out_data.split(self.RETURN)[:-1]:
+                self._buffer += line
+                if line.strip():
+                    time.sleep(self.device.delay(line))
+                    self._buffer += self.RETURN + self.device.output(line)
+                self._buffer += f'{self.RETURN}{self.base_prompt}#'
+
+    def read_channel(self):
+        with self._lock:
+            resp, self._buffer = self._buffer, ''
+        return resp
+
+    @staticmethod
+    def normalize_linefeeds(a_string):
+        return a_string.replace('\r\n', '\n').replace('\r', '\n')
+
+    @staticmethod
+    def strip_ansi_escape_codes(string_buffer):
+        return string_buffer
+
+    def is_alive(self):
+        return self._alive
+
+    def disconnect(self):
+        self._alive = False
+
+
+class FakeConnection(ConnectionPlugin):
+    """
+    This Class represents the nornir connection plugin of the fake devices
+    """
+
+    # called with the hostname for the hosts without a device in DEVICES
+    default = staticmethod(lambda hostname: FakeDevice(hostname))
+
+    def open(self, hostname, username, password, port, platform, extras=None, configuration=None):
+        device = DEVICES.get(f'{hostname}'.lower())
+        if device is None:
+            device = self.default(hostname)
+            DEVICES[f'{hostname}'.lower()] = device
+        device.stats['connects'] += 1
+        time.sleep(device.connect_latency)
+        self.connection = FakeSession(device)
+
+    def close(self):
+        self.connection.disconnect()
+
+
+def install(devices=None, default=None, name='netmiko'):
+    """
+    Registers FakeConnection as the connection plugin name (netmiko by default)
+    with the devices (hostname -> FakeDevice) and the factory of the other hosts.
+    InitNornir registers netmiko again, so this is called after AlexNornir is created.
+    """
+    if devices is not None:
+        DEVICES.clear()
+        DEVICES.update({host.lower(): device for host, device in devices.items()})
+    if default is not None:
+        FakeConnection.default = staticmethod(default)
+    if name in Connections.available:
+        Connections.deregister(name)
+    Connections.register(name, FakeConnection)
+
+
+def uninstall(name='netmiko'):
+    """
+    Registers the netmiko plugin of nornir back
+    """
+    from nornir.plugins.connections.netmiko import Netmiko
+    if name in Connections.available:
+        Connections.deregister(name)
+    Connections.register(name, Netmiko)
@@ -0,0 +1,293 @@
+"""This Module provides an indexed SQLite store of the parsed fleet.
+
+InventoryDB.update() parses only the config and cdp files whose content
+(or parse flags, or parser version) changed since the last run and
+replaces their rows, so lookups across the fleet are indexed queries
+instead of a full reparse.
+"""
+
+import glob
+import sqlite3
+import time
+from functools import partial
+from alexlibs.cache import ParseCache
+from alexlibs.ciscocfg import parse_config_file, parse_cdp_file, parse_files
+from alexlibs.ipindex import interface_addresses, parse_prefix, prefixlen_to_mask, ipv4_to_int
+
+_SCHEMA = '''
+CREATE TABLE IF NOT EXISTS sources (
+    path TEXT PRIMARY KEY,
+    kind TEXT NOT NULL,
+    key TEXT NOT NULL,
+    hostname TEXT,
+    updated REAL
+);
+CREATE TABLE IF NOT EXISTS devices (
+    hostname TEXT PRIMARY KEY,
+    config_source TEXT,
+    cdp_source TEXT,
+    updated REAL
+);
+CREATE TABLE IF NOT EXISTS l3_interfaces (
+    source TEXT NOT NULL,
+    hostname TEXT,
+    name TEXT,
+    description TEXT,
+    vrf TEXT,
+    subint TEXT,
+    status TEXT,
+    ipv4 TEXT,
+    ipv4_net TEXT,
+    ipv4_sec TEXT,
+    hsrp_num TEXT,
+    hsrp_ip TEXT,
+    hsrp_pri TEXT,
+    ip_helper TEXT,
+    access_list TEXT
+);
+CREATE INDEX IF NOT EXISTS l3_interfaces_source ON l3_interfaces (source);
+CREATE INDEX IF NOT EXISTS l3_interfaces_hostname ON l3_interfaces (hostname);
+CREATE INDEX IF NOT EXISTS l3_interfaces_vrf ON l3_interfaces (vrf);
+CREATE TABLE IF NOT EXISTS addresses (
+    source TEXT NOT NULL,
+    hostname TEXT,
+    interface TEXT,
+    vrf TEXT,
+    kind TEXT,
+    ip_int INTEGER,
+    prefixlen INTEGER,
+    network_int INTEGER
+);
+CREATE INDEX IF NOT EXISTS addresses_source ON addresses (source);
+CREATE INDEX IF NOT EXISTS addresses_ip ON addresses (ip_int);
+CREATE INDEX IF NOT EXISTS addresses_network ON addresses (network_int, prefixlen);
+CREATE TABLE IF NOT EXISTS l2_interfaces (
+    source TEXT NOT NULL,
+    hostname TEXT,
+    name TEXT,
+    description TEXT,
+    mode TEXT,
+    status TEXT,
+    access_vlan TEXT,
+    trunk_allowed TEXT,
+    trunk_vlans TEXT,
+    channel_group TEXT,
+    channel_mode TEXT,
+    span_tree TEXT,
+    speed TEXT
+);
+CREATE INDEX IF NOT EXISTS l2_interfaces_source ON l2_interfaces (source);
+CREATE INDEX IF NOT EXISTS l2_interfaces_hostname ON l2_interfaces (hostname);
+CREATE INDEX IF NOT EXISTS l2_interfaces_access_vlan ON l2_interfaces (access_vlan);
+CREATE TABLE IF NOT EXISTS vlans (
+    source TEXT NOT NULL,
+    hostname TEXT,
+    vlan INTEGER,
+    name TEXT
+);
+CREATE INDEX IF NOT EXISTS vlans_source ON vlans (source);
+CREATE INDEX IF NOT EXISTS vlans_vlan ON vlans (vlan);
+CREATE INDEX IF NOT EXISTS vlans_hostname ON vlans (hostname);
+CREATE TABLE IF NOT EXISTS cdp_links (
+    source TEXT NOT NULL,
+    hostname TEXT,
+    local_port TEXT,
+    device_id TEXT,
+    remote_port TEXT,
+    platform TEXT,
+    capabilities TEXT,
+    ip_address TEXT
+);
+CREATE INDEX IF NOT EXISTS cdp_links_source ON cdp_links (source);
+CREATE INDEX IF NOT EXISTS cdp_links_hostname ON cdp_links (hostname);
+CREATE INDEX IF NOT EXISTS cdp_links_device_id ON cdp_links (device_id);
+CREATE INDEX IF NOT EXISTS cdp_links_platform ON cdp_links (platform);
+'''
+
+_ROW_TABLES = {
+    'config': ('l3_interfaces', 'addresses', 'l2_interfaces', 'vlans'),
+    'cdp': ('cdp_links',),
+}
+
+
+class InventoryDB():
+    """
+    This Class represents the SQLite inventory of devices, interfaces, VLANs and CDP links
+    """
+
+    def __init__(self, db_file='inventory.db'):
+        self.db_file = db_file
+        self._conn = sqlite3.connect(db_file)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.executescript(_SCHEMA)
+
+    def __repr__(self):
+        return 'InventoryDB: {}'.format(self.db_file)
+
+    def close(self):
+        self._conn.close()
+
+    def update(self, path_to_config, path_to_cdp=None, flag_l3_int=True, flag_vlans=True, flag_l2_int=True,
+               workers=1, prune=True):
+        """
+        Parses the changed config and cdp files and replaces their rows.
+        With prune, files which do not exist anymore are removed from the store.
+        Returns a dictionary of counters and parse errors.
+        """
+        stats = {'parsed': 0, 'unchanged': 0, 'removed': 0, 'errors': []}
+        flags = (flag_l3_int, flag_vlans, flag_l2_int)
+        parse_config = partial(parse_config_file, flag_l3_int=flag_l3_int, flag_vlans=flag_vlans, flag_l2_int=flag_l2_int)
+        self._update_kind('config', list(glob.glob(f'{path_to_config}')), parse_config, ('config',) + flags,
+                          workers, prune, stats)
+        if path_to_cdp is not None:
+            self._update_kind('cdp', list(glob.glob(f'{path_to_cdp}')), parse_cdp_file, ('cdp',),
+                              workers, prune, stats)
+        return stats
+
+    def _update_kind(self, kind, files, parse_func, key_params, workers, prune, stats):
+        known = {row['path']: row['key'] for row in self._conn.execute('SELECT path, key FROM sources WHERE kind = ?', (kind,))}
+        changed = []
+        for file_name in files:
+            try:
+                key = ParseCache.key_for_file(file_name, *key_params)
+            except OSError as err:
+                stats['errors'].append((file_name, f'{type(err).__name__}: {err}'))
+                continue
+            if known.get(file_name) == key:
+                stats['unchanged'] += 1
+            else:
+                changed.append((file_name, key))
+        results = parse_files(parse_func, [file_name for file_name, _ in changed], workers=workers)
+        with self._conn:
+            for (file_name, key), (dev, error) in zip(changed, results):
+                if error is not None:
+                    stats['errors'].append((file_name, error))
+                    continue
+                self._delete_source(kind, file_name)
+                if kind == 'config':
+                    self._insert_config(file_name, dev)
+                else:
+                    self._insert_cdp(file_name, dev)
+                self._conn.execute('INSERT OR REPLACE INTO sources (path, kind, key, hostname, updated) VALUES (?, ?, ?, ?, ?)',
+                                   (file_name, kind, key, dev.hostname, time.time()))
+                stats['parsed'] += 1
+            if prune:
+                present = set(files)
+                for file_name in known:
+                    if file_name not in present:
+                        self._delete_source(kind, file_name)
+                        self._conn.execute('DELETE FROM sources WHERE path = ?', (file_name,))
+                        stats['removed'] += 1
+
+    def _delete_source(self, kind, file_name):
+        for table in _ROW_TABLES[kind]:
+            self._conn.execute(f'DELETE FROM {table} WHERE source = ?', (file_name,))
+        self._conn.execute(f'UPDATE devices SET {kind}_source = NULL WHERE {kind}_source = ?', (file_name,))
+        self._conn.execute('DELETE FROM devices WHERE config_source IS NULL AND cdp_source IS NULL')
+
+    def _upsert_device(self, kind, hostname, file_name):
+        self._conn.execute(f'INSERT INTO devices (hostname, {kind}_source, updated) VALUES (?, ?, ?) '
+                           f'ON CONFLICT(hostname) DO UPDATE SET {kind}_source = excluded.{kind}_source, updated = excluded.updated',
+                           (hostname, file_name, time.time()))
+
+    def _insert_config(self, file_name, cisco):
+        hostname = f'{cisco.hostname}'
+        self._upsert_device('config', hostname, file_name)
+        l3_rows = []
+        addr_rows = []
+        for ent in cisco.l3_int_entries:
+            try:
+                ipv4, ipv4_net = ent.ipv4_prefix, ent.ipv4_net
+            except Exception:
+                ipv4, ipv4_net = ent.ipv4, ""
+            l3_rows.append((file_name, hostname, ent.name, ent.desc, ent.vrf, ent.subint, ent.status, ipv4, ipv4_net,
+                            ent.ipv4_sec, ent.hsrp_num, ent.hsrp_ip, ent.hsrp_pri, ent.ip_helper, ent.access_list))
+            for entry in interface_addresses(hostname, ent):
+                addr_rows.append((file_name, hostname, entry.interface, entry.vrf, entry.kind, entry.ip_int,
+                                  entry.prefixlen, entry.network_int))
+        self._conn.executemany('INSERT INTO l3_interfaces VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)', l3_rows)
+        self._conn.executemany('INSERT INTO addresses VALUES (?, ?, ?, ?, ?, ?, ?, ?)', addr_rows)
+        self._conn.executemany('INSERT INTO l2_interfaces VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)',
+                               [(file_name, hostname, ent.name, ent.desc, ent.mode, ent.status, ent.access_vlan,
+                                 ent.trunk_allowed, ent.allowed_vlans.to_string() if ent.is_trunk else None,
+                                 ent.channel_group, ent.channel_mode, ent.span_tree, ent.speed)
+                                for ent in cisco.l2_int_entries])
+        self._conn.executemany('INSERT INTO vlans VALUES (?, ?, ?, ?)',
+                               [(file_name, hostname, vlan, cisco.vlan_names.get(vlan)) for vlan in cisco.vlans])
+
+    def _insert_cdp(self, file_name, dev):
+        hostname = f'{dev.hostname}'
+        self._upsert_device('cdp', hostname, file_name)
+        self._conn.executemany('INSERT INTO cdp_links VALUES (?, ?, ?, ?, ?, ?, ?, ?)',
+                               [(file_name, hostname, ent.local_port, ent.remove_domain() if ent.device_id else None,
+                                 ent.remote_port, ent.platform, ent.capabilities, ent.ip_address)
+                                for ent in dev.cdp_entries])
+
+    def query(self, sql, params=()):
+        """
+        returns the rows of an SQL query as a list of dictionaries
+        """
+        return [dict(row) for row in self._conn.execute(sql, params)]
+
+    def devices(self):
+        return self.query('SELECT * FROM devices ORDER BY hostname')
+
+    def interfaces(self, hostname):
+        """
+        returns the L3 and L2 interfaces of a device
+        """
+        return {
+            'l3': self.query('SELECT * FROM l3_interfaces WHERE hostname = ?', (hostname,)),
+            'l2': self.query('SELECT * FROM l2_interfaces WHERE hostname = ?', (hostname,)),
+        }
+
+    def find_ip(self, ip):
+        """
+        returns the interfaces which have exactly this address configured
+        """
+        ip_int = ipv4_to_int(ip)
+        if ip_int is None:
+            raise ValueError(f'Wrong address: {ip}')
+        return self.query('SELECT hostname, interface, vrf, kind, prefixlen FROM addresses WHERE ip_int = ?', (ip_int,))
+
+    def longest_match(self, ip):
+        """
+        returns the addresses of the longest prefix containing the address
+        """
+        ip_int = ipv4_to_int(ip)
+        if ip_int is None:
+            raise ValueError(f'Wrong address: {ip}')
+        for prefixlen in range(32, -1, -1):
+            resp = self.query('SELECT hostname, interface, vrf, kind, ip_int, prefixlen FROM addresses '
+                              'WHERE network_int = ? AND prefixlen = ?', (ip_int & prefixlen_to_mask(prefixlen), prefixlen))
+            if resp:
+                return resp
+        return []
+
+    def within(self, supernet):
+        """
+        returns the addresses whose network is inside the supernet
+        """
+        net_int, prefixlen = parse_prefix(supernet)
+        last = net_int | (~prefixlen_to_mask(prefixlen) & 0xFFFFFFFF)
+        return self.query('SELECT hostname, interface, vrf, kind, ip_int, prefixlen FROM addresses '
+                          'WHERE network_int BETWEEN ? AND ? AND prefixlen >= ? ORDER BY network_int',
+                          (net_int, last, prefixlen))
+
+    def vlan_devices(self, vlan):
+        """
+        returns the devices which define the VLAN
+        """
+        return self.query('SELECT hostname, name FROM vlans WHERE vlan = ? ORDER BY hostname', (int(vlan),))
+
+    def neighbors(self, hostname):
+        """
+        returns the CDP neighbors of a device
+        """
+        return self.query('SELECT * FROM cdp_links WHERE hostname = ?', (hostname,))
+
+    def links_to(self, device_id):
+        """
+        returns the CDP links of all devices which see device_id as a neighbor
+        """
+        return self.query('SELECT * FROM cdp_links WHERE device_id = ?', (device_id,))
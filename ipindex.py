@@ -0,0 +1,294 @@
+"""This Module provides an IPv4 index over the L3 interfaces of the fleet.
+
+It answers which device/interface owns an address, longest prefix match,
+all interfaces inside a supernet and overlapping subnets, per VRF
+('' is the global table).
+"""
+
+import bisect
+
+
+def ipv4_to_int(addr):
+    """
+    returns the integer of a dotted quad IPv4 address or None if it is not one
+    """
+    octets = addr.strip().split('.')
+    if len(octets) != 4:
+        return None
+    resp = 0
+    for octet in octets:
+        if not octet.isdigit() or len(octet) > 3 or (len(octet) > 1 and octet[0] == '0'):
+            return None
+        val = int(octet)
+        if val > 255:
+            return None
+        resp = (resp << 8) | val
+    return resp
+
+
+def int_to_ipv4(val):
+    return f'{val >> 24 & 255}.{val >> 16 & 255}.{val >> 8 & 255}.{val & 255}'
+
+
+def prefixlen_to_mask(prefixlen):
+    return (0xFFFFFFFF << (32 - prefixlen)) & 0xFFFFFFFF
+
+
+def netmask_bits(mask_int):
+    """
+    returns the prefix length of a netmask, 32 if it is not a contiguous one (as netaddr does)
+    """
+    prefixlen = bin(mask_int).count('1')
+    if prefixlen_to_mask(prefixlen) != mask_int:
+        return 32
+    return prefixlen
+
+
+def parse_prefix(text):
+    """
+    returns (network address, prefixlen) of '10.0.0.0/8', '10.0.0.0 255.0.0.0' or a single address
+    """
+    text = text.strip()
+    if '/' in text:
+        addr, prefixlen = text.split('/', 1)
+        prefixlen = int(prefixlen)
+    elif ' ' in text:
+        addr, mask = text.split()[:2]
+        mask_int = ipv4_to_int(mask)
+        if mask_int is None:
+            raise ValueError(f'Wrong netmask: {mask}')
+        prefixlen = netmask_bits(mask_int)
+    else:
+        addr, prefixlen = text, 32
+    ip_int = ipv4_to_int(addr)
+    if ip_int is None or not 0 <= prefixlen <= 32:
+        raise ValueError(f'Wrong prefix: {text}')
+    return ip_int & prefixlen_to_mask(prefixlen), prefixlen
+
+
+def _prefix_str(net_int, prefixlen):
+    return f'{int_to_ipv4(net_int)}/{prefixlen}'
+
+
+class SubnetEntry():
+    """
+    This Class represents an address configured on an interface
+    """
+
+    __slots__ = ('hostname', 'interface', 'vrf', 'kind', 'ip_int', 'prefixlen', 'desc')
+
+    def __init__(self, hostname, interface, vrf, kind, ip_int, prefixlen, desc=''):
+        self.hostname = hostname
+        self.interface = interface
+        self.vrf = vrf
+        self.kind = kind
+        self.ip_int = ip_int
+        self.prefixlen = prefixlen
+        self.desc = desc
+
+    def __repr__(self):
+        return 'Subnet Entry: {} {} {}'.format(self.hostname, self.interface, self.ip)
+
+    @property
+    def ip(self):
+        return int_to_ipv4(self.ip_int)
+
+    @property
+    def network_int(self):
+        return self.ip_int & prefixlen_to_mask(self.prefixlen)
+
+    @property
+    def network(self):
+        return _prefix_str(self.network_int, self.prefixlen)
+
+    @property
+    def dict(self):
+        resp = {
+            'hostname': self.hostname,
+            'interface': self.interface,
+            'vrf': self.vrf,
+            'kind': self.kind,
+            'ip': f'{self.ip}/{self.prefixlen}',
+            'network': self.network,
+            'desc': self.desc,
+        }
+        return resp
+
+
+def interface_addresses(hostname, ent):
+    """
+    returns a SubnetEntry per primary, secondary and HSRP address of a L3Interface
+    """
+    resp = []
+    subnets = []
+    if ent.ipv4 != "":
+        try:
+            ip_int, prefixlen = ent.ipv4_int, ent.ipv4_prefixlen
+        except Exception:
+            ip_int = None
+        if ip_int is not None:
+            resp.append(SubnetEntry(hostname, ent.name, ent.vrf, 'primary', ip_int, prefixlen, ent.desc))
+            subnets.append((ip_int & prefixlen_to_mask(prefixlen), prefixlen))
+    for sec in ent.ipv4_sec.split(','):
+        if sec.strip() == "":
+            continue
+        try:
+            net_int, prefixlen = parse_prefix(sec)
+        except ValueError:
+            continue
+        ip_int = ipv4_to_int(sec.split()[0])
+        resp.append(SubnetEntry(hostname, ent.name, ent.vrf, 'secondary', ip_int, prefixlen, ent.desc))
+        subnets.append((net_int, prefixlen))
+    for vip in ent.hsrp_ip.split(','):
+        vip = vip.split()[0] if vip.split() else ""
+        ip_int = ipv4_to_int(vip)
+        if ip_int is None:
+            continue
+        prefixlen = 32
+        for net_int, net_len in subnets:
+            if ip_int & prefixlen_to_mask(net_len) == net_int:
+                prefixlen = net_len
+                break
+        resp.append(SubnetEntry(hostname, ent.name, ent.vrf, 'hsrp', ip_int, prefixlen, ent.desc))
+    return resp
+
+
+class SubnetIndex():
+    """
+    This Class represents the index of primary, secondary and HSRP addresses.
+    Address and longest prefix lookups are hash lookups over at most 33 prefix lengths,
+    supernet queries are a bisect over the networks sorted by start address.
+    """
+
+    def __init__(self):
+        self._by_ip = dict()
+        self._by_net = dict()
+        self._sorted = dict()
+
+    def __len__(self):
+        return sum(len(entries) for entries in self._by_ip.values())
+
+    @classmethod
+    def from_devices(cls, devices):
+        """
+        Builds the index from CiscoDevice objects
+        """
+        index = cls()
+        for cisco in devices:
+            for ent in cisco.l3_int_entries:
+                index.add_interface(cisco.hostname, ent)
+        return index
+
+    def add_interface(self, hostname, ent):
+        """
+        Adds the addresses of a L3Interface
+        """
+        for entry in interface_addresses(hostname, ent):
+            self._add_entry(entry)
+
+    def add(self, hostname, interface, vrf, kind, ip_int, prefixlen, desc=''):
+        return self._add_entry(SubnetEntry(hostname, interface, vrf, kind, ip_int, prefixlen, desc))
+
+    def _add_entry(self, entry):
+        vrf = entry.vrf
+        self._by_ip.setdefault((vrf, entry.ip_int), []).append(entry)
+        nets = self._by_net.setdefault(vrf, dict()).setdefault(entry.prefixlen, dict())
+        nets.setdefault(entry.network_int, []).append(entry)
+        self._sorted.pop(vrf, None)
+        return entry
+
+    @property
+    def vrfs(self):
+        return sorted(self._by_net)
+
+    def _vrfs(self, vrf):
+        if vrf is None:
+            return list(self._by_net)
+        return [vrf] if vrf in self._by_net else []
+
+    def _sorted_nets(self, vrf):
+        """
+        returns (starts, prefixes) of the distinct networks of the vrf sorted by start address
+        """
+        if vrf not in self._sorted:
+            prefixes = sorted((net_int, prefixlen) for prefixlen, nets in self._by_net[vrf].items() for net_int in nets)
+            self._sorted[vrf] = ([net_int for net_int, _ in prefixes], prefixes)
+        return self._sorted[vrf]
+
+    def owner(self, ip, vrf=None):
+        """
+        returns the entries which have exactly this address configured
+        """
+        ip_int = ipv4_to_int(ip)
+        if ip_int is None:
+            raise ValueError(f'Wrong address: {ip}')
+        resp = []
+        for vrf_name in self._vrfs(vrf):
+            resp.extend(self._by_ip.get((vrf_name, ip_int), []))
+        return resp
+
+    def longest_match(self, ip, vrf=None):
+        """
+        returns the entries of the longest prefix containing the address
+        (over all vrfs if vrf is None)
+        """
+        ip_int = ipv4_to_int(ip)
+        if ip_int is None:
+            raise ValueError(f'Wrong address: {ip}')
+        best_len = -1
+        resp = []
+        for vrf_name in self._vrfs(vrf):
+            by_len = self._by_net[vrf_name]
+            for prefixlen in sorted(by_len, reverse=True):
+                if prefixlen < best_len:
+                    break
+                entries = by_len[prefixlen].get(ip_int & prefixlen_to_mask(prefixlen))
+                if entries:
+                    if prefixlen > best_len:
+                        best_len = prefixlen
+                        resp = []
+                    resp.extend(entries)
+                    break
+        return resp
+
+    def within(self, supernet, vrf=None):
+        """
+        returns the entries whose network is inside the supernet
+        """
+        net_int, prefixlen = parse_prefix(supernet)
+        last = net_int | (~prefixlen_to_mask(prefixlen) & 0xFFFFFFFF)
+        resp = []
+        for vrf_name in self._vrfs(vrf):
+            starts, prefixes = self._sorted_nets(vrf_name)
+            for idx in range(bisect.bisect_left(starts, net_int), bisect.bisect_right(starts, last)):
+                start, net_len = prefixes[idx]
+                if net_len >= prefixlen:
+                    resp.extend(self._by_net[vrf_name][net_len][start])
+        return resp
+
+    def entries(self, prefix, vrf=None):
+        """
+        returns the entries of exactly this network
+        """
+        net_int, prefixlen = parse_prefix(prefix)
+        resp = []
+        for vrf_name in self._vrfs(vrf):
+            resp.extend(self._by_net[vrf_name].get(prefixlen, dict()).get(net_int, []))
+        return resp
+
+    def overlapping(self, vrf=None):
+        """
+        returns a list of (vrf, outer network, inner network) of the distinct networks
+        where one contains the other
+        """
+        resp = []
+        for vrf_name in self._vrfs(vrf):
+            _, prefixes = self._sorted_nets(vrf_name)
+            stack = []
+            for start, prefixlen in prefixes:
+                while stack and stack[-1][2] < start:
+                    stack.pop()
+                for outer_start, outer_len, _ in stack:
+                    resp.append((vrf_name, _prefix_str(outer_start, outer_len), _prefix_str(start, prefixlen)))
+                stack.append((start, prefixlen, start | (~prefixlen_to_mask(prefixlen) & 0xFFFFFFFF)))
+        return resp
@@ -0,0 +1,293 @@
+"""This Module provides the phase timings of the AlexNornir operations.
+
+RunMetrics records, per operation and per host, the time spent in each phase:
+
+    connect   opening the session (TCP, SSH and authentication, as netmiko does them in one call)
+    command   each command, with the bytes received
+    parse     the host hooks and the parsers of the outputs (ospf_info)
+    print     printing the results of the host
+    write     write_to_file
+    host      the whole task of the host (with the waits for a session)
+
+It is a nornir processor: the command timings come from the subtasks, so the
+tasks running netmiko_send_command are covered with the nornir runner and
+the scheduler alike (a batch sets the time of its commands); the hosts the
+scheduler gives up on (timeout, deadline) are reported as failed. The results are
+latency histograms per phase, a JSON dump and a Prometheus text file
+(node_exporter textfile collector).
+"""
+
+import json
+import threading
+import time
+from contextlib import contextmanager
+
+PHASES = ('connect', 'command', 'parse', 'print', 'write', 'host')
+
+# upper bounds (seconds) of the histogram buckets, the last one is +Inf
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0)
+
+
+def _percentile(values, pct):
+    if not values:
+        return 0.0
+    return values[min(len(values) - 1, int(len(values) * pct / 100))]
+
+
+def _label(value):
+    return f'{value}'.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def histogram(values):
+    """
+    returns the cumulative bucket counts, count, sum and percentiles of the values (seconds)
+    """
+    values = sorted(values)
+    buckets = dict()
+    idx = 0
+    for bound in BUCKETS:
+        while idx < len(values) and values[idx] <= bound:
+            idx += 1
+        buckets[f'{bound}'] = idx
+    buckets['+Inf'] = len(values)
+    resp = {
+        'count': len(values),
+        'sum': round(sum(values), 6),
+        'p50': round(_percentile(values, 50), 6),
+        'p95': round(_percentile(values, 95), 6),
+        'p99': round(_percentile(values, 99), 6),
+        'max': round(values[-1], 6) if values else 0.0,
+        'buckets': buckets,
+    }
+    return resp
+
+
+class RunMetrics():
+    """
+    This Class represents the phase timings and the bytes received of the AlexNornir operations
+    """
+
+    def __init__(self):
+        self.records = []
+        self.operations = dict()
+        self.current = None
+        self._started = dict()
+        self._lock = threading.Lock()
+
+    def __repr__(self):
+        return 'RunMetrics: {} operations {} records'.format(len(self.operations), len(self.records))
+
+    def reset(self):
+        with self._lock:
+            self.records = []
+            self.operations = dict()
+
+    @contextmanager
+    def operation(self, name):
+        """
+        Context manager around an operation, the records added meanwhile belong to it
+        """
+        self.current = name
+        ops = self.operations.setdefault(name, {'runs': 0, 'wall': 0.0})
+        start = time.monotonic()
+        try:
+            yield self
+        finally:
+            ops['runs'] += 1
+            ops['wall'] += time.monotonic() - start
+            self.current = None
+
+    def add(self, host, phase, seconds, command=None, nbytes=0, failed=False):
+        """
+        Records the time of a phase of a host (and of a command)
+        """
+        with self._lock:
+            self.records.append((self.current, f'{host}', phase, command, seconds, nbytes, failed))
+
+    @contextmanager
+    def timed(self, host, phase, command=None):
+        start = time.monotonic()
+        try:
+            yield
+        finally:
+            self.add(host, phase, time.monotonic() - start, command)
+
+    def connected(self, host, seconds):
+        """
+        Records the opening of a session (ConnectionPool on_open)
+        """
+        self.add(host, 'connect', seconds)
+
+    # nornir processor: host and command phases
+    def task_started(self, task):
+        pass
+
+    def task_completed(self, task, result):
+        pass
+
+    def _start(self, task):
+        with self._lock:
+            self._started[id(task)] = time.monotonic()
+
+    def _elapsed(self, task):
+        with self._lock:
+            return time.monotonic() - self._started.pop(id(task), time.monotonic())
+
+    def task_instance_started(self, task, host):
+        self._start(task)
+
+    def task_instance_completed(self, task, host, result):
+        self.add(host, 'host', self._elapsed(task), failed=result.failed)
+
+    def subtask_instance_started(self, task, host):
+        self._start(task)
+
+    def subtask_instance_completed(self, task, host, result):
+        elapsed = self._elapsed(task)
+        res = result[0]
+        # the commands of a batch share one channel interaction, their time is set by the task
+        elapsed = getattr(res, 'elapsed', None) or elapsed
+        output = res.result if isinstance(res.result, str) else ''
+        self.add(host, 'command', elapsed, command=task.name, nbytes=len(output.encode('utf-8', 'replace')),
+                 failed=res.failed)
+
+    def _select(self, operation=None):
+        with self._lock:
+            records = list(self.records)
+        if operation is None:
+            return records
+        return [rec for rec in records if rec[0] == operation]
+
+    def histograms(self, operation=None):
+        """
+        returns a dictionary operation -> {phase: histogram}
+        """
+        values = dict()
+        for rec in self._select(operation):
+            values.setdefault(rec[0], dict()).setdefault(rec[2], []).append(rec[4])
+        return {op: {phase: histogram(phases[phase]) for phase in PHASES if phase in phases}
+                for op, phases in values.items()}
+
+    def hosts(self, operation=None):
+        """
+        returns a dictionary operation -> {host: {phase: seconds, 'bytes': received, 'failed': bool}}
+        """
+        resp = dict()
+        for op, host, phase, _, seconds, nbytes, failed in self._select(operation):
+            row = resp.setdefault(op, dict()).setdefault(host, {'bytes': 0, 'failed': False})
+            row[phase] = round(row.get(phase, 0.0) + seconds, 6)
+            row['bytes'] += nbytes
+            row['failed'] = row['failed'] or (failed and phase == 'host')
+        return resp
+
+    def commands(self, operation=None):
+        """
+        returns a dictionary operation -> {command: {count, sum, max, bytes}}
+        """
+        resp = dict()
+        for op, _, phase, command, seconds, nbytes, _ in self._select(operation):
+            if phase != 'command':
+                continue
+            row = resp.setdefault(op, dict()).setdefault(command, {'count': 0, 'sum': 0.0, 'max': 0.0, 'bytes': 0})
+            row['count'] += 1
+            row['sum'] = round(row['sum'] + seconds, 6)
+            row['max'] = round(max(row['max'], seconds), 6)
+            row['bytes'] += nbytes
+        return resp
+
+    def slowest(self, operation, count=10):
+        """
+        returns the count slowest hosts of an operation as (host, seconds)
+        """
+        hosts = self.hosts(operation).get(operation, dict())
+        return sorted(((host, row.get('host', 0.0)) for host, row in hosts.items()), key=lambda item: -item[1])[:count]
+
+    @property
+    def dict(self):
+        hosts = self.hosts()
+        resp = {
+            'operations': {op: {'runs': val['runs'], 'wall': round(val['wall'], 6), 'hosts': len(hosts.get(op, [])),
+                                'failed': sum(1 for row in hosts.get(op, dict()).values() if row['failed']),
+                                'bytes': sum(row['bytes'] for row in hosts.get(op, dict()).values())}
+                           for op, val in self.operations.items()},
+            'histograms': self.histograms(),
+            'commands': self.commands(),
+            'slowest': {op: self.slowest(op) for op in self.operations},
+            'hosts': hosts,
+        }
+        return resp
+
+    def to_json(self, file_name):
+        with open(file_name, 'w') as output_f:
+            json.dump(self.dict, output_f, indent=2)
+
+    def prometheus(self):
+        """
+        returns the metrics in the Prometheus text format
+        """
+        resp = ['# HELP alexnornir_phase_seconds Time spent per host in a phase of an operation',
+                '# TYPE alexnornir_phase_seconds histogram']
+        for op, phases in self.histograms().items():
+            for phase, hist in phases.items():
+                labels = f'operation="{_label(op)}",phase="{phase}"'
+                for bound, count in hist['buckets'].items():
+                    resp.append(f'alexnornir_phase_seconds_bucket{{{labels},le="{bound}"}} {count}')
+                resp.append(f'alexnornir_phase_seconds_sum{{{labels}}} {hist["sum"]}')
+                resp.append(f'alexnornir_phase_seconds_count{{{labels}}} {hist["count"]}')
+        resp.extend(['# HELP alexnornir_command_seconds_total Time spent in a command over all hosts',
+                     '# TYPE alexnornir_command_seconds_total counter'])
+        commands = self.commands()
+        for op, cmds in commands.items():
+            for command, row in cmds.items():
+                resp.append(f'alexnornir_command_seconds_total{{operation="{_label(op)}",command="{_label(command)}"}} {row["sum"]}')
+        resp.extend(['# HELP alexnornir_operation_seconds Wall time of the last runs of an operation',
+                     '# TYPE alexnornir_operation_seconds gauge'])
+        for op, val in self.operations.items():
+            resp.append(f'alexnornir_operation_seconds{{operation="{_label(op)}"}} {round(val["wall"], 6)}')
+        hosts = self.hosts()
+        for metric, kind, text, value in (('host_seconds', 'gauge', 'Time of the task of a host', lambda row: row.get('host', 0.0)),
+                                          ('host_received_bytes', 'counter', 'Bytes received from a host', lambda row: row['bytes']),
+                                          ('host_failed', 'gauge', 'The task of a host failed', lambda row: int(row['failed']))):
+            resp.extend([f'# HELP alexnornir_{metric} {text}', f'# TYPE alexnornir_{metric} {kind}'])
+            for op, rows in hosts.items():
+                for host, row in rows.items():
+                    resp.append(f'alexnornir_{metric}{{operation="{_label(op)}",host="{_label(host)}"}} {value(row)}')
+        return '\n'.join(resp) + '\n'
+
+    def to_prometheus(self, file_name):
+        with open(file_name, 'w') as output_f:
+            output_f.write(self.prometheus())
+
+    def save(self, base_name):
+        """
+        Writes <base_name>.json and <base_name>.prom, returns their names
+        """
+        self.to_json(f'{base_name}.json')
+        self.to_prometheus(f'{base_name}.prom')
+        return f'{base_name}.json', f'{base_name}.prom'
+
+    def summary(self, operation=None, width=40):
+        """
+        returns the text of the latency histograms of the operations
+        """
+        resp = []
+        data = self.dict
+        for op, phases in self.histograms(operation).items():
+            ops = data['operations'].get(op, dict())
+            resp.append(f'===== {op}: {ops.get("hosts", 0)} hosts in {ops.get("wall", 0.0):.3f} s, '
+                        f'{ops.get("bytes", 0) / (1 << 20):.2f} MB received, {ops.get("failed", 0)} failed')
+            for phase, hist in phases.items():
+                resp.append(f'{phase:8s} n={hist["count"]:<6d} sum={hist["sum"]:9.3f}s p50={hist["p50"] * 1000:9.1f}ms '
+                            f'p95={hist["p95"] * 1000:9.1f}ms max={hist["max"] * 1000:9.1f}ms')
+                previous = 0
+                top = max(hist['count'], 1)
+                for bound, count in hist['buckets'].items():
+                    if count == previous:
+                        continue
+                    label = bound if bound == '+Inf' else f'{float(bound) * 1000:g}ms'
+                    resp.append(f'    <= {label:>8s} {count - previous:6d} {"#" * max(1, (count - previous) * width // top)}')
+                    previous = count
+            slowest = ', '.join(f'{host} {seconds:.2f}s' for host, seconds in data['slowest'].get(op, [])[:5])
+            if slowest:
+                resp.append(f'slowest: {slowest}')
+        return '\n'.join(resp)
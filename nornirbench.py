@@ -0,0 +1,152 @@
+"""This Module provides a benchmark of the AlexNornir operations against fake devices.
+
+A fleet of synthetic devices (a ring: every host has two CDP/OSPF neighbors)
+is served by alexlibs.fakedevice, so run_cmds, get_config, get_cdp, ospf_info
+and ping run the real code paths without routers. Wall time, hosts per second
+and the peak memory (tracemalloc) are reported per operation.
+
+Usage: python -m alexlibs.nornirbench [--hosts 100,1000,5000] [--latency 0.01] [--jitter 0.005]
+       [--connect-latency 0.05] [--workers 100] [--ops run_cmds,get_config,get_cdp,ospf_info,ping]
+       [--stream] [--batch] [--json results.json]
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import yaml
+
+import alexlibs.fakedevice as fakedevice
+from alexlibs.alexnornir import AlexNornir
+
+OPERATIONS = ('run_cmds', 'get_config', 'get_cdp', 'ospf_info', 'ping')
+
+
+def _rid(idx):
+    return f'10.{idx >> 16 & 255}.{idx >> 8 & 255}.{idx & 255}'
+
+
+def fleet(hosts, **kwargs):
+    """
+    returns a dictionary hostname -> FakeDevice of a ring of hosts devices
+    """
+    resp = dict()
+    for idx in range(hosts):
+        nxt, prv = (idx + 1) % hosts, (idx - 1) % hosts
+        neighbors = [(f'r{nxt}.lab.local', 'GigabitEthernet0/0', 'GigabitEthernet0/1', _rid(nxt + 1), 'CISCO2911/K9', _rid(nxt + 1)),
+                     (f'r{prv}.lab.local', 'GigabitEthernet0/1', 'GigabitEthernet0/0', _rid(prv + 1), 'CISCO2911/K9', _rid(prv + 1))]
+        resp[f'r{idx}'] = fakedevice.synthetic_device(f'r{idx}', neighbors=neighbors, rid=_rid(idx + 1), **kwargs)
+    return resp
+
+
+def make_inventory(work_dir, hosts, workers):
+    """
+    Writes the nornir config, the SimpleInventory and the ping data of hosts hosts,
+    returns (config file, data file)
+    """
+    names = [f'r{idx}' for idx in range(hosts)]
+    inventory = {name: {'hostname': name, 'platform': 'ios', 'username': 'bench', 'password': 'bench',
+                        'data': {'role': 'core' if idx % 10 == 0 else 'edge'}}
+                 for idx, name in enumerate(names)}
+    files = {
+        'hosts.yaml': inventory,
+        'groups.yaml': {},
+        'defaults.yaml': {},
+        'data.yaml': {'ping_check': {name: [_rid((idx + 1) % hosts + 1)] for idx, name in enumerate(names)}},
+        'config.yaml': {
+            'core': {'num_workers': workers},
+            'inventory': {'plugin': 'nornir.plugins.inventory.simple.SimpleInventory',
+                          'options': {'host_file': f'{work_dir}/hosts.yaml',
+                                      'group_file': f'{work_dir}/groups.yaml',
+                                      'defaults_file': f'{work_dir}/defaults.yaml'}},
+            'logging': {'enabled': False},
+        },
+    }
+    for file_name, data in files.items():
+        with open(f'{work_dir}/{file_name}', 'w') as output_f:
+            yaml.safe_dump(data, output_f)
+    return f'{work_dir}/config.yaml', f'{work_dir}/data.yaml'
+
+
+def _operation(alex, name):
+    if name == 'run_cmds':
+        return lambda: alex.run_cmds('show ip ospf nei,show ip ospf,show ip ospf database database-summary')
+    return getattr(alex, name)
+
+
+def bench_alexnornir(hosts, ops=OPERATIONS, workers=100, latency=0.0, jitter=0.0, connect_latency=0.0,
+                     stream=False, batch=False):
+    """
+    Runs the operations against hosts fake devices,
+    returns a dictionary operation -> {wall, hosts_per_s, peak_mb, failed}
+    """
+    resp = dict()
+    with tempfile.TemporaryDirectory() as work_dir:
+        config_file, data_file = make_inventory(work_dir, hosts, workers)
+        alex = AlexNornir(config_file=config_file, data_file=data_file, output_dir=f'{work_dir}/output',
+                          stream=stream, batch=batch)
+        fakedevice.install(fleet(hosts, latency=latency, jitter=jitter, connect_latency=connect_latency))
+        try:
+            tracemalloc.start()
+            for name in ops:
+                alex.nor.data.reset_failed_hosts()
+                tracemalloc.reset_peak()
+                start = time.perf_counter()
+                with contextlib.redirect_stdout(io.StringIO()):
+                    _operation(alex, name)()
+                wall = time.perf_counter() - start
+                resp[name] = {
+                    'hosts': hosts,
+                    'wall': round(wall, 3),
+                    'hosts_per_s': round(hosts / wall, 1),
+                    'peak_mb': round(tracemalloc.get_traced_memory()[1] / (1 << 20), 1),
+                    'failed': len(alex.nor.data.failed_hosts),
+                }
+        finally:
+            tracemalloc.stop()
+            alex.close()
+            fakedevice.uninstall()
+        resp['pool'] = dict(alex.pool.stats)
+    return resp
+
+
+def print_results(results):
+    print(f'{"operation":12s} {"hosts":>6s} {"wall s":>9s} {"hosts/s":>9s} {"peak MB":>8s} {"failed":>6s}')
+    for hosts, res in results.items():
+        for name, row in res.items():
+            if name == 'pool':
+                continue
+            print(f'{name:12s} {hosts:6d} {row["wall"]:9.3f} {row["hosts_per_s"]:9.1f} {row["peak_mb"]:8.1f} {row["failed"]:6d}')
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Benchmark of AlexNornir against fake devices')
+    parser.add_argument('--hosts', default='100,1000', help='comma separated numbers of hosts')
+    parser.add_argument('--ops', default=','.join(OPERATIONS))
+    parser.add_argument('--workers', type=int, default=100)
+    parser.add_argument('--latency', type=float, default=0.01, help='seconds per command')
+    parser.add_argument('--jitter', type=float, default=0.005, help='random extra seconds per command')
+    parser.add_argument('--connect-latency', type=float, default=0.05, help='seconds per connection')
+    parser.add_argument('--stream', action='store_true')
+    parser.add_argument('--batch', action='store_true')
+    parser.add_argument('--json', help='file to save the results to')
+    args = parser.parse_args(argv)
+    results = dict()
+    for hosts in [int(val) for val in args.hosts.split(',')]:
+        results[hosts] = bench_alexnornir(hosts, ops=args.ops.split(','), workers=args.workers, latency=args.latency,
+                                          jitter=args.jitter, connect_latency=args.connect_latency,
+                                          stream=args.stream, batch=args.batch)
+    print_results(results)
+    if args.json:
+        with open(args.json, 'w') as output_f:
+            json.dump(results, output_f, indent=2)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,149 @@
+"""This Module provides the parsers of the OSPF show commands.
+
+The patterns are compiled once when the module is imported and the parsers
+only work on the captured text, so they can be used from the nornir worker
+threads as well as offline on saved outputs:
+
+    parse_neighbors     show ip ospf neighbor
+    parse_process       show ip ospf
+    parse_areas         show ip ospf
+    parse_dbsum         show ip ospf database database-summary
+    parse_dbsum_areas   show ip ospf database database-summary
+"""
+
+import re
+
+_NEIGHBOR_RE = re.compile(r'''
+        (?P<rid>\d+\.\d+\.\d+\.\d+)\s+
+        (?P<priority>\d+)\s+
+        (?P<state>\w+)/\s*
+        (?P<role>[A-Z-]+)\s+
+        (?P<deadtime>[0-9:]+|-)\s+
+        (?P<peer>\d+\.\d+\.\d+\.\d+)\s+
+        (?P<intf>[0-9A-Za-z./_-]+)
+    ''', re.VERBOSE)
+
+_PROCESS_RE = re.compile(r'''
+    Routing\s+Process\s+"ospf\s+(?P<id>\d+)"\s+with\s+ID\s+(?P<rid>\d+\.\d+\.\d+\.\d+)
+    .*
+    \s*Initial\s+SPF\s+schedule\s+delay\s+(?P<init_spf>\d+)\s+msecs
+    \s*Minimum\s+hold\s+time\s+between\s+two\s+consecutive\s+SPFs\s+(?P<min_spf>\d+)\s+msecs
+    \s*Maximum\s+wait\s+time\s+between\s+two\s+consecutive\s+SPFs\s+(?P<max_spf>\d+)\s+msecs
+    .*
+    \s*Reference\s+bandwidth\s+unit\s+is\s+(?P<ref_bw>\d+)\s+mbps
+''', re.VERBOSE + re.DOTALL)
+
+_AREA_RE = re.compile(r'''
+    Area\s+(?:BACKBONE\()?(?P<id>\d+)(?:\))?\s+
+    Number\s+of\s+interfaces\s+in\s+this\s+area\s+is\s+(?P<num_intfs>\d+).*\n
+    \s+(?:It\s+is\s+a\s+(?P<type>\w+)\s+area)?
+''', re.VERBOSE)
+
+_DBSUM_RE = re.compile(r'''
+    Process\s+(?P<process_id>\d+)\s+database\s+summary\s+
+    (?:LSA\s+Type\s+Count\s+Delete\s+Maxage\s+)?
+    Router\s+(?P<total_lsa1>\d+).*\n\s+
+    Network\s+(?P<total_lsa2>\d+).*\n\s+
+    Summary\s+Net\s+(?P<total_lsa3>\d+).*\n\s+
+    Summary\s+ASBR\s+(?P<total_lsa4>\d+).*\n\s+
+    Type-7\s+Ext\s+(?P<total_lsa7>\d+).*
+    \s+Type-5\s+Ext\s+(?P<total_lsa5>\d+)
+''', re.VERBOSE + re.DOTALL)
+
+_DBSUM_AREA_RE = re.compile(r'''
+    Area\s+(?P<id>\d+)\s+database\s+summary\s+
+    (?:LSA\s+Type\s+Count\s+Delete\s+Maxage\s+)?
+    Router\s+(?P<num_lsa1>\d+).*\n\s+
+    Network\s+(?P<num_lsa2>\d+).*\n\s+
+    Summary\s+Net\s+(?P<num_lsa3>\d+).*\n\s+
+    Summary\s+ASBR\s+(?P<num_lsa4>\d+).*\n\s+
+    Type-7\s+Ext\s+(?P<num_lsa7>\d+)
+''', re.VERBOSE)
+
+# Flags of 'show ip ospf' and the text which sets them
+_PROCESS_FLAGS = {
+    'is_abr': 'area border',
+    'is_asbr': 'autonomous system boundary',
+    'is_stub_rtr': 'Originating router-LSAs with max',
+    'has_ispf': 'Incremental-SPF enabled',
+    'has_bfd': 'BFD is enabled',
+    'has_ttlsec': 'Strict TTL checking enabled',
+}
+
+
+def parse_neighbors(text):
+    """
+    returns a dictionary per neighbor of 'show ip ospf neighbor'
+    """
+    resp = []
+    for line in text.split('\n'):
+        match = _NEIGHBOR_RE.search(line)
+        if match:
+            gdict = match.groupdict()
+            gdict['state'] = gdict['state'].lower()
+            gdict['role'] = gdict['role'].lower()
+            gdict['intf'] = gdict['intf'].lower()
+            resp.append(gdict)
+    return resp
+
+
+def parse_process(text):
+    """
+    returns the dictionary of the process of 'show ip ospf', None if it is not found
+    """
+    match = _PROCESS_RE.search(text)
+    if not match:
+        return None
+    resp = match.groupdict()
+    for key, flag in _PROCESS_FLAGS.items():
+        resp[key] = text.find(flag) != -1
+    return resp
+
+
+def parse_areas(text):
+    """
+    returns a dictionary per area of 'show ip ospf'
+    """
+    resp = [match.groupdict() for match in _AREA_RE.finditer(text)]
+    for area in resp:
+        if not area['type']:
+            area['type'] = 'standard'
+        else:
+            area['type'] = area['type'].lower()
+    return resp
+
+
+def parse_dbsum(text):
+    """
+    returns the totals of the process of 'show ip ospf database database-summary', None if not found
+    """
+    match = _DBSUM_RE.search(text)
+    if not match:
+        return None
+    return match.groupdict()
+
+
+def parse_dbsum_areas(text):
+    """
+    returns the counters per area of 'show ip ospf database database-summary'
+    """
+    return [match.groupdict() for match in _DBSUM_AREA_RE.finditer(text)]
+
+
+def parse_ospf(neighbors_text, process_text, dbsum_text):
+    """
+    returns the OSPF information of a device from the three outputs,
+    with the keys neighbor, process, areas, dbms_sum and dbms_sum_areas of what was found
+    """
+    resp = dict()
+    if neighbors_text:
+        resp['neighbor'] = parse_neighbors(neighbors_text)
+    process = parse_process(process_text or '')
+    if process is not None:
+        resp['process'] = process
+        resp['areas'] = parse_areas(process_text)
+    dbsum = parse_dbsum(dbsum_text or '')
+    if dbsum is not None:
+        resp['dbms_sum'] = dbsum
+        resp['dbms_sum_areas'] = parse_dbsum_areas(dbsum_text)
+    return resp
@@ -0,0 +1,188 @@
+"""This Module provides the OSPF adjacency graph of the fleet and its checks.
+
+It is built from the dictionary collected by AlexNornir.ospf_info (hostname ->
+neighbor/process/areas/dbms_sum/dbms_sum_areas). Routers are keyed by their
+router ID, every router has a dictionary of its neighbors (O(1) lookups) and
+the LSA counters per area are kept in a ColumnTable, so each check is one pass:
+
+    one_sided       an adjacency (a link) of a router which the neighbor does not list back
+    not_full        adjacencies which are not FULL (2WAY between DROTHERs is normal)
+    lsa_mismatches  routers of an area which do not count the same LSAs
+"""
+
+from alexlibs.ipindex import ipv4_to_int
+from alexlibs.table import ColumnTable
+
+LSA_FIELDS = ('num_lsa1', 'num_lsa2', 'num_lsa3', 'num_lsa4', 'num_lsa7')
+
+
+class Adjacency():
+    """
+    This Class represents a neighbor seen by a router
+    """
+
+    __slots__ = ('hostname', 'rid', 'neighbor_rid', 'peer', 'intf', 'state', 'role')
+
+    def __init__(self, hostname, rid, neighbor_rid, peer, intf, state, role):
+        self.hostname = hostname
+        self.rid = rid
+        self.neighbor_rid = neighbor_rid
+        self.peer = peer
+        self.intf = intf
+        self.state = state
+        self.role = role
+
+    def __repr__(self):
+        return 'Adjacency: {} {} -> {} {}'.format(self.hostname, self.intf, self.neighbor_rid, self.state)
+
+    @property
+    def is_full(self):
+        return self.state == 'full'
+
+    @property
+    def dict(self):
+        resp = {
+            'hostname': self.hostname,
+            'rid': self.rid,
+            'neighbor_rid': self.neighbor_rid,
+            'peer': self.peer,
+            'intf': self.intf,
+            'state': self.state,
+            'role': self.role,
+        }
+        return resp
+
+
+def _common_bits(peer, other_peer):
+    """
+    returns the length of the common prefix of two addresses (0 if one is not an IPv4 address)
+    """
+    addr, other = ipv4_to_int(peer), ipv4_to_int(other_peer)
+    if addr is None or other is None:
+        return 0
+    return 32 - (addr ^ other).bit_length()
+
+
+def _unpaired(adjs, back):
+    """
+    returns the adjacencies of adjs (a router to a neighbor) without a counterpart in back
+    (the neighbor to the router). The two ends of a link are paired by their addresses,
+    the peers of the two ends being the addresses of the link, the closest ones first.
+    """
+    pairs = sorted(((_common_bits(adj.peer, other.peer), idx, jdx)
+                    for idx, adj in enumerate(adjs) for jdx, other in enumerate(back)), key=lambda pair: -pair[0])
+    paired, paired_back = set(), set()
+    for _, idx, jdx in pairs:
+        if idx not in paired and jdx not in paired_back:
+            paired.add(idx)
+            paired_back.add(jdx)
+    return [adj for idx, adj in enumerate(adjs) if idx not in paired]
+
+
+class OspfGraph():
+    """
+    This Class represents the OSPF routers of the fleet and their adjacencies
+    """
+
+    def __init__(self):
+        self.routers = dict()
+        self._adj = dict()
+        self.lsa = ColumnTable(('area', 'hostname') + LSA_FIELDS, categorical=('area', 'hostname'))
+
+    def __repr__(self):
+        return 'OspfGraph: {} routers {} adjacencies'.format(len(self.routers), sum(len(nei) for nei in self._adj.values()))
+
+    def __len__(self):
+        return len(self.routers)
+
+    @classmethod
+    def from_info(cls, ospf_info):
+        """
+        Builds the graph from the dictionary of AlexNornir.ospf_info
+        """
+        graph = cls()
+        for hostname in sorted(ospf_info):
+            graph.add_host(hostname, ospf_info[hostname])
+        return graph
+
+    def add_host(self, hostname, info):
+        """
+        Adds the OSPF information of a host, the hostname is its key without a process
+        """
+        rid = info['process']['rid'] if 'process' in info else hostname
+        self.routers[rid] = hostname
+        neighbors = self._adj.setdefault(rid, dict())
+        for nei in info.get('neighbor', []):
+            adj = Adjacency(hostname, rid, nei['rid'], nei['peer'], nei['intf'], nei['state'], nei['role'])
+            neighbors.setdefault(adj.neighbor_rid, []).append(adj)
+        for area in info.get('dbms_sum_areas', []):
+            record = {field: int(area[field]) for field in LSA_FIELDS}
+            self.lsa.append(record, area=area['id'], hostname=hostname)
+
+    def hostname(self, rid):
+        return self.routers.get(rid)
+
+    def neighbors(self, rid):
+        """
+        returns the router IDs of the neighbors of a router
+        """
+        return list(self._adj.get(rid, dict()))
+
+    def adjacencies(self, rid=None):
+        """
+        returns the adjacencies of a router or of all routers
+        """
+        rids = self._adj if rid is None else [rid] if rid in self._adj else []
+        return [adj for key in rids for adjs in self._adj[key].values() for adj in adjs]
+
+    def one_sided(self):
+        """
+        returns the adjacencies whose neighbor was collected but does not list the router back on the same link,
+        so a missing one of several parallel adjacencies between two routers is found
+        """
+        resp = []
+        for rid, neighbors in self._adj.items():
+            for neighbor_rid, adjs in neighbors.items():
+                if neighbor_rid in self._adj:
+                    resp.extend(_unpaired(adjs, self._adj[neighbor_rid].get(rid, [])))
+        return resp
+
+    def external(self):
+        """
+        returns the router IDs of neighbors which were not collected
+        """
+        return sorted({neighbor_rid for neighbors in self._adj.values() for neighbor_rid in neighbors
+                       if neighbor_rid not in self._adj})
+
+    def not_full(self):
+        """
+        returns the adjacencies which are not FULL, 2WAY with a DROTHER is normal
+        """
+        return [adj for adj in self.adjacencies()
+                if not adj.is_full and not (adj.state == '2way' and adj.role == 'drother')]
+
+    def lsa_mismatches(self):
+        """
+        returns a dictionary area -> {lsa field: {count: [hostnames]}} of the counters
+        which differ between the routers of the area
+        """
+        hosts = self.lsa.column('hostname')
+        resp = dict()
+        for field in LSA_FIELDS:
+            for area, counts in self.lsa.groups('area', field).items():
+                if len(counts) > 1:
+                    resp.setdefault(area, dict())[field] = {count: [hosts[idx] for idx in rows]
+                                                            for count, rows in counts.items()}
+        return resp
+
+    def check(self):
+        """
+        returns the result of all checks
+        """
+        resp = {
+            'one_sided': [adj.dict for adj in self.one_sided()],
+            'not_full': [adj.dict for adj in self.not_full()],
+            'lsa_mismatches': self.lsa_mismatches(),
+            'external': self.external(),
+        }
+        return resp
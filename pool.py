@@ -0,0 +1,194 @@
+"""This Module provides a pool of device sessions shared by the AlexNornir operations.
+
+Sessions are the connections nornir keeps on each host. The pool opens them
+itself, so the SSH setup time is measured apart from the command time, checks
+a session which was idle longer than keepalive before reusing it, closes the
+sessions idle longer than idle_timeout and keeps at most max_open of them
+(the least recently used idle session is closed to open a new one).
+on_open, if given, is called as on_open(hostname, seconds) for every session opened.
+"""
+
+import threading
+import time
+from contextlib import contextmanager
+from functools import wraps
+
+
+class ConnectionPool():
+    """
+    This Class represents the open sessions of the hosts of a nornir object
+    """
+
+    def __init__(self, connection='netmiko', max_open=100, idle_timeout=300, keepalive=30, on_open=None):
+        self.connection = connection
+        self.on_open = on_open
+        self.max_open = max_open
+        self.idle_timeout = idle_timeout
+        self.keepalive = keepalive
+        self.stats = {'opened': 0, 'reused': 0, 'reconnected': 0, 'evicted': 0, 'setup_time': 0.0, 'command_time': 0.0}
+        self.times = dict()
+        self._hosts = dict()
+        self._last_used = dict()
+        # host -> token of the session using it
+        self._in_use = dict()
+        self._cond = threading.Condition()
+
+    def __repr__(self):
+        return 'ConnectionPool: open={} in_use={} {}'.format(len(self._last_used), len(self._in_use), self.stats)
+
+    def __len__(self):
+        return len(self._last_used)
+
+    def _host_times(self, name):
+        return self.times.setdefault(name, {'setup_time': 0.0, 'command_time': 0.0, 'opened': 0, 'reused': 0})
+
+    @staticmethod
+    def _is_alive(conn):
+        is_alive = getattr(conn, 'is_alive', None)
+        if is_alive is None:
+            return True
+        try:
+            return bool(is_alive())
+        except Exception:
+            return False
+
+    def _close(self, name):
+        """
+        Closes the session of a host, the lock is held by the caller
+        """
+        host = self._hosts.pop(name, None)
+        self._last_used.pop(name, None)
+        if host is not None and self.connection in host.connections:
+            try:
+                host.close_connection(self.connection)
+            except Exception:
+                host.connections.pop(self.connection, None)
+
+    def _make_room(self):
+        """
+        Waits until a session can be opened, closing the least recently used idle one if needed
+        """
+        while len(self._last_used) >= self.max_open:
+            idle = [name for name in self._last_used if name not in self._in_use]
+            if idle:
+                self._close(min(idle, key=self._last_used.get))
+                self.stats['evicted'] += 1
+            else:
+                self._cond.wait()
+
+    @contextmanager
+    def session(self, task):
+        """
+        Context manager around the task of a host: opens or reuses its session
+        and accounts the setup and the command time of the host
+        """
+        host = task.host
+        name = f'{host}'
+        token = object()
+        with self._cond:
+            self.evict_idle()
+            while name in self._in_use:
+                self._cond.wait()
+            self._in_use[name] = token
+            times = self._host_times(name)
+            last_used = self._last_used.get(name)
+        start = time.monotonic()
+        setup = None
+        try:
+            if last_used is not None and self.connection in host.connections:
+                if start - last_used > self.keepalive and not self._is_alive(host.connections[self.connection].connection):
+                    with self._cond:
+                        self._close(name)
+                        self.stats['reconnected'] += 1
+                else:
+                    with self._cond:
+                        self.stats['reused'] += 1
+                        times['reused'] += 1
+            if self.connection not in host.connections:
+                with self._cond:
+                    self._make_room()
+                    # the slot is taken before the session is opened
+                    self._hosts[name] = host
+                    self._last_used[name] = start
+                opening = time.monotonic()
+                host.get_connection(self.connection, task.nornir.config)
+                if self.on_open is not None:
+                    self.on_open(name, time.monotonic() - opening)
+                with self._cond:
+                    self.stats['opened'] += 1
+                    times['opened'] += 1
+            setup = time.monotonic() - start
+            yield host.connections[self.connection].connection
+        finally:
+            end = time.monotonic()
+            with self._cond:
+                # an evicted session (abandoned task) no longer owns the host
+                if self._in_use.get(name) is token:
+                    del self._in_use[name]
+                    if self.connection in host.connections:
+                        self._hosts[name] = host
+                        self._last_used[name] = end
+                    else:
+                        self._hosts.pop(name, None)
+                        self._last_used.pop(name, None)
+                if setup is not None:
+                    self.stats['setup_time'] += setup
+                    self.stats['command_time'] += end - start - setup
+                    times['setup_time'] += setup
+                    times['command_time'] += end - start - setup
+                self._cond.notify_all()
+
+    def wrap(self, func):
+        """
+        returns the task function running inside a session of the pool
+        """
+        @wraps(func)
+        def pooled(task, **kwargs):
+            with self.session(task):
+                return func(task, **kwargs)
+        return pooled
+
+    def evict(self, name):
+        """
+        Closes the session of a host whose task was abandoned (its thread may still run),
+        so the host can be run again at once
+        """
+        with self._cond:
+            self._in_use.pop(name, None)
+            self._close(name)
+            self.stats['evicted'] += 1
+            self._cond.notify_all()
+
+    def evict_idle(self):
+        """
+        Closes the sessions idle longer than idle_timeout
+        """
+        with self._cond:
+            now = time.monotonic()
+            for name in [name for name, used in self._last_used.items()
+                         if name not in self._in_use and now - used > self.idle_timeout]:
+                self._close(name)
+                self.stats['evicted'] += 1
+
+    def check_alive(self):
+        """
+        Checks the idle sessions and closes the dead ones, returns the number closed
+        """
+        resp = 0
+        with self._cond:
+            for name in [name for name in self._last_used if name not in self._in_use]:
+                host = self._hosts[name]
+                if self.connection not in host.connections or not self._is_alive(host.connections[self.connection].connection):
+                    self._close(name)
+                    resp += 1
+                else:
+                    self._last_used[name] = time.monotonic()
+        return resp
+
+    def close(self):
+        """
+        Closes all sessions of the pool
+        """
+        with self._cond:
+            for name in list(self._hosts):
+                self._close(name)
@@ -0,0 +1,168 @@
+"""This Module provides the profiling of the config and cdp parsers.
+
+Within profile_parsing() the rule tables of ciscocfg (_KEYS_L3_INT, _KEYS_L2_INT,
+_KEYS_VLAN), the label scan of cdp (_KEYS) and the parsing of every file by
+ListDevices are replaced by counting versions; they are put back on exit, so
+the parsers run unchanged (without any overhead) when profiling is off:
+
+    with profile_parsing() as profile:
+        devices = ListDevices('configs/*.txt', 'cdp/*.txt', flag_vlans=True, flag_l2_int=True)
+    print(profile.report())
+
+Per rule: invocations (searches run, the rules whose keyword is not in a line
+are skipped), matches and cumulative time. The cdp labels are found by a single
+scan, only the scan is timed and the labels have their match counts (time '-').
+Per file: parse time and size, the slowest files and those much slower per
+byte than the median are flagged.
+Only this process is profiled, the files parsed by workers > 1 are not counted.
+"""
+
+import os
+from contextlib import contextmanager
+from time import perf_counter
+import alexlibs.cdp as cdp
+import alexlibs.ciscocfg as ciscocfg
+
+# name of the profiled table -> attribute of ciscocfg
+TABLES = {
+    'l3_int': '_RULES_L3_INT',
+    'l2_int': '_RULES_L2_INT',
+    'vlan': '_RULES_VLAN',
+}
+
+_SAFE_PARSE = ciscocfg._safe_parse
+
+
+def _untimed_parse():
+    return _SAFE_PARSE
+
+
+class _TimedParse():
+    """
+    This Class represents ciscocfg._safe_parse timing the parsing of every file
+    """
+
+    def __init__(self, safe_parse, profile):
+        self.safe_parse = safe_parse
+        self.profile = profile
+
+    def __call__(self, parse_func, file_name):
+        start = perf_counter()
+        resp = self.safe_parse(parse_func, file_name)
+        kind = getattr(parse_func, 'func', parse_func).__name__.replace('parse_', '').replace('_file', '')
+        self.profile.add_file(file_name, kind, perf_counter() - start, resp[1])
+        return resp
+
+    def __reduce__(self):
+        # worker processes (workers > 1) get the plain function
+        return (_untimed_parse, ())
+
+
+class ParseProfile():
+    """
+    This Class represents the rule counters and the file timings of profiled parsing
+    """
+
+    def __init__(self):
+        # (table, rule) -> [invocations, matches, seconds], seconds is None for the rules counted only
+        self.rules = dict()
+        self.files = []
+
+    def __repr__(self):
+        return 'ParseProfile: {} rules {} files'.format(len(self.rules), len(self.files))
+
+    def add_rule(self, table, key, matched, seconds=None):
+        stat = self.rules.get((table, key))
+        if stat is None:
+            stat = self.rules[(table, key)] = [0, 0, None if seconds is None else 0.0]
+        stat[0] += 1
+        stat[1] += matched
+        if seconds is not None:
+            stat[2] += seconds
+
+    def add_file(self, file_name, kind, seconds, error=None):
+        try:
+            size = os.path.getsize(file_name)
+        except OSError:
+            size = 0
+        self.files.append({'file': file_name, 'kind': kind, 'seconds': seconds, 'size': size, 'error': error})
+
+    def rule_stats(self):
+        """
+        returns a row per rule, the most expensive first (the rules counted only last)
+        """
+        resp = [{'table': table, 'rule': key, 'invocations': stat[0], 'matches': stat[1], 'seconds': stat[2],
+                 'us_per_call': None if stat[2] is None else stat[2] * 1000000 / stat[0] if stat[0] else 0.0}
+                for (table, key), stat in self.rules.items()]
+        return sorted(resp, key=lambda row: (row['seconds'] is None, -(row['seconds'] or 0.0)))
+
+    def slowest_files(self, count=10):
+        return sorted(self.files, key=lambda row: -row['seconds'])[:count]
+
+    def flagged_files(self, factor=5.0):
+        """
+        returns the files whose time per byte is more than factor times the median of their kind
+        """
+        resp = []
+        for kind in {row['kind'] for row in self.files}:
+            rows = [row for row in self.files if row['kind'] == kind and row['size']]
+            if not rows:
+                continue
+            rates = sorted(row['seconds'] / row['size'] for row in rows)
+            median = rates[len(rates) // 2]
+            resp.extend(row for row in rows if row['seconds'] / row['size'] > factor * median)
+        return sorted(resp, key=lambda row: -row['seconds'])
+
+    @property
+    def dict(self):
+        resp = {
+            'rules': self.rule_stats(),
+            'files': self.files,
+            'slowest_files': self.slowest_files(),
+            'flagged_files': self.flagged_files(),
+        }
+        return resp
+
+    def report(self, count=10, factor=5.0):
+        """
+        returns the text of the rule counters, the slowest and the flagged files
+        """
+        resp = [f'===== Rules {"invocations":>12s} {"matches":>10s} {"total ms":>10s} {"us/call":>8s}']
+        for row in self.rule_stats():
+            name = f'{row["table"]}.{row["rule"]}'
+            if row['seconds'] is None:
+                resp.append(f'{name:28s} {row["invocations"]:12d} {row["matches"]:10d} {"-":>10s} {"-":>8s}')
+                continue
+            resp.append(f'{name:28s} {row["invocations"]:12d} {row["matches"]:10d} {row["seconds"] * 1000:10.2f} '
+                        f'{row["us_per_call"]:8.2f}')
+        total = sum(row['seconds'] for row in self.files)
+        resp.append(f'===== Files: {len(self.files)} parsed in {total:.3f} s, the {count} slowest')
+        for row in self.slowest_files(count):
+            resp.append(f'{row["seconds"] * 1000:10.2f} ms {row["size"] / 1024:10.1f} KB {row["kind"]:6s} {row["file"]}'
+                        + (f'  ({row["error"]})' if row['error'] else ''))
+        flagged = self.flagged_files(factor)
+        if flagged:
+            resp.append(f'===== Files more than {factor:g}x slower per byte than the median')
+            for row in flagged:
+                resp.append(f'{row["seconds"] * 1000:10.2f} ms {row["size"] / 1024:10.1f} KB {row["kind"]:6s} {row["file"]}')
+        return '\n'.join(resp)
+
+
+@contextmanager
+def profile_parsing(profile=None):
+    """
+    Context manager profiling the parsers, yields the ParseProfile
+    """
+    profile = ParseProfile() if profile is None else profile
+    saved = {attr: getattr(ciscocfg, attr) for attr in list(TABLES.values()) + ['_safe_parse']}
+    saved_scan = cdp._FIELDS_RE
+    try:
+        for name, attr in TABLES.items():
+            setattr(ciscocfg, attr, ciscocfg.ProfiledRuleTable(saved[attr], name, profile))
+        ciscocfg._safe_parse = _TimedParse(saved['_safe_parse'], profile)
+        cdp._FIELDS_RE = cdp.ProfiledScan(saved_scan, profile)
+        yield profile
+    finally:
+        for attr, value in saved.items():
+            setattr(ciscocfg, attr, value)
+        cdp._FIELDS_RE = saved_scan
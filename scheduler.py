@@ -0,0 +1,275 @@
+"""This Module provides a scheduler which runs a nornir task over the hosts.
+
+It replaces the nornir runner when a run must not be held up by a few hosts:
+every host has a timeout and the run an overall deadline (a host which does
+not finish in time is marked failed and its sessions are closed), the number
+of hosts running at once can be limited per role (host.data['role']), failed
+hosts are retried with an exponential backoff and, with slow_first, the hosts
+which were the slowest in the previous runs are started first.
+
+A thread can not be stopped: the thread of an abandoned host (timeout or
+deadline) runs on until its command fails or returns, but the processors
+(HostStream, RunMetrics) no longer hear from it and on_abandon, if given,
+is called as on_abandon(hostname) to drop its session (ConnectionPool.evict).
+The failed result of a host which timed out or was not run before the deadline
+is handed to the processors instead, as the runner does for any failed host.
+"""
+
+import json
+import os
+import threading
+import time
+
+from nornir.core.inventory import ConnectionOptions
+from nornir.core.task import AggregatedResult, MultiResult, Result, Task
+
+
+class _JobProcessors():
+    """
+    This Class represents the processors of a nornir object as seen by a job,
+    they are no longer called once the job is abandoned
+    """
+
+    def __init__(self, processors, job):
+        self.processors = processors
+        self.job = job
+
+    def __getattr__(self, name):
+        method = getattr(self.processors, name)
+
+        def call(*args):
+            with self.job.lock:
+                if self.job.abandoned:
+                    return
+                method(*args)
+                if name == 'task_instance_completed':
+                    self.job.reported = True
+        return call
+
+
+class _JobNornir():
+    """
+    This Class represents the nornir object handed to the task of a job
+    """
+
+    def __init__(self, nornir, job):
+        self._nornir = nornir
+        self.processors = _JobProcessors(nornir.processors, job)
+
+    def __getattr__(self, name):
+        return getattr(self._nornir, name)
+
+
+class _Job():
+    """
+    This Class represents a run of the task on a host in its own thread
+    """
+
+    def __init__(self, task, host, nornir, attempt, wakeup):
+        self.host = host
+        self.attempt = attempt
+        self.result = None
+        self.started = time.monotonic()
+        self.finished = None
+        self.done = threading.Event()
+        # the task of the host was reported to the processors / the job was given up
+        self.reported = False
+        self.abandoned = False
+        self.lock = threading.Lock()
+        self._wakeup = wakeup
+        self.task = task.copy()
+        self._thread = threading.Thread(target=self._run, args=(self.task, _JobNornir(nornir, self)), daemon=True)
+        self._thread.start()
+
+    def abandon(self):
+        """
+        Gives the job up, returns False if its host was reported meanwhile (the job is finishing)
+        """
+        with self.lock:
+            if self.reported:
+                return False
+            self.abandoned = True
+            return True
+
+    def _run(self, task, nornir):
+        try:
+            self.result = task.start(self.host, nornir)
+        finally:
+            self.finished = time.monotonic()
+            self.done.set()
+            self._wakeup.set()
+
+
+def failed_result(host, name, message):
+    """
+    returns a MultiResult with a failed result (the host was not run or did not finish)
+    """
+    result = MultiResult(name)
+    res = Result(host, exception=TimeoutError(message), result=message, failed=True)
+    res.name = name
+    result.append(res)
+    return result
+
+
+def apply_cmd_timeout(hosts, seconds, connection='netmiko'):
+    """
+    Sets the read and session timeouts of the sessions opened from now on
+    """
+    for host in hosts:
+        options = host.connection_options.get(connection)
+        if options is None:
+            options = ConnectionOptions(extras={})
+            host.connection_options[connection] = options
+        if options.extras is None:
+            options.extras = {}
+        options.extras['timeout'] = seconds
+        options.extras['session_timeout'] = seconds
+
+
+class Scheduler():
+    """
+    This Class represents the scheduling of a task over the hosts of a nornir object
+    """
+
+    def __init__(self, num_workers=20, host_timeout=None, cmd_timeout=None, deadline=None, role_limits=None,
+                 retries=0, backoff=1.0, slow_first=False, timings_file=None):
+        self.num_workers = num_workers
+        self.host_timeout = host_timeout
+        self.cmd_timeout = cmd_timeout
+        self.deadline = deadline
+        self.role_limits = dict() if role_limits is None else role_limits
+        self.retries = retries
+        self.backoff = backoff
+        self.slow_first = slow_first
+        self.timings_file = timings_file
+        self.timings = dict()
+        self.stats = dict()
+        # called with the hostname of an abandoned host
+        self.on_abandon = None
+        if timings_file is not None and os.path.exists(timings_file):
+            with open(timings_file) as input_f:
+                self.timings = json.load(input_f)
+
+    def __repr__(self):
+        return 'Scheduler: workers={} host_timeout={} deadline={}'.format(self.num_workers, self.host_timeout, self.deadline)
+
+    @staticmethod
+    def role(host):
+        return host.data.get('role')
+
+    def order(self, hosts):
+        """
+        returns the hosts in the order they are started, the slowest of the previous runs first
+        (hosts without timings are taken as the slowest)
+        """
+        if not self.slow_first:
+            return list(hosts)
+        return sorted(hosts, key=lambda host: -self.timings.get(host.name, float('inf')))
+
+    def _save_timings(self):
+        if self.timings_file is None:
+            return
+        with open(self.timings_file, 'w') as output_f:
+            json.dump(self.timings, output_f, indent=2, sort_keys=True)
+
+    def _abandon(self, job):
+        """
+        The thread of a job can not be stopped, its sessions are closed to break a hung command.
+        returns False if the job completed meanwhile (it was not abandoned)
+        """
+        if not job.abandon():
+            job.done.wait()
+            return False
+        if self.on_abandon is not None:
+            self.on_abandon(job.host.name)
+        try:
+            job.host.close_connections()
+        except Exception:
+            pass
+        return True
+
+    @staticmethod
+    def _report(nor, task, host, result):
+        """
+        Hands a failed result made by the scheduler to the processors
+        """
+        nor.processors.task_instance_completed(task, host, result)
+        return result
+
+    def run(self, nor, task, on_good=True, on_failed=False, **kwargs):
+        """
+        Runs the task over the hosts like nor.run and returns the AggregatedResult
+        """
+        task = Task(task, **kwargs)
+        nor.processors.task_started(task)
+        hosts = [host for name, host in nor.inventory.hosts.items()
+                 if (on_good and name not in nor.data.failed_hosts) or (on_failed and name in nor.data.failed_hosts)]
+        if self.cmd_timeout is not None:
+            apply_cmd_timeout(hosts, self.cmd_timeout)
+        results = dict()
+        wakeup = threading.Event()
+        self.stats = {'timeouts': 0, 'retries': 0, 'deadline': 0}
+        start = time.monotonic()
+        end = None if self.deadline is None else start + self.deadline
+        # (ready time, attempt, host) of the hosts waiting to run
+        pending = [(start, 0, host) for host in self.order(hosts)]
+        running = []
+        per_role = dict()
+        while pending or running:
+            now = time.monotonic()
+            if end is not None and now >= end:
+                for job in running:
+                    if job.done.is_set() or not self._abandon(job):
+                        results[job.host.name] = job.result
+                        continue
+                    results[job.host.name] = self._report(nor, job.task, job.host,
+                                                          failed_result(job.host, task.name, 'Run deadline exceeded'))
+                    self.stats['deadline'] += 1
+                for _, _, host in pending:
+                    results[host.name] = self._report(nor, task.copy(), host,
+                                                      failed_result(host, task.name, 'Run deadline exceeded'))
+                self.stats['deadline'] += len(pending)
+                break
+            for job in list(running):
+                timed_out = self.host_timeout is not None and now - job.started > self.host_timeout
+                if not job.done.is_set() and not timed_out:
+                    continue
+                running.remove(job)
+                per_role[self.role(job.host)] -= 1
+                abandoned = not job.done.is_set() and self._abandon(job)
+                if abandoned:
+                    self.stats['timeouts'] += 1
+                    job_result = failed_result(job.host, task.name, f'Host timeout after {self.host_timeout}s')
+                    self.timings[job.host.name] = self.host_timeout
+                else:
+                    job_result = job.result
+                    self.timings[job.host.name] = round(job.finished - job.started, 3)
+                if job_result.failed and job.attempt < self.retries:
+                    self.stats['retries'] += 1
+                    pending.append((now + self.backoff * 2 ** job.attempt, job.attempt + 1, job.host))
+                elif abandoned:
+                    results[job.host.name] = self._report(nor, job.task, job.host, job_result)
+                else:
+                    results[job.host.name] = job_result
+            for item in list(pending):
+                if len(running) >= self.num_workers:
+                    break
+                ready, attempt, host = item
+                role = self.role(host)
+                if ready > now or per_role.get(role, 0) >= self.role_limits.get(role, self.num_workers):
+                    continue
+                pending.remove(item)
+                per_role[role] = per_role.get(role, 0) + 1
+                running.append(_Job(task, host, nor, attempt, wakeup))
+            # woken up by a finished job, otherwise timeouts and backoffs are checked every 50ms
+            wakeup.wait(0.05)
+            wakeup.clear()
+        # in the order of the inventory as the nornir runner
+        result = AggregatedResult(kwargs.get('name') or task.name)
+        for host in hosts:
+            if host.name in results:
+                result[host.name] = results[host.name]
+        nor.data.failed_hosts.update(result.failed_hosts.keys())
+        nor.processors.task_completed(task, result)
+        self._save_timings()
+        return result
@@ -0,0 +1,283 @@
+"""This Module provides synthetic outputs of Cisco devices.
+
+They feed the benchmarks and the fake devices (alexlibs.fakedevice) with
+'show run', 'show cdp neighbors detail', 'show ip ospf ...' and 'ping'
+outputs of any size without real routers. synthetic_corpus() writes the
+config and CDP files of a whole fleet at one of the SCALES (or any size);
+the outputs are deterministic, so timings can be compared across commits.
+"""
+
+import os
+
+# Parameters of synthetic_corpus: devices and, per device, interfaces of each kind
+SCALES = {
+    'small': {'devices': 10, 'routed': 4, 'subinterfaces': 4, 'vrfs': 4, 'svis': 8, 'secondary': 1,
+              'trunks': 4, 'access': 24, 'vlans': 32, 'vlan_ranges': 2, 'neighbors': 2},
+    'medium': {'devices': 50, 'routed': 8, 'subinterfaces': 32, 'vrfs': 16, 'svis': 64, 'secondary': 1,
+               'trunks': 8, 'access': 96, 'vlans': 256, 'vlan_ranges': 4, 'neighbors': 4},
+    'large': {'devices': 20, 'routed': 16, 'subinterfaces': 64, 'vrfs': 32, 'svis': 256, 'secondary': 2,
+              'trunks': 16, 'access': 480, 'vlans': 1000, 'vlan_ranges': 8, 'neighbors': 8},
+}
+
+
+def _ipv4(val):
+    return f'{val >> 24 & 255}.{val >> 16 & 255}.{val >> 8 & 255}.{val & 255}'
+
+
+def synthetic_config(hostname, interfaces=4, vlans=4):
+    """
+    returns a 'show run' output with interfaces L3 interfaces and vlans VLANs
+    """
+    resp = ['Building configuration...', '', f'hostname {hostname}', '!']
+    for vlan in range(10, 10 + vlans):
+        resp.extend([f'vlan {vlan}', f' name VLAN{vlan}', '!'])
+    for idx in range(interfaces):
+        resp.extend([f'interface GigabitEthernet0/{idx}',
+                     f' description link {idx}',
+                     f' ip address {_ipv4((10 << 24) + (idx << 8) + 1)} 255.255.255.0',
+                     '!'])
+    resp.append('end')
+    return '\n'.join(resp)
+
+
+def _vlan_list(first, count, step=1):
+    """
+    returns a 'switchport trunk allowed vlan' list: a range and some single VLANs
+    """
+    singles = [f'{first + count + idx * step}' for idx in range(3)]
+    return ','.join([f'{first}-{first + count - 1}'] + singles)
+
+
+def synthetic_ios_config(hostname, index=0, routed=4, subinterfaces=4, vrfs=4, svis=8, secondary=1,
+                         trunks=4, access=24, vlans=32, vlan_ranges=2):
+    """
+    returns a 'show run' output of a distribution router/switch:
+    routed uplinks with subinterfaces in VRFs (HSRP, helpers, ACLs), SVIs with HSRP
+    and secondary addresses, trunks in port-channels, access ports, VLANs and VLAN ranges.
+    index makes the addresses of the device unique in a corpus.
+    """
+    base = (10 << 24) + ((index & 255) << 16)
+    resp = ['Building configuration...', '', '!', 'version 15.2', 'service timestamps log datetime msec',
+            f'hostname {hostname}', '!']
+    for vrf in range(1, vrfs + 1):
+        resp.extend([f'vrf definition CUST{vrf}', f' rd 65000:{vrf}', ' address-family ipv4',
+                     ' exit-address-family', '!'])
+    for vlan in range(10, 10 + vlans):
+        resp.extend([f'vlan {vlan}', f' name VLAN{vlan}_{hostname}', '!'])
+    for idx in range(vlan_ranges):
+        first = 2000 + idx * 100
+        resp.extend([f'vlan {first}-{first + 49},{first + 60}', '!'])
+    resp.extend(['interface Loopback0', f' ip address {_ipv4(base + 255)} 255.255.255.255', '!'])
+    for port in range(routed):
+        resp.extend([f'interface TenGigabitEthernet0/1/{port}',
+                     f' description uplink {port} to core',
+                     f' ip address {_ipv4((172 << 24) + (16 << 16) + (index << 6) + port * 4 + 1)} 255.255.255.252',
+                     ' ip ospf network point-to-point',
+                     '!'])
+        for sub in range(1, subinterfaces + 1):
+            tag = port * subinterfaces + sub
+            net = base + ((tag & 127) << 8) + (port << 15)
+            resp.extend([f'interface TenGigabitEthernet0/1/{port}.{100 + sub}',
+                         f' description customer {tag}',
+                         f' encapsulation dot1Q {100 + sub}',
+                         f' vrf forwarding CUST{tag % max(vrfs, 1) + 1}' if vrfs else ' no shutdown',
+                         f' ip address {_ipv4(net + 2)} 255.255.255.0',
+                         f' standby {sub} ip {_ipv4(net + 1)}',
+                         f' standby {sub} priority {110 if index % 2 == 0 else 100}',
+                         f' standby {sub} preempt',
+                         f' ip helper-address {_ipv4(base + 250)}',
+                         f' ip access-group CUST{tag}_IN in'])
+            if sub % 10 == 0:
+                resp.append(' shutdown')
+            resp.append('!')
+    for idx in range(svis):
+        vlan = 10 + idx % max(vlans, 1)
+        net = (192 << 24) + (168 << 16) + ((index * svis + idx) % 65536 << 8)
+        resp.extend([f'interface Vlan{vlan}',
+                     f' description SVI VLAN{vlan}',
+                     f' ip address {_ipv4(net + 2)} 255.255.255.0'])
+        for sec in range(secondary):
+            resp.append(f' ip address {_ipv4(net + 130 + sec)} 255.255.255.128 secondary')
+        resp.extend([f' standby {vlan} ip {_ipv4(net + 1)}',
+                     f' standby {vlan} priority {120 - idx % 2 * 20}',
+                     '!'])
+    channels = max(trunks // 2, 1)
+    for channel in range(1, channels + 1):
+        resp.extend([f'interface Port-channel{channel}',
+                     f' description trunk bundle {channel}',
+                     ' switchport trunk encapsulation dot1q',
+                     f' switchport trunk allowed vlan {_vlan_list(10, vlans, 7)}',
+                     ' switchport mode trunk',
+                     '!'])
+    for port in range(trunks):
+        resp.extend([f'interface GigabitEthernet1/0/{port + 1}',
+                     f' description trunk {port + 1}',
+                     ' switchport trunk encapsulation dot1q',
+                     f' switchport trunk allowed vlan {_vlan_list(10, vlans, 7)}',
+                     ' switchport mode trunk',
+                     f' channel-group {port // 2 % channels + 1} mode active',
+                     ' spanning-tree guard root',
+                     '!'])
+    for port in range(access):
+        resp.extend([f'interface GigabitEthernet{2 + port // 48}/0/{port % 48 + 1}',
+                     f' description access {port + 1}',
+                     f' switchport access vlan {10 + port % max(vlans, 1)}',
+                     ' switchport mode access',
+                     ' speed 1000',
+                     ' spanning-tree portfast'])
+        if port % 12 == 11:
+            resp.append(' shutdown')
+        resp.append('!')
+    resp.extend(['interface GigabitEthernet0/0', ' description oob', ' no ip address', ' shutdown', '!',
+                 'router ospf 1', f' router-id {_ipv4(base + 255)}', ' passive-interface default', '!',
+                 'line vty 0 4', ' transport input ssh', '!', 'end'])
+    return '\n'.join(resp)
+
+
+def synthetic_cdp(neighbors):
+    """
+    returns a 'show cdp neighbors detail' output,
+    neighbors is a list of (device_id, local_port, remote_port, ip address, platform)
+    """
+    resp = []
+    for device_id, local_port, remote_port, ip_address, platform in neighbors:
+        resp.append(f'''-------------------------
+Device ID: {device_id}
+Entry address(es):
+  IP address: {ip_address}
+Platform: cisco {platform},  Capabilities: Router Switch IGMP
+Interface: {local_port},  Port ID (outgoing port): {remote_port}
+Holdtime : 150 sec
+
+Version :
+Cisco IOS Software, C2900 Software (C2900-UNIVERSALK9-M), Version 15.2(4)M6, RELEASE SOFTWARE (fc2)
+Technical Support: http://www.cisco.com/techsupport
+
+advertisement version: 2
+VTP Management Domain: ''
+Native VLAN: 1
+Duplex: full
+Management address(es):
+  IP address: {ip_address}
+''')
+    resp.append(f'\nTotal cdp entries displayed : {len(neighbors)}')
+    return '\n'.join(resp)
+
+
+def synthetic_corpus(out_dir, devices=10, neighbors=2, **kwargs):
+    """
+    Writes the config (<out_dir>/config/<host>-config.txt) and CDP (<out_dir>/cdp/<host>-cdp.txt)
+    files of devices devices as saved by AlexNornir, every device has CDP neighbors in the corpus
+    (and one outside it), kwargs are handed to synthetic_ios_config.
+    returns (config files glob, cdp files glob)
+    """
+    for sub_dir in ('config', 'cdp'):
+        os.makedirs(f'{out_dir}/{sub_dir}', exist_ok=True)
+    trunks = kwargs.get('trunks', 4)
+    for idx in range(devices):
+        hostname = f'sw{idx:04d}'
+        with open(f'{out_dir}/config/{hostname}-config.txt', 'w') as output_f:
+            output_f.write(f'{hostname}#show run\n')
+            output_f.write(synthetic_ios_config(hostname, index=idx, **kwargs))
+        nei = []
+        for step in range(1, min(neighbors, max(devices - 1, 0)) + 1):
+            peer = (idx + step) % devices
+            nei.append((f'sw{peer:04d}.lab.local', f'GigabitEthernet1/0/{(step - 1) % max(trunks, 1) + 1}',
+                        f'GigabitEthernet1/0/{step % max(trunks, 1) + 1}',
+                        _ipv4((10 << 24) + ((peer & 255) << 16) + 255), 'WS-C3850-48P'))
+        nei.append((f'phone{idx:04d}', 'GigabitEthernet2/0/1', 'Port 1', _ipv4((10 << 24) + (200 << 16) + idx),
+                     'IP Phone 8851'))
+        with open(f'{out_dir}/cdp/{hostname}-cdp.txt', 'w') as output_f:
+            output_f.write(f'{hostname}#show cdp nei deta\n')
+            output_f.write(synthetic_cdp(nei))
+    return f'{out_dir}/config/*-config.txt', f'{out_dir}/cdp/*-cdp.txt'
+
+
+def synthetic_ospf_dbsum(areas, process_id=1, rid='10.0.0.1'):
+    """
+    returns a 'show ip ospf database database-summary' output with areas areas
+    """
+    resp = [f'\n            OSPF Router with ID ({rid}) (Process ID {process_id})\n']
+    totals = [0] * 6
+    for area in range(areas):
+        counts = [area % 7 + 1, area % 3, area % 11 + 2, area % 2, 0, 0]
+        totals = [total + count for total, count in zip(totals, counts)]
+        resp.append(f'''Area {area} database summary
+  LSA Type      Count    Delete   Maxage
+  Router        {counts[0]}        0        0
+  Network       {counts[1]}        0        0
+  Summary Net   {counts[2]}        0        0
+  Summary ASBR  {counts[3]}        0        0
+  Type-7 Ext    {counts[4]}        0        0
+    Prefixes redistributed in Type-7  0
+  Opaque Link   0        0        0
+  Opaque Area   0        0        0
+  Subtotal      {sum(counts)}        0        0
+''')
+    resp.append(f'''Process {process_id} database summary
+  LSA Type      Count    Delete   Maxage
+  Router        {totals[0]}        0        0
+  Network       {totals[1]}        0        0
+  Summary Net   {totals[2]}        0        0
+  Summary ASBR  {totals[3]}        0        0
+  Type-7 Ext    {totals[4]}        0        0
+  Opaque Link   0        0        0
+  Opaque Area   0        0        0
+  Type-5 Ext    {areas}        0        0
+      Prefixes redistributed in Type-5  0
+  Opaque AS     0        0        0
+  Non-self      {sum(totals)}
+  Total         {sum(totals) + areas}        0        0
+''')
+    return '\n'.join(resp)
+
+
+def synthetic_ospf_process(areas, process_id=1, rid='10.0.0.1'):
+    """
+    returns a 'show ip ospf' output with areas areas
+    """
+    resp = [f''' Routing Process "ospf {process_id}" with ID {rid}
+ Start time: 00:00:10.123, Time elapsed: 1w2d
+ Supports only single TOS(TOS0) routes
+ It is an area border and autonomous system boundary router
+ Initial SPF schedule delay 5000 msecs
+ Minimum hold time between two consecutive SPFs 10000 msecs
+ Maximum wait time between two consecutive SPFs 10000 msecs
+ Incremental-SPF disabled
+ Reference bandwidth unit is 100 mbps''']
+    for area in range(areas):
+        name = 'BACKBONE(0)' if area == 0 else f'{area}'
+        kind = '\n        It is a stub area' if area % 5 == 4 else ''
+        resp.append(f'''    Area {name}
+        Number of interfaces in this area is {area % 4 + 1}{kind}
+        Area has no authentication
+        SPF algorithm last executed 00:01:02.345 ago''')
+    return '\n'.join(resp)
+
+
+def synthetic_ospf_neighbors(neighbors, rids=None):
+    """
+    returns a 'show ip ospf neighbor' output with neighbors neighbors
+    (or one per router ID of rids)
+    """
+    if rids is None:
+        rids = [_ipv4((10 << 24) + idx) for idx in range(neighbors)]
+    resp = ['Neighbor ID     Pri   State           Dead Time   Address         Interface']
+    for idx, rid in enumerate(rids):
+        resp.append(f'{rid:15s}   1   FULL/DR         00:00:3{idx % 10}    {_ipv4((172 << 24) + (16 << 16) + idx):15s} '
+                    f'GigabitEthernet0/{idx % 48}')
+    return '\n'.join(resp)
+
+
+def synthetic_ping(address, success=True):
+    """
+    returns a 'ping <address> repeat 3' output
+    """
+    if success:
+        result = 'Success rate is 100 percent (3/3), round-trip min/avg/max = 1/1/2 ms'
+    else:
+        result = 'Success rate is 0 percent (0/3)'
+    return f'''Type escape sequence to abort.
+Sending 3, 100-byte ICMP Echos to {address}, timeout is 2 seconds:
+{'!!!' if success else '...'}
+{result}'''
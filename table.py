@@ -0,0 +1,133 @@
+"""This Module provides a column oriented table for the records of a whole fleet.
+
+Columns with a few repeated values (hostname, vrf, status, platform, ...) are
+dictionary-encoded: every distinct value is kept once and the rows store
+a small integer code in an array.
+"""
+
+import sys
+from array import array
+
+
+class ColumnTable():
+    """
+    This Class represents a table of records stored column by column
+    """
+
+    def __init__(self, fields, categorical=()):
+        self.fields = list(fields)
+        self.categorical = frozenset(categorical)
+        self._columns = {field: array('I') if field in self.categorical else [] for field in self.fields}
+        self._values = {field: [] for field in self.categorical}
+        self._codes = {field: dict() for field in self.categorical}
+        self._len = 0
+
+    def __repr__(self):
+        return 'ColumnTable: {} rows {}'.format(self._len, self.fields)
+
+    def __len__(self):
+        return self._len
+
+    def __iter__(self):
+        for idx in range(self._len):
+            yield self.row(idx)
+
+    def _encode(self, field, val):
+        codes = self._codes[field]
+        code = codes.get(val)
+        if code is None:
+            if isinstance(val, str):
+                val = sys.intern(val)
+            code = len(self._values[field])
+            codes[val] = code
+            self._values[field].append(val)
+        return code
+
+    def append(self, record, **extra):
+        """
+        Appends a record, a dict or an object with an attribute per field.
+        Extra values (e.g. hostname) override the fields of the record.
+        """
+        is_dict = isinstance(record, dict)
+        for field in self.fields:
+            if field in extra:
+                val = extra[field]
+            elif is_dict:
+                val = record.get(field)
+            else:
+                val = getattr(record, field, None)
+            if field in self.categorical:
+                self._columns[field].append(self._encode(field, val))
+            else:
+                self._columns[field].append(val)
+        self._len += 1
+
+    def extend(self, records, **extra):
+        """
+        Appends records, extra values (e.g. hostname) are added to each of them
+        """
+        for record in records:
+            self.append(record, **extra)
+
+    def column(self, field):
+        """
+        returns the values of a column as a list
+        """
+        if field in self.categorical:
+            values = self._values[field]
+            return [values[code] for code in self._columns[field]]
+        return list(self._columns[field])
+
+    def distinct(self, field):
+        """
+        returns the distinct values of a categorical column
+        """
+        return list(self._values[field])
+
+    def count(self, field):
+        """
+        returns a dictionary value -> number of rows of a categorical column
+        """
+        values = self._values[field]
+        counts = [0] * len(values)
+        for code in self._columns[field]:
+            counts[code] += 1
+        return dict(zip(values, counts))
+
+    def groups(self, by, field):
+        """
+        returns a dictionary value of by -> {value of field: [row indexes]}
+        """
+        keys = self._columns[by]
+        values = self.column(field) if field in self.categorical else self._columns[field]
+        resp = dict()
+        for idx, (key, val) in enumerate(zip(keys, values)):
+            resp.setdefault(key, dict()).setdefault(val, []).append(idx)
+        if by in self.categorical:
+            names = self._values[by]
+            resp = {names[key]: group for key, group in resp.items()}
+        return resp
+
+    def where(self, field, value):
+        """
+        returns the row indexes where the column equals value
+        """
+        col = self._columns[field]
+        if field in self.categorical:
+            code = self._codes[field].get(value)
+            if code is None:
+                return []
+            return [idx for idx, val in enumerate(col) if val == code]
+        return [idx for idx, val in enumerate(col) if val == value]
+
+    def row(self, idx):
+        """
+        returns a dictionary of the row
+        """
+        resp = dict()
+        for field in self.fields:
+            val = self._columns[field][idx]
+            if field in self.categorical:
+                val = self._values[field][val]
+            resp[field] = val
+        return resp
@@ -0,0 +1,14 @@
+"""
+The repository is the alexlibs package, it is made importable under that name when it is not installed
+"""
+
+import importlib.util
+import os
+import sys
+
+if importlib.util.find_spec('alexlibs') is None:
+    _ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    _SPEC = importlib.util.spec_from_file_location('alexlibs', os.path.join(_ROOT, '__init__.py'),
+                                                   submodule_search_locations=[_ROOT])
+    sys.modules['alexlibs'] = importlib.util.module_from_spec(_SPEC)
+    _SPEC.loader.exec_module(sys.modules['alexlibs'])
@@ -0,0 +1,66 @@
+import contextlib
+import io
+
+from alexlibs.diff import device_key, diff_snapshots, fingerprint
+from alexlibs.synthetic import synthetic_cdp, synthetic_config
+
+NEIGHBORS = [('sw1.lab.local', 'GigabitEthernet0/1', 'GigabitEthernet1/0/1', '10.0.0.2', 'WS-C3750'),
+             ('sw2', 'GigabitEthernet0/2', 'GigabitEthernet1/0/2', '10.0.0.3', 'WS-C3750')]
+
+
+def test_device_key():
+    assert device_key('out/R1-config.txt') == 'r1'
+    assert device_key('cdp/r1-cdp.txt') == 'r1'
+    assert device_key('cdp/r1/r1-output-2024-01-31-12-05.markdown') == 'r1'
+    assert device_key('10.1.1.1-config.txt') == '10.1.1.1'
+    assert device_key('r1.example.com-config.txt') != device_key('r1.example.net-config.txt')
+
+
+def test_fingerprint_volatile_lines(tmp_path):
+    old, new = tmp_path / 'old.txt', tmp_path / 'new.txt'
+    old.write_text('! Last configuration change at 10:00\nhostname r1\n' + synthetic_cdp(NEIGHBORS))
+    new.write_text('! Last configuration change at 11:00\nhostname r1\n' + synthetic_cdp(NEIGHBORS).replace('Holdtime : 150', 'Holdtime : 97'))
+    assert fingerprint(old) == fingerprint(new)
+
+
+def _snapshot(root, configs, cdps):
+    (root / 'config').mkdir(parents=True)
+    for host, text in configs.items():
+        (root / 'config' / f'{host}-config.txt').write_text(text)
+    for host, text in cdps.items():
+        (root / 'cdp' / host).mkdir(parents=True)
+        (root / 'cdp' / host / f'{host}-output-2024-01-31-12-05.markdown').write_text(text)
+
+
+def _diff(tmp_path):
+    with contextlib.redirect_stdout(io.StringIO()):
+        return diff_snapshots(f'{tmp_path}/old/config/*', f'{tmp_path}/new/config/*',
+                              f'{tmp_path}/old/cdp/*/*', f'{tmp_path}/new/cdp/*/*')
+
+
+def test_diff_pairs_config_and_cdp(tmp_path):
+    _snapshot(tmp_path / 'old', {'r1': synthetic_config('r1'), 'r2': synthetic_config('r2'), 'r3': synthetic_config('r3')},
+              {'r1': synthetic_cdp(NEIGHBORS), 'r2': synthetic_cdp(NEIGHBORS)})
+    _snapshot(tmp_path / 'new', {'r1': synthetic_config('r1', interfaces=5), 'r2': synthetic_config('r2'),
+                                 'r4': synthetic_config('r4')},
+              {'r1': synthetic_cdp(NEIGHBORS[:1]), 'r2': synthetic_cdp(NEIGHBORS).replace('Holdtime : 150', 'Holdtime : 97')})
+    resp = _diff(tmp_path)
+    assert resp.added == ['r4'] and resp.removed == ['r3']
+    assert resp.unchanged == ['r2']
+    assert [dev_diff.device for dev_diff in resp.changed] == ['r1']
+    dev_diff = resp.changed[0]
+    assert dev_diff.interfaces_added == ['GigabitEthernet0/4']
+    assert dev_diff.links_removed == [('GigabitEthernet0/2', 'sw2', 'GigabitEthernet1/0/2')]
+    # only r1 is parsed: its config and its cdp file in both snapshots
+    assert resp.stats == {'compared': 4, 'skipped': 2, 'parsed': 4}
+    assert resp.errors == []
+
+
+def test_diff_duplicate_devices(tmp_path):
+    _snapshot(tmp_path / 'old', {'r1': synthetic_config('r1'), '10.1.1.1': synthetic_config('a'), '10.1.1.2': synthetic_config('b')}, {})
+    _snapshot(tmp_path / 'new', {'r1': synthetic_config('r1'), '10.1.1.1': synthetic_config('a'), '10.1.1.2': synthetic_config('b')}, {})
+    (tmp_path / 'new' / 'config' / 'R1.txt').write_text(synthetic_config('r1'))
+    resp = _diff(tmp_path)
+    assert resp.unchanged == ['10.1.1.1', '10.1.1.2']
+    assert [key for key, _ in resp.errors] == ['r1']
+    assert resp.added == [] and resp.removed == []
@@ -0,0 +1,42 @@
+import pytest
+
+from alexlibs.ipindex import SubnetIndex, int_to_ipv4, ipv4_to_int, netmask_bits, parse_prefix
+
+
+def _index():
+    index = SubnetIndex()
+    index.add('r1', 'Gi0/0', '', 'primary', ipv4_to_int('10.0.0.1'), 8)
+    index.add('r1', 'Gi0/1', '', 'primary', ipv4_to_int('10.1.0.1'), 16)
+    index.add('r2', 'Gi0/1', '', 'primary', ipv4_to_int('10.1.0.2'), 16)
+    index.add('r2', 'Gi0/2', '', 'primary', ipv4_to_int('10.1.2.1'), 24)
+    index.add('r3', 'Gi0/0', 'CUST', 'primary', ipv4_to_int('10.1.2.1'), 30)
+    return index
+
+
+def test_address_helpers():
+    assert ipv4_to_int('10.1.2.3') == (10 << 24) + (1 << 16) + (2 << 8) + 3
+    assert int_to_ipv4(ipv4_to_int('192.168.0.255')) == '192.168.0.255'
+    assert ipv4_to_int('10.1.2') is None
+    assert ipv4_to_int('10.1.2.256') is None
+    assert netmask_bits(ipv4_to_int('255.255.255.0')) == 24
+    assert parse_prefix('10.1.0.0/16') == (ipv4_to_int('10.1.0.0'), 16)
+
+
+def test_longest_match():
+    index = _index()
+    assert [(ent.hostname, ent.interface) for ent in index.longest_match('10.1.2.9', vrf='')] == [('r2', 'Gi0/2')]
+    assert {ent.hostname for ent in index.longest_match('10.1.3.9', vrf='')} == {'r1', 'r2'}
+    assert [ent.hostname for ent in index.longest_match('10.200.0.1', vrf='')] == ['r1']
+    assert index.longest_match('192.168.0.1') == []
+    # over all vrfs the longest prefix wins
+    assert [ent.vrf for ent in index.longest_match('10.1.2.2')] == ['CUST']
+
+
+def test_owner_and_within():
+    index = _index()
+    assert {ent.vrf for ent in index.owner('10.1.2.1')} == {'', 'CUST'}
+    assert [ent.hostname for ent in index.owner('10.1.2.1', vrf='')] == ['r2']
+    assert sorted(ent.interface for ent in index.within('10.1.0.0/16', vrf='')) == ['Gi0/1', 'Gi0/1', 'Gi0/2']
+    assert ('', '10.0.0.0/8', '10.1.0.0/16') in index.overlapping()
+    with pytest.raises(ValueError):
+        index.owner('10.1.2')
@@ -0,0 +1,130 @@
+import io
+import re
+
+import pytest
+
+import alexlibs.cdp as cdp
+import alexlibs.ciscocfg as ciscocfg
+from alexlibs.synthetic import synthetic_cdp, synthetic_config, synthetic_ios_config
+
+CONFIG = '''R1#show run
+Building configuration...
+
+hostname R1
+!
+vlan 10
+ name USERS
+!
+vlan 20-22,30
+!
+interface Loopback0
+ description Mgmt, loop
+ ip address 10.0.0.1 255.255.255.255
+!
+interface GigabitEthernet0/0
+ description Uplink to core
+ ip address 192.168.1.1 255.255.255.0
+ ip address 192.168.2.1 255.255.255.0 secondary
+ standby 1 ip 192.168.1.254
+ standby 1 priority 110
+ ip helper-address 10.1.1.1
+!
+interface GigabitEthernet0/1.100
+ encapsulation dot1Q 100
+ vrf forwarding CUST
+ ip address 172.16.0.1 255.255.255.252
+ shutdown
+!
+interface GigabitEthernet0/3
+ description access port
+ switchport mode access
+ switchport access vlan 10
+!
+interface GigabitEthernet0/4
+ switchport trunk allowed vlan 10,20-22
+ switchport trunk allowed vlan add 40
+ switchport mode trunk
+ channel-group 1 mode active
+!
+end
+'''
+
+NEIGHBORS = [('sw1.lab.local', 'GigabitEthernet0/1', 'GigabitEthernet1/0/1', '10.0.0.2', 'WS-C3750'),
+             ('sw2', 'GigabitEthernet0/2', 'GigabitEthernet1/0/2', '10.0.0.3', 'WS-C3750')]
+
+
+def _search_per_rule(keys, line, flags):
+    """
+    the rules searched one by one, as before the rule tables
+    """
+    resp = []
+    for key, pattern in keys.items():
+        res = re.search(r'{}\s?(.*)'.format(pattern), line, flags)
+        if res:
+            resp.append((key, res.group(1)))
+    return resp
+
+
+@pytest.mark.parametrize('keys, table, flags', [
+    (ciscocfg._KEYS_L3_INT, ciscocfg._RULES_L3_INT, 0),
+    (ciscocfg._KEYS_L2_INT, ciscocfg._RULES_L2_INT, re.DOTALL),
+    (ciscocfg._KEYS_VLAN, ciscocfg._RULES_VLAN, re.DOTALL),
+])
+def test_rule_table_equivalence(keys, table, flags):
+    lines = (CONFIG + synthetic_config('sw1') + synthetic_ios_config('dist1')).splitlines()
+    for line in lines:
+        assert [(key, res.group(1)) for key, res in table.match(line)] == _search_per_rule(keys, line, flags), line
+
+
+def test_cisco_device(tmp_path):
+    file_name = tmp_path / 'r1-config.txt'
+    file_name.write_text(CONFIG)
+    cisco = ciscocfg.CiscoDevice(str(file_name), flag_l3_int=True, flag_vlans=True, flag_l2_int=True)
+    assert cisco.hostname == 'R1'
+    assert cisco.vlans.to_string() == '10,20-22,30'
+    assert cisco.vlan_names == {10: 'USERS'}
+    l3 = {ent.name: ent for ent in cisco.l3_int_entries}
+    assert l3['Loopback0'].desc == 'Mgmt'
+    assert l3['GigabitEthernet0/0'].ipv4 == '192.168.1.1 255.255.255.0'
+    assert l3['GigabitEthernet0/0'].ipv4_sec == '192.168.2.1 255.255.255.0'
+    assert l3['GigabitEthernet0/0'].ipv4_net == '192.168.1.0/24'
+    assert l3['GigabitEthernet0/0'].hsrp_ip == '192.168.1.254'
+    assert l3['GigabitEthernet0/1.100'].vrf == 'CUST'
+    assert l3['GigabitEthernet0/1.100'].status == 'shutdown'
+    l2 = {ent.name: ent for ent in cisco.l2_int_entries}
+    assert l2['GigabitEthernet0/3'].access_vlan == '10'
+    assert not l2['GigabitEthernet0/3'].is_trunk
+    assert l2['GigabitEthernet0/4'].is_trunk
+    assert l2['GigabitEthernet0/4'].allowed_vlans.to_string() == '10,20-22,40'
+    assert l2['GigabitEthernet0/4'].channel_group == '1'
+
+
+def test_iter_blocks_boundaries():
+    text = synthetic_cdp(NEIGHBORS)
+    blocks = list(cdp.iter_blocks(io.StringIO(text)))
+    assert len(blocks) == 2
+    assert blocks[0].startswith('Device ID: sw1.lab.local')
+    assert 'Total cdp entries' not in blocks[-1]
+    # a dump ends at the prompt of the next command, the text before the first dashes is not a block
+    text = 'R1#show cdp nei deta\n' + text.replace('\nTotal cdp entries displayed : 2', '\nR1#show run\nhostname R1')
+    blocks = list(cdp.iter_blocks(io.StringIO(text)))
+    assert len(blocks) == 2 and 'hostname' not in blocks[-1]
+
+
+def test_cdp_device():
+    dev = cdp.Device(synthetic_cdp(NEIGHBORS), hostname='R1')
+    entries = dev.dict_short
+    assert [ent['device_id'] for ent in entries] == ['sw1', 'sw2']
+    assert entries[0]['local_port'] == 'Gig0/1'
+    assert entries[0]['remote_port'] == 'Gig1/0/1'
+    assert entries[0]['ip_address'] == '10.0.0.2'
+    assert entries[0]['mgmt_address'] == '10.0.0.2'
+    assert entries[0]['platform'] == 'WS-C3750'
+    # blocks streamed from lines give the same entries
+    assert cdp.Device(iter(synthetic_cdp(NEIGHBORS).splitlines(True))).dict == dev.dict
+
+
+def test_cdp_incomplete_block():
+    dev = cdp.Device('-------------------------\nDevice ID: sw9\nInterface: mgmt,  Port ID (outgoing port): \n')
+    assert dev.dict_short == [dict(dev.cdp_entries[0].dict, local_port='mgmt', remote_port='')]
+    assert cdp.CDPEntry.shorten_interface(None) is None
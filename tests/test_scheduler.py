@@ -0,0 +1,56 @@
+import contextlib
+import io
+
+import pytest
+
+pytest.importorskip('nornir')
+
+from alexlibs import fakedevice
+from alexlibs.alexnornir import AlexNornir
+from alexlibs.nornirbench import fleet, make_inventory
+from alexlibs.scheduler import Scheduler
+
+
+@pytest.fixture
+def hung_fleet(tmp_path):
+    """
+    returns a function making an AlexNornir with the scheduler over 5 fake hosts, r3 hangs on 'show run'
+    """
+    config_file, data_file = make_inventory(str(tmp_path), 5, 5)
+
+    def make(scheduler):
+        alex = AlexNornir(config_file=config_file, data_file=data_file, output_dir=f'{tmp_path}/output',
+                          stream=True, scheduler=scheduler)
+        devices = fleet(5)
+        devices['r3'].latency = {'show run': 2.0}
+        fakedevice.install(devices)
+        return alex
+    yield make
+    fakedevice.uninstall()
+
+
+def test_host_timeout_and_retry(hung_fleet):
+    scheduler = Scheduler(num_workers=5, host_timeout=0.5, retries=1, backoff=0.1)
+    alex = hung_fleet(scheduler)
+    seen = []
+    alex.add_host_hook(lambda host, output: seen.append(host))
+    with contextlib.redirect_stdout(io.StringIO()):
+        res = alex.get_config()
+    assert sorted(res.failed_hosts) == ['r3']
+    assert scheduler.stats == {'timeouts': 2, 'retries': 1, 'deadline': 0}
+    assert sorted(seen) == ['r0', 'r1', 'r2', 'r3', 'r4']
+    data = alex.metrics.dict
+    assert data['operations']['get_config']['failed'] == 1
+    assert data['slowest']['get_config'][0][0] == 'r3'
+    # nothing left in use, the late end of the abandoned sessions is ignored
+    assert alex.pool._in_use == dict()
+
+
+def test_deadline(hung_fleet):
+    scheduler = Scheduler(num_workers=5, deadline=0.5)
+    alex = hung_fleet(scheduler)
+    with contextlib.redirect_stdout(io.StringIO()):
+        res = alex.get_config()
+    assert sorted(res.failed_hosts) == ['r3']
+    assert scheduler.stats['deadline'] == 1
+    assert alex.metrics.dict['operations']['get_config']['failed'] == 1
@@ -0,0 +1,57 @@
+import pytest
+
+from alexlibs.vlans import ALLOWED_ALL, DEFAULT_VLANS, VlanSet
+
+
+def test_from_string_to_string():
+    vlans = VlanSet.from_string('10,20-23, 30,4094')
+    assert list(vlans) == [10, 20, 21, 22, 23, 30, 4094]
+    assert vlans.to_string() == '10,20-23,30,4094'
+    assert VlanSet.from_string('').to_string() == ''
+
+
+def test_wrong_vlan():
+    with pytest.raises(ValueError):
+        VlanSet.from_string('10,5000')
+
+
+def test_set_operations():
+    first = VlanSet.from_string('1-10')
+    second = VlanSet.from_string('5-15')
+    assert (first | second).to_string() == '1-15'
+    assert (first & second).to_string() == '5-10'
+    assert (first - second).to_string() == '1-4'
+    assert (first ^ second).to_string() == '1-4,11-15'
+    assert 5 in first and 11 not in first and 9999 not in first
+    assert len(first) == 10
+
+
+@pytest.mark.parametrize('start, statements, expected', [
+    (None, ['10,20-22'], '10,20-22'),
+    (None, ['10,20-22', 'add 30-31'], '10,20-22,30-31'),
+    (None, ['10,20-22', 'remove 21'], '10,20,22'),
+    (None, ['except 2-4093'], '1,4094'),
+    (None, ['none'], ''),
+    (None, ['none', 'add 7'], '7'),
+    ('10', ['all'], '1-4094'),
+    ('10', [''], '10'),
+])
+def test_apply_allowed(start, statements, expected):
+    vlans = ALLOWED_ALL.copy() if start is None else VlanSet.from_string(start)
+    for statement in statements:
+        vlans = vlans.apply_allowed(statement)
+    assert vlans.to_string() == expected
+
+
+def test_allowed_all_is_not_shared():
+    vlans = VlanSet().apply_allowed('all')
+    vlans.discard(10)
+    assert vlans is not ALLOWED_ALL
+    assert 10 in ALLOWED_ALL
+    assert ALLOWED_ALL == VlanSet.range(1, 4094)
+    assert list(DEFAULT_VLANS) == [1, 1002, 1003, 1004, 1005]
+
+
+def test_not_hashable():
+    with pytest.raises(TypeError):
+        hash(VlanSet())
@@ -0,0 +1,212 @@
+"""This Module provides the CDP topology of the fleet.
+
+The CDP entries of all devices are merged into one graph: hostnames are
+normalized (domain removed, matched case insensitive), a link seen from both
+ends is kept once and every node has a dictionary of its neighbors, so
+neighbor lookups are O(1) and paths/components are a breadth-first search.
+"""
+
+from collections import deque
+
+
+def normalize_hostname(name):
+    """
+    returns the hostname without the domain (as CDPEntry.remove_domain)
+    """
+    return f'{name}'.strip().split('.')[0]
+
+
+class Link():
+    """
+    This Class represents a link between two ports of two devices
+    """
+
+    __slots__ = ('host_a', 'port_a', 'host_b', 'port_b')
+
+    def __init__(self, host_a, port_a, host_b, port_b):
+        self.host_a = host_a
+        self.port_a = port_a
+        self.host_b = host_b
+        self.port_b = port_b
+
+    def __repr__(self):
+        return 'Link: {} {} - {} {}'.format(self.host_a, self.port_a, self.host_b, self.port_b)
+
+    @property
+    def hosts(self):
+        return (self.host_a, self.host_b)
+
+    @property
+    def dict(self):
+        resp = {
+            'host_a': self.host_a,
+            'port_a': self.port_a,
+            'host_b': self.host_b,
+            'port_b': self.port_b,
+        }
+        return resp
+
+
+class Topology():
+    """
+    This Class represents the graph of the CDP neighbors of the fleet
+    """
+
+    def __init__(self):
+        self._names = dict()
+        self._links = dict()
+        self._adj = dict()
+        self.platforms = dict()
+
+    def __repr__(self):
+        return 'Topology: {} nodes {} links'.format(len(self._adj), len(self._links))
+
+    def __len__(self):
+        return len(self._adj)
+
+    def __contains__(self, hostname):
+        return self._find(hostname) is not None
+
+    @classmethod
+    def from_devices(cls, cdp_devices):
+        """
+        Builds the topology from cdp.Device objects
+        """
+        topology = cls()
+        for dev in cdp_devices:
+            topology.add_device(dev)
+        return topology
+
+    def _node(self, hostname):
+        """
+        returns the name of the node, the first spelling seen is kept
+        """
+        name = normalize_hostname(hostname)
+        node = self._names.setdefault(name.lower(), name)
+        self._adj.setdefault(node, dict())
+        return node
+
+    def _find(self, hostname):
+        return self._names.get(normalize_hostname(hostname).lower())
+
+    def add_device(self, dev):
+        """
+        Adds the CDP entries of a cdp.Device
+        """
+        if dev.hostname is None:
+            return
+        for ent in dev.cdp_entries:
+            if ent.device_id is None:
+                continue
+            self.add_link(dev.hostname, ent.local_port, ent.device_id, ent.remote_port, platform=ent.platform)
+
+    def add_link(self, host_a, port_a, host_b, port_b, platform=None):
+        """
+        Adds a link, returns the existing one if it was already seen from either end.
+        platform is the platform of host_b.
+        """
+        node_a, node_b = self._node(host_a), self._node(host_b)
+        if platform is not None:
+            self.platforms.setdefault(node_b, platform)
+        key = frozenset(((node_a.lower(), port_a), (node_b.lower(), port_b)))
+        link = self._links.get(key)
+        if link is None:
+            link = Link(node_a, port_a, node_b, port_b)
+            self._links[key] = link
+            self._adj[node_a].setdefault(node_b, []).append(link)
+            if node_b != node_a:
+                self._adj[node_b].setdefault(node_a, []).append(link)
+        return link
+
+    @property
+    def nodes(self):
+        return list(self._adj)
+
+    @property
+    def links(self):
+        return list(self._links.values())
+
+    def neighbors(self, hostname):
+        """
+        returns the names of the neighbors of a device
+        """
+        node = self._find(hostname)
+        if node is None:
+            return []
+        return list(self._adj[node])
+
+    def links_between(self, host_a, host_b):
+        """
+        returns the links between two devices
+        """
+        node_a, node_b = self._find(host_a), self._find(host_b)
+        if node_a is None or node_b is None:
+            return []
+        return list(self._adj[node_a].get(node_b, []))
+
+    def degree(self, hostname):
+        """
+        returns the number of links of a device
+        """
+        node = self._find(hostname)
+        if node is None:
+            return 0
+        return sum(len(links) for links in self._adj[node].values())
+
+    def shortest_path(self, source, target):
+        """
+        returns the list of hostnames of a path with the fewest hops, None if there is none
+        """
+        node_src, node_dst = self._find(source), self._find(target)
+        if node_src is None or node_dst is None:
+            return None
+        previous = {node_src: None}
+        queue = deque([node_src])
+        while queue:
+            node = queue.popleft()
+            if node == node_dst:
+                path = []
+                while node is not None:
+                    path.append(node)
+                    node = previous[node]
+                return path[::-1]
+            for neighbor in self._adj[node]:
+                if neighbor not in previous:
+                    previous[neighbor] = node
+                    queue.append(neighbor)
+        return None
+
+    def components(self):
+        """
+        returns the connected components as sets of hostnames, the largest first
+        """
+        seen = set()
+        resp = []
+        for start in self._adj:
+            if start in seen:
+                continue
+            seen.add(start)
+            component = {start}
+            queue = deque([start])
+            while queue:
+                for neighbor in self._adj[queue.popleft()]:
+                    if neighbor not in seen:
+                        seen.add(neighbor)
+                        component.add(neighbor)
+                        queue.append(neighbor)
+            resp.append(component)
+        resp.sort(key=len, reverse=True)
+        return resp
+
+    def links_by_platform(self, platform):
+        """
+        returns the links with a device of this platform at either end
+        (case insensitive substring, e.g. 'C9300' or 'N9K')
+        """
+        platform = platform.lower()
+        nodes = {node for node, node_platform in self.platforms.items() if platform in node_platform.lower()}
+        resp = []
+        for link in self._links.values():
+            if link.host_a in nodes or link.host_b in nodes:
+                resp.append(link)
+        return resp
@@ -0,0 +1,141 @@
+"""This Module provides a compact set of VLAN IDs.
+
+A VlanSet is a 4096-bit bitmap kept in a python int, so set operations
+between devices are a few big-int operations instead of one object per VLAN.
+"""
+
+MAX_VLAN = 4095
+
+
+class VlanSet():
+    """
+    This Class represents a set of VLAN IDs (0-4095)
+    """
+
+    __slots__ = ('bits',)
+
+    def __init__(self, vlans=None, bits=0):
+        self.bits = bits
+        if vlans is not None:
+            for vlan in vlans:
+                self.add(vlan)
+
+    @classmethod
+    def from_string(cls, text):
+        """
+        Creates a VlanSet from a Cisco list like '10,20-30,40'
+        """
+        bits = 0
+        for item in text.split(','):
+            item = item.strip()
+            if item == "":
+                continue
+            if item.isdigit():
+                bits |= 1 << cls._check(int(item))
+            else:
+                (ib, ie) = list(item.split('-'))
+                ib, ie = cls._check(int(ib)), cls._check(int(ie))
+                if ie >= ib:
+                    bits |= ((1 << (ie - ib + 1)) - 1) << ib
+        return cls(bits=bits)
+
+    @classmethod
+    def range(cls, first, last):
+        return cls(bits=((1 << (last - first + 1)) - 1) << first)
+
+    @staticmethod
+    def _check(vlan):
+        if not 0 <= vlan <= MAX_VLAN:
+            raise ValueError(f'Wrong vlan: {vlan}')
+        return vlan
+
+    def add(self, vlan):
+        self.bits |= 1 << self._check(int(vlan))
+
+    def discard(self, vlan):
+        self.bits &= ~(1 << self._check(int(vlan)))
+
+    def __contains__(self, vlan):
+        return 0 <= vlan <= MAX_VLAN and bool(self.bits >> vlan & 1)
+
+    def __len__(self):
+        return bin(self.bits).count('1')
+
+    def __bool__(self):
+        return self.bits != 0
+
+    def __iter__(self):
+        bits = self.bits
+        while bits:
+            low = bits & -bits
+            yield low.bit_length() - 1
+            bits ^= low
+
+    def __eq__(self, other):
+        return isinstance(other, VlanSet) and self.bits == other.bits
+
+    # mutable (add/discard), so not hashable
+    __hash__ = None
+
+    def copy(self):
+        return VlanSet(bits=self.bits)
+
+    def __or__(self, other):
+        return VlanSet(bits=self.bits | other.bits)
+
+    def __and__(self, other):
+        return VlanSet(bits=self.bits & other.bits)
+
+    def __sub__(self, other):
+        return VlanSet(bits=self.bits & ~other.bits)
+
+    def __xor__(self, other):
+        return VlanSet(bits=self.bits ^ other.bits)
+
+    def __repr__(self):
+        return 'VlanSet: {}'.format(self.to_string())
+
+    def to_string(self):
+        """
+        returns the set as a Cisco list like '10,20-30,40'
+        """
+        resp = []
+        first = last = None
+        for vlan in self:
+            if last is not None and vlan == last + 1:
+                last = vlan
+                continue
+            if first is not None:
+                resp.append(f'{first}' if first == last else f'{first}-{last}')
+            first = last = vlan
+        if first is not None:
+            resp.append(f'{first}' if first == last else f'{first}-{last}')
+        return ','.join(resp)
+
+    def apply_allowed(self, statement):
+        """
+        returns the set after a 'switchport trunk allowed vlan <statement>' line
+        """
+        words = statement.split(None, 1)
+        if not words:
+            return self.copy()
+        if words[0] == 'all':
+            return ALLOWED_ALL.copy()
+        if words[0] == 'none':
+            return VlanSet()
+        if len(words) == 2:
+            if words[0] == 'add':
+                return self | VlanSet.from_string(words[1])
+            if words[0] == 'remove':
+                return self - VlanSet.from_string(words[1])
+            if words[0] == 'except':
+                return ALLOWED_ALL - VlanSet.from_string(words[1])
+        return VlanSet.from_string(statement)
+
+
+# What a trunk allows without any 'switchport trunk allowed vlan' line,
+# shared: hand out copies of it
+ALLOWED_ALL = VlanSet.range(1, 4094)
+
+# VLANs which IOS has without any 'vlan' line
+DEFAULT_VLANS = VlanSet([1, 1002, 1003, 1004, 1005])